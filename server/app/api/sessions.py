@@ -1,33 +1,24 @@
 from fastapi import APIRouter, HTTPException, Query
-from app.services.session_service import SessionService
+from app.core.resources import resources
 from pydantic import BaseModel
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
-service = SessionService()
 
 class CreateSessionRequest(BaseModel):
     device_id: str
 
-@router.on_event("startup")
-async def startup():
-    await service.connect()
-
-@router.on_event("shutdown")
-async def shutdown():
-    await service.disconnect()
-
 @router.post("/")
 async def create_session(request: CreateSessionRequest):
     """Create new session with device ID"""
-    session = await service.create_session(device_id=request.device_id)
+    session = await resources.session_service.create_session(device_id=request.device_id)
     return {"id": session.id, "title": session.title}
 
 @router.get("/")
 async def get_sessions(device_id: str = Query(..., description="Device ID for filtering sessions")):
     """Get all sessions for a specific device"""
-    sessions = await service.get_sessions_by_device(device_id)
+    sessions = await resources.session_service.get_sessions_by_device(device_id)
     result = []
     for s in sessions:
         # Format creation date
@@ -70,7 +61,7 @@ async def get_messages(session_id: str):
         raise HTTPException(status_code=400, detail="Invalid session_id format")
     
     try:
-        messages = await service.get_session_messages(session_id)
+        messages = await resources.session_service.get_session_messages(session_id)
         return [
             {
                 "text": m.text,
@@ -92,7 +83,7 @@ async def delete_session(session_id: str):
         raise HTTPException(status_code=400, detail="Invalid session_id format")
     
     try:
-        await service.delete_session(session_id)
+        await resources.session_service.delete_session(session_id)
         return {"message": "deleted"}
     except Exception as e:
         raise HTTPException(status_code=404, detail="Session not found")
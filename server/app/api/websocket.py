@@ -1,11 +1,14 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from app.services.stt_service import STTService
-from app.services.tts_service import TTSService
-from app.services.llm_service import LLMService
-from app.services.history_service import HistoryService
-from app.services.transcript_service import TranscriptService
-from app.services.vad_service import VADService
-from app.services.session_service import SessionService
+from app.services.llm_service import ResponseOutcome
+from app.services.ingest_service import IngestPipeline, IngestResult, InlineIngestChannel
+from app.services.tts_scheduler import StreamingTTSScheduler, TTSScheduler
+from app.services.turn_manager import TurnManager
+from app.services.speculation_service import Speculation, Speculator
+from app.services.vad_service import EndpointDetector
+from app.core.config import settings
+from app.core.resources import resources
+from app.models.conversation import ConversationState
 from app.utils.metrics import MetricsTracker
 from app.utils.validation import sanitize_transcript, validate_session_id, sanitize_system_prompt
 from app.utils.sentence_detection import SmartSentenceBuffer
@@ -14,39 +17,41 @@ import uuid
 import logging
 import json
 import re
+from typing import Optional
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Prior messages sent to the LLM as context
+HISTORY_LIMIT = 9
+
 # Simple Rate Limiting / Connection Tracking
 active_connections: dict[str, WebSocket] = {}
 
-from app.utils.audio_utils import process_audio_chunk
 
 
-async def _tts_sentence_to_pcm(tts_service: TTSService, sentence: str, interrupt_event: asyncio.Event, gen_id: int, current_generation_id: int):
+def _clean_sentence_for_tts(sentence: str) -> str:
     """
-    Convert a sentence to PCM audio using TTS service.
-    Removed AI STT dependency - transcripts now use original LLM text.
+    Clean a sentence for TTS - preserve decimal numbers but remove sentence punctuation.
     """
-    import hashlib
-    sentence_hash = hashlib.md5(sentence.encode()).hexdigest()[:8]
-    logger.info(f"TTS generating audio for sentence (hash: {sentence_hash}, gen_id: {gen_id}): {sentence[:50]}...")
+    clean_sentence = sentence.strip()
     
-    pcm_parts = []
-    try:
-        async for audio_chunk in tts_service.stream_audio(sentence):
-            if interrupt_event.is_set() or gen_id != current_generation_id:
-                logger.info(f"TTS interrupted for sentence hash: {sentence_hash}")
-                return b""
-            if audio_chunk:
-                pcm_parts.append(audio_chunk)
-        result = b"".join(pcm_parts)
-        logger.info(f"TTS completed for sentence hash: {sentence_hash}, audio size: {len(result)} bytes")
-        return result
-    except Exception as e:
-        logger.error(f"TTS streaming error for sentence hash {sentence_hash}: {e}")
-        return b""
+    # Replace multiple periods (ellipsis) with comma
+    clean_sentence = clean_sentence.replace('...', ',')
+    
+    # Remove sentence-ending periods but preserve decimal points
+    # Replace period at end of sentence or followed by space (but not in numbers)
+    clean_sentence = re.sub(r'\.(?!\d)', '', clean_sentence)
+    
+    # Remove other trailing punctuation
+    while clean_sentence and clean_sentence[-1] in '!?,;:':
+        clean_sentence = clean_sentence[:-1]
+    
+    return clean_sentence
+
+async def _replay(text: str):
+    # A cached response arrives as one chunk, like get_response's own cache hits
+    yield text
 
 @router.websocket("/ws/chat")
 async def websocket_endpoint(
@@ -75,9 +80,8 @@ async def websocket_endpoint(
 
     active_connections[device_id] = websocket
     
-    # Initialize session service first
-    session_service = SessionService()
-    await session_service.connect()
+    # Shared session service backed by the process-wide Prisma client
+    session_service = resources.session_service
     
     # Validate and ensure session exists
     if not session_id:
@@ -90,7 +94,6 @@ async def websocket_endpoint(
         if not validate_session_id(session_id):
             await websocket.send_json({"type": "error", "text": "Invalid session ID"})
             await websocket.close()
-            await session_service.disconnect()
             return
         
         # Check if session exists and belongs to device
@@ -118,15 +121,15 @@ async def websocket_endpoint(
             logger.error(f"Error checking session: {e}", exc_info=True)
             await websocket.send_json({"type": "error", "text": "Session validation error"})
             await websocket.close()
-            await session_service.disconnect()
             return
     
     stt_service = None
-    llm_service = LLMService()
-    tts_service = TTSService()
-    history_service = HistoryService()
-    transcript_service = TranscriptService(history_service)
-    vad_service = VADService(mode=1, sample_rate=16000)  # Mode 1 for balanced sensitivity
+    # Shared, process-wide services; only conversation state is per connection
+    llm_service = resources.llm_service
+    tts_service = resources.tts_service
+    history_service = resources.history_service
+    persistence_service = resources.persistence_service
+    conversation = ConversationState()
     metrics = MetricsTracker()
     metrics.set_model("Llama 3.3 70B") # Explicitly set model name
     
@@ -138,190 +141,225 @@ async def websocket_endpoint(
     await send_system_log("Buffer synchronized")
     await send_system_log("Neural weights loaded")
     
-    interrupt_event = asyncio.Event()
-    current_generation_id = 0
+    # Each turn runs as its own task; a new turn or barge-in cancels the previous one
+    turn_manager = TurnManager()
+
+    async def read_history(transcript: str, recorded: bool):
+        # Only the history read stays on the hot path; writes go through the write-behind queue.
+        # A turn's own user message is recorded before the turn starts (recorded=True): don't
+        # wait for its write (the writer lingers before flushing a lone message), and leave it
+        # out if it already landed
+        await persistence_service.wait_for_history(session_id, skip_latest=recorded)
+        history = await history_service.get_history(session_id, limit=HISTORY_LIMIT + 1)
+        if history and history[-1] == {"role": "user", "content": transcript.strip()}:
+            history = history[:-1]
+        return history[-HISTORY_LIMIT:]
+
+    async def speculate(transcript: str):
+        history = await read_history(transcript, recorded=False)
+        async for chunk in llm_service.get_response(transcript, history=history, state=conversation):
+            yield chunk
+
+    def prefetch_sentence(sentence: str):
+        if tts_service.backend == "cartesia_ws":
+            # The streaming backend synthesizes the committed turn as one stream
+            return None
+        clean_sentence = _clean_sentence_for_tts(sentence)
+        return TTSScheduler.prefetch(tts_service, clean_sentence) if clean_sentence else None
+
+    # Opt-in: start the LLM on a stable interim transcript, commit it if the final matches
+    speculator = None
+    if settings.SPECULATIVE_LLM:
+        speculator = Speculator(
+            lambda text: speculate(sanitize_transcript(text) or text),
+            metrics,
+            # Only from an idle conversation, so the history it reads is the one the turn would read
+            can_start=lambda: turn_manager.is_idle,
+            prefetch=prefetch_sentence,
+        )
     
     async def stt_callback(transcript: str, is_final: bool):
-        nonlocal current_generation_id
         try:
             if not is_final:
                 await websocket.send_json({"type": "transcript_interim", "text": transcript})
+                if speculator:
+                    speculator.on_interim(transcript)
                 return
 
             # Stop STT timing when we get final transcript
             metrics.stop_timing("stt_latency")
+            if endpoint_state["awaiting_final"]:
+                endpoint_state["awaiting_final"] = False
+                if endpoint_state["fired"]:
+                    endpoint_state["fired"] = False
+                    latency = metrics.stop_timing("endpoint_to_final")
+                    logger.info(f"Endpoint-to-final latency: {latency:.0f}ms")
             logger.info(f"Final Transcript: {transcript} for session: {session_id}")
             
             # Sanitize transcript
             clean_transcript = sanitize_transcript(transcript)
             if not clean_transcript:
                 logger.warning(f"Empty or invalid transcript after sanitization")
+                if speculator:
+                    speculator.discard()
                 return
-                
-            transcript = clean_transcript
+            
+            speculation = speculator.on_final(clean_transcript) if speculator else None
+            # Queued before the turn starts, so cancelling the turn can't lose the utterance
+            await persistence_service.record_message(session_id, clean_transcript, is_user=True)
+            await turn_manager.start(lambda gen_id: run_turn(clean_transcript, gen_id, speculation))
+        except WebSocketDisconnect:
+            raise
+        except Exception as e:
+            logger.error(f"Error in STT callback: {e}", exc_info=True)
+    
+    async def run_turn(transcript: str, gen_id: int, speculation: Optional[Speculation] = None):
+        try:
             metrics.start_timing("total_turnaround")
             metrics.start_timing("llm_generation")
             metrics.start_timing("tts_latency")
             
-            # Save user message to history using transcript service
-            await transcript_service.store_user_message(session_id, transcript)
-            
-            # Save user message to session database
-            await session_service.add_message(session_id, transcript, is_user=True)
-            
-            # Fetch full history for LLM context
-            history = await history_service.get_history(session_id)
-            
-            # Signal interruption to any ongoing response
-            interrupt_event.set()
-            await asyncio.sleep(0.1) # Small delay to let current loops settle
-            interrupt_event.clear()
+            history = None
+            cached_turn = None
+            outcome = ResponseOutcome()
+            if speculation:
+                # Committed speculation: its buffered tokens (and early audio) are replayed below
+                token_stream = speculation.replay()
+            else:
+                history = await read_history(transcript, recorded=True)
+                if settings.RESPONSE_AUDIO_CACHE:
+                    cached_turn = await llm_service.get_cached_turn(
+                        transcript, history, conversation, audio_format=tts_service.audio_format
+                    )
+                if cached_turn:
+                    # Cached text (and audio, if stored) is replayed below without the LLM
+                    token_stream = _replay(cached_turn.text)
+                else:
+                    token_stream = llm_service.get_response(
+                        transcript,
+                        history=history,
+                        metrics_tracker=metrics,
+                        state=conversation,
+                        # get_cached_turn already missed the exact cache: don't look (and count a miss) twice
+                        cache_checked=settings.RESPONSE_AUDIO_CACHE,
+                        outcome=outcome,
+                    )
+            replaying_audio = bool(cached_turn and cached_turn.segments)
             
             await websocket.send_json({"type": "transcript", "text": transcript, "is_user": True})
             
-            # Increment generation ID for this turn
-            current_generation_id += 1
-            gen_id = current_generation_id
-            
             # Initialize smart sentence buffer for this response
             sentence_buffer = SmartSentenceBuffer()
             full_ai_response = ""
             processed_sentences = set()  # Track processed sentences to avoid duplicates
             
-            # Send empty assistant transcript immediately to show the bubble
-            await websocket.send_json({"type": "assistant_transcript_start", "is_user": False})
+            def is_cancelled() -> bool:
+                return not turn_manager.is_current(gen_id)
+            
+            def on_first_audio():
+                # Stop TTS timing when the first audio is actually sent
+                if metrics.metrics.get("tts_latency", {}).get("start"):
+                    metrics.stop_timing("tts_latency")
+            
+            # Streaming backend: the whole response goes through one TTS websocket as it is generated
+            streaming_tts = tts_service.backend == "cartesia_ws" and not replaying_audio
+            if streaming_tts:
+                tts_scheduler = StreamingTTSScheduler(
+                    tts_service,
+                    websocket.send_bytes,
+                    is_cancelled=is_cancelled,
+                    clean_sentence=_clean_sentence_for_tts,
+                    on_first_audio=on_first_audio,
+                )
+            else:
+                # Sentences are synthesized ahead of playback and delivered in order
+                tts_scheduler = TTSScheduler(
+                    tts_service,
+                    websocket.send_bytes,
+                    is_cancelled=is_cancelled,
+                    on_first_audio=on_first_audio,
+                    # Keep the audio of a fresh, cacheable answer so the next hit can skip TTS
+                    record=settings.RESPONSE_AUDIO_CACHE and not history and not speculation,
+                )
+            if replaying_audio:
+                logger.info(f"Replaying cached audio ({len(cached_turn.segments)} sentences)")
+                for _, pcm in cached_turn.segments:
+                    tts_scheduler.submit_audio(pcm)
             
-            async for chunk in llm_service.get_response(transcript, history=history[:-1], metrics_tracker=metrics):
-                # If a new turn started or barge-in happened, abort this one
-                if interrupt_event.is_set() or gen_id != current_generation_id:
-                    logger.info(f"Generation {gen_id} aborted")
+            def schedule_sentence(sentence: str, lowercase: bool = False):
+                # Skip if we've already processed this sentence
+                sentence_key = sentence.strip()
+                if not sentence_key or sentence_key in processed_sentences:
                     return
-
-                if chunk.startswith("[STATUS: ") and chunk.endswith("]"):
-                    await websocket.send_json({"type": "status", "text": chunk[9:-1]})
-                    continue
-
-                await websocket.send_json({"type": "transcript_chunk", "text": chunk})
-                full_ai_response += chunk
+                processed_sentences.add(sentence_key)
+                logger.debug(f"Processing sentence: {sentence_key[:50]}...")
                 
-                # Track tokens for TPS
-                metrics.add_tokens(1)
-                
-                # Add chunk to smart sentence buffer
-                complete_sentences = sentence_buffer.add_chunk(chunk)
+                clean_sentence = _clean_sentence_for_tts(sentence)
+                if clean_sentence:  # Only process if there's text left
+                    prefetched = speculation.take_prefetched(sentence) if speculation and not lowercase else None
+                    tts_scheduler.submit(clean_sentence.lower() if lowercase else clean_sentence, prefetched=prefetched)
+            
+            segments = None
+            try:
+                # Send empty assistant transcript immediately to show the bubble
+                await websocket.send_json({"type": "assistant_transcript_start", "is_user": False})
                 
-                # Process any complete sentences
-                for sentence in complete_sentences:
-                    if interrupt_event.is_set() or gen_id != current_generation_id:
-                        break
+                async for chunk in token_stream:
+                    # If a new turn started or barge-in happened, abort this one
+                    if is_cancelled():
+                        logger.info(f"Generation {gen_id} aborted")
+                        return
+
+                    if chunk.startswith("[STATUS: ") and chunk.endswith("]"):
+                        await websocket.send_json({"type": "status", "text": chunk[9:-1]})
+                        continue
+
+                    await websocket.send_json({"type": "transcript_chunk", "text": chunk})
+                    full_ai_response += chunk
                     
-                    if sentence.strip():
-                        # Skip if we've already processed this sentence
-                        sentence_key = sentence.strip()
-                        if sentence_key in processed_sentences:
-                            logger.debug(f"Skipping duplicate sentence: {sentence_key[:50]}...")
-                            continue
-                        processed_sentences.add(sentence_key)
-                        logger.debug(f"Processing sentence: {sentence_key[:50]}...")
-                        
-                        # Clean sentence for TTS - preserve decimal numbers but remove sentence punctuation
-                        clean_sentence = sentence.strip()
-                        
-                        # Replace multiple periods (ellipsis) with comma
-                        clean_sentence = clean_sentence.replace('...', ',')
-                        
-                        # Remove sentence-ending periods but preserve decimal points
-                        # Replace period at end of sentence or followed by space (but not in numbers)
-                        clean_sentence = re.sub(r'\.(?!\d)', '', clean_sentence)
-                        
-                        # Remove other trailing punctuation
-                        while clean_sentence and clean_sentence[-1] in '!?,;:':
-                            clean_sentence = clean_sentence[:-1]
-                        
-                        if clean_sentence:  # Only process if there's text left
-                            # Generate TTS audio with cleaned sentence
-                            pcm = await _tts_sentence_to_pcm(tts_service, clean_sentence, interrupt_event, gen_id, current_generation_id)
-                            
-                            # Stop TTS timing on first audio chunk
-                            if metrics.metrics.get("tts_latency", {}).get("start"):
-                                metrics.stop_timing("tts_latency")
-                        
-                        if interrupt_event.is_set() or gen_id != current_generation_id:
-                            break
-                        
-                        if pcm:
-                            await websocket.send_bytes(pcm)
-                
-                if interrupt_event.is_set() or gen_id != current_generation_id:
-                    break
+                    # Track tokens for TPS
+                    metrics.add_tokens(1)
+                    
+                    if replaying_audio:
+                        continue
+                    if streaming_tts:
+                        tts_scheduler.push_text(chunk)
+                        continue
 
-            # Flush any remaining text in the buffer
-            if not interrupt_event.is_set() and gen_id == current_generation_id:
-                remaining_sentences = sentence_buffer.flush()
-                for sentence in remaining_sentences:
-                    if sentence.strip():
-                        # Skip if we've already processed this sentence
-                        sentence_key = sentence.strip()
-                        if sentence_key in processed_sentences:
-                            continue
-                        processed_sentences.add(sentence_key)
-                        
-                        # Clean sentence for TTS - preserve decimal numbers but remove sentence punctuation
-                        clean_sentence = sentence.strip()
-                        
-                        # Replace multiple periods (ellipsis) with comma
-                        clean_sentence = clean_sentence.replace('...', ',')
-                        
-                        # Remove sentence-ending periods but preserve decimal points
-                        # Replace period at end of sentence or followed by space (but not in numbers)
-                        clean_sentence = re.sub(r'\.(?!\d)', '', clean_sentence)
-                        
-                        # Remove other trailing punctuation
-                        while clean_sentence and clean_sentence[-1] in '!?,;:':
-                            clean_sentence = clean_sentence[:-1]
-                        
-                        if clean_sentence:  # Only process if there's text left
-                            # Generate TTS audio with cleaned sentence
-                            clean_sentence = clean_sentence.lower()
-                            pcm = await _tts_sentence_to_pcm(tts_service, clean_sentence, interrupt_event, gen_id, current_generation_id)
-                            
-                            if not (interrupt_event.is_set() or gen_id != current_generation_id):
-                                if pcm:
-                                    await websocket.send_bytes(pcm)
-                        # Replace single periods with nothing (natural pause at sentence end)
-                        # clean_sentence = clean_sentence.replace('.', '')
-                        # # Remove other trailing punctuation
-                        # while clean_sentence and clean_sentence[-1] in '!?,;:':
-                        #     clean_sentence = clean_sentence[:-1]
-                        
-                        # if clean_sentence:  # Only process if there's text left
-                        #     # Generate TTS audio with cleaned sentence
-                        #     pcm = await _tts_sentence_to_pcm(tts_service, clean_sentence, interrupt_event, gen_id, current_generation_id)
-                            
-                        #     if not (interrupt_event.is_set() or gen_id != current_generation_id):
-                        #         if pcm:
-                        #             await websocket.send_bytes(pcm)
+                    # Hand complete sentences to the scheduler; synthesis runs in the background
+                    for sentence in sentence_buffer.add_chunk(chunk):
+                        schedule_sentence(sentence)
+
+                # Flush any remaining text in the buffer
+                if not is_cancelled() and not streaming_tts and not replaying_audio:
+                    for sentence in sentence_buffer.flush():
+                        schedule_sentence(sentence, lowercase=True)
+                
+                # Wait for the remaining audio to be delivered in order
+                await tts_scheduler.finish()
+                segments = tts_scheduler.recording()
+            finally:
+                await tts_scheduler.aclose()
             
             # Send the complete agent response as a single transcript at the end
-            if not interrupt_event.is_set() and gen_id == current_generation_id:
+            if not is_cancelled():
                 if full_ai_response:
                     # Send the full response as one transcript message
                     await websocket.send_json({"type": "assistant_transcript", "text": full_ai_response, "is_user": False})
                     
-                    # Save AI response to history using transcript service
-                    await transcript_service.store_agent_message(session_id, full_ai_response)
-                    
-                    # Save AI response to session database
-                    await session_service.add_message(session_id, full_ai_response, is_user=False)
-                    
-                    # Auto-generate title after first exchange (when message count == 2)
-                    messages = await session_service.get_session_messages(session_id)
-                    if len(messages) == 2:
-                        await session_service.auto_title(session_id)
+                    # Save AI response to history and session database (write-behind);
+                    # the title is generated after the first exchange is stored
+                    await persistence_service.record_message(session_id, full_ai_response, is_user=False, auto_title=True)
                     
                     metrics.stop_timing("llm_generation")
                     metrics.stop_timing("total_turnaround")
                     await websocket.send_json({"type": "metrics", "data": metrics.get_all()})
+
+                    # Only next to text this turn cached (not drafts, semantic hits or fallbacks)
+                    if segments and outcome.cached:
+                        await llm_service.cache_turn_audio(
+                            transcript, history, conversation, full_ai_response, segments, tts_service.audio_format
+                        )
                 else:
                     # If no response was generated, send empty transcript to clear loading state
                     await websocket.send_json({"type": "assistant_transcript", "text": "I apologize, I couldn't generate a response.", "is_user": False})
@@ -334,12 +372,59 @@ async def websocket_endpoint(
                 await websocket.send_json({"type": "error", "text": "I encountered an issue processing that."})
             except: pass
         finally:
-            # We don't clear interrupt_event here as it might clear it for a *new* valid turn
-            pass
+            # A committed speculation is done by now unless the turn was cancelled
+            if speculation:
+                await speculation.aclose()
                 
-    stt_service = STTService(stt_callback)
+    stt_service = STTService(stt_callback, pool=resources.upstream_pool)
+
+    # Server-side end-of-utterance detection; Deepgram endpointing remains the backstop
+    endpoint_detector = None
+    if settings.SERVER_ENDPOINTING:
+        endpoint_detector = EndpointDetector(
+            silence_ms=settings.ENDPOINT_SILENCE_MS,
+            min_speech_ms=settings.ENDPOINT_MIN_SPEECH_MS,
+            use_client_hint=settings.ENDPOINT_USE_CLIENT_HINT,
+        )
+    # awaiting_final: speech heard since the last final; fired: Finalize sent for it
+    endpoint_state = {"awaiting_final": False, "fired": False}
+
+    async def end_utterance(source: str):
+        logger.info(f"Endpoint detected ({source}), finalizing transcript")
+        if endpoint_state["awaiting_final"] and not endpoint_state["fired"]:
+            endpoint_state["fired"] = True
+            metrics.start_timing("endpoint_to_final")
+        await stt_service.finalize()
+    
+    async def on_ingest_result(result: IngestResult):
+        if result.is_speech:
+            endpoint_state["awaiting_final"] = True
+            # Start STT timing when speech begins
+            if not metrics.metrics.get("stt_latency", {}).get("start"):
+                metrics.start_timing("stt_latency")
+
+        # Without the speech gate every chunk is forwarded to prevent timeout closures;
+        # with it, silence is held back and STTService sends KeepAlive instead.
+        if result.audio:
+            await stt_service.send_audio(result.audio, is_speech=result.is_speech)
+        elif result.frames:
+            # Gate closed: don't hold the end of the utterance back in a partial packet
+            await stt_service.flush()
+
+        # After the audio is sent, so Finalize covers this chunk too
+        if endpoint_detector and endpoint_detector.update_frames(result.frames, result.frame_ms):
+            await end_utterance("vad")
+    
+    # Mode 1 VAD for balanced sensitivity; filter state carries across chunks
+    ingest_pipeline = IngestPipeline.create(vad_mode=1, sample_rate=16000, gated=settings.INGEST_VAD_GATE)
+    if resources.ingest_pool:
+        ingest_channel = resources.ingest_pool.channel(ingest_pipeline, on_ingest_result)
+    else:
+        ingest_channel = InlineIngestChannel(ingest_pipeline, on_ingest_result)
+    
     await send_system_log("Engine ready")
-    await stt_service.start()
+    if not stt_service.lazy:
+        await stt_service.start()
     
     try:
         while True:
@@ -347,21 +432,8 @@ async def websocket_endpoint(
             if data.get("type") == "websocket.disconnect":
                 raise WebSocketDisconnect
             if "bytes" in data:
-                # Pipeline: Noise Suppression → VAD → STT
-                raw_audio = data["bytes"]
-
-                # Step 1: VAD - Check if audio contains speech (run on raw audio)
-                is_speech = vad_service.is_speech(raw_audio)
-                
-                if is_speech:
-                    # Start STT timing when speech begins
-                    if not metrics.metrics.get("stt_latency", {}).get("start"):
-                        metrics.start_timing("stt_latency")
-
-                # Always send audio to Deepgram to prevent timeout closures.
-                # We still use VAD for metrics and for deciding when a "turn" starts.
-                processed_audio = process_audio_chunk(raw_audio)
-                await stt_service.send_audio(processed_audio)
+                # Pipeline: VAD → Noise Suppression → STT (inline or on the ingest worker pool)
+                await ingest_channel.submit(data["bytes"])
             elif "text" in data:
                 # Handle control messages
                 msg = json.loads(data["text"])
@@ -369,24 +441,27 @@ async def websocket_endpoint(
                     await websocket.send_json({"type": "pong"})
                 elif msg.get("type") == "barge-in":
                     logger.info("Barge-in requested by client")
-                    interrupt_event.set()
-                    await asyncio.sleep(0.05)
-                    interrupt_event.clear()
+                    await turn_manager.cancel()
                 elif msg.get("type") == "speech_end":
                     logger.info("Speech end detected by client VAD")
-                    # Optionally we could force-close the current STT stream or send a finalizer
-                    # but with endpointing=500, Deepgram should already be finalizing.
+                    # With pooled ingest a few frames may still be in flight; Deepgram endpointing covers those
+                    if endpoint_detector and endpoint_detector.client_speech_end():
+                        await end_utterance("client")
                 elif msg.get("type") == "update_context":
                     new_prompt = msg.get("text")
                     if new_prompt:
                         # Sanitize system prompt
                         clean_prompt = sanitize_system_prompt(new_prompt)
-                        llm_service.set_system_prompt(clean_prompt)
+                        conversation.set_system_prompt(clean_prompt)
+                        if speculator:
+                            speculator.discard()
                         await websocket.send_json({"type": "status", "text": "Instructions updated."})
                 elif msg.get("type") == "set_response_mode":
                     mode = msg.get("mode")
                     if mode in ["faster", "planning", "detailed"]:
-                        llm_service.set_response_mode(mode)
+                        conversation.set_response_mode(mode)
+                        if speculator:
+                            speculator.discard()
                         
                         # Update metrics with new model name
                         mode_config = {
@@ -408,7 +483,7 @@ async def websocket_endpoint(
                         # Sanitize the text input
                         clean_text = sanitize_transcript(text_message)
                         if clean_text:
-                            # Process as if it was a voice transcript
+                            # Process as if it was a voice transcript (runs as its own turn task)
                             await stt_callback(clean_text, is_final=True)
                     
     except WebSocketDisconnect:
@@ -418,7 +493,11 @@ async def websocket_endpoint(
     finally:
         if active_connections.get(device_id) == websocket:
             del active_connections[device_id]
+        
+        await turn_manager.aclose()
+        if speculator:
+            await speculator.aclose()
+        await ingest_channel.aclose()
             
         if stt_service:
             await stt_service.stop()
-        await session_service.disconnect()
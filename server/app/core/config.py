@@ -9,9 +9,128 @@ class Settings(BaseSettings):
     TAVILY_API_KEY: str
     GOOGLE_API_KEY: Optional[str] = None
     DATABASE_URL: Optional[str] = None
+    # Shared Prisma pool: connections held by the single process-wide query engine
+    DATABASE_POOL_SIZE: Optional[int] = None
+    DATABASE_POOL_TIMEOUT: int = 10
+    # Write-behind persistence: queue bound, batch size and max linger per batch
+    PERSIST_MAX_PENDING: int = 10000
+    PERSIST_BATCH_SIZE: int = 100
+    PERSIST_FLUSH_INTERVAL_MS: int = 50
     REDIS_URL: str = "redis://localhost:6379"
+    # Size of the process-wide Redis pool shared by all connections; when every connection
+    # is busy a command waits up to REDIS_POOL_TIMEOUT_S for one instead of failing
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_S: float = 5.0
+    # Separate pool for binary values (cached response audio)
+    REDIS_BINARY_MAX_CONNECTIONS: int = 10
     PORT: int = 8000
 
+    # Ingest: "inline" runs VAD/DSP on the event loop; "thread" or "process" batches it onto a worker pool
+    INGEST_MODE: str = "inline"
+    INGEST_WORKERS: int = 4
+    INGEST_BATCH_LINGER_MS: float = 2.0
+    INGEST_MAX_BATCH: int = 64
+    # Frames a connection may have waiting for a worker before its oldest are dropped
+    INGEST_MAX_PENDING: int = 50
+    # Ingest: only forward speech (plus hangover and pre-roll) to STT; send KeepAlive during silence.
+    # Hangover must exceed STT endpointing so Deepgram still sees the trailing silence.
+    INGEST_VAD_GATE: bool = False
+    VAD_HANGOVER_MS: int = 800
+    VAD_PREROLL_MS: int = 300
+    STT_KEEPALIVE_INTERVAL_S: float = 5.0
+    # STT backend: "sdk" (Deepgram SDK, threads per stream) or "asyncio" (event-loop native client)
+    STT_BACKEND: str = "sdk"
+    DEEPGRAM_LIVE_URL: str = "wss://api.deepgram.com/v1/listen"
+    # Lazy STT: open the Deepgram stream on the first speech frame (replaying STT_PREROLL_MS of
+    # earlier audio) and close it after STT_IDLE_CLOSE_S without speech
+    STT_LAZY_CONNECT: bool = True
+    STT_IDLE_CLOSE_S: float = 30.0
+    STT_PREROLL_MS: int = 500
+    # Endpointing: Deepgram's own silence endpointing is the backstop; the server-side detector
+    # (VAD silence run or client speech_end) sends Finalize so the final arrives sooner.
+    # Opt-in: a silence run shorter than STT_ENDPOINTING_MS splits utterances at mid-sentence pauses.
+    STT_ENDPOINTING_MS: int = 500
+    SERVER_ENDPOINTING: bool = False
+    ENDPOINT_SILENCE_MS: int = 500
+    ENDPOINT_MIN_SPEECH_MS: int = 200
+    ENDPOINT_USE_CLIENT_HINT: bool = True
+    # Speculative generation: start the LLM once an interim transcript has been stable this long,
+    # committed if the final transcript matches. Costs extra LLM calls on misses.
+    SPECULATIVE_LLM: bool = False
+    SPECULATION_STABLE_MS: int = 250
+    # Ingest framing: VAD frame size (10/20/30 ms) and the audio batched into each Deepgram send
+    VAD_FRAME_MS: int = 30
+    STT_SEND_PACKET_MS: int = 100
+
+    # Warm pool: ready Deepgram live sockets (asyncio STT backend) and keep-alive TTS connections
+    # per host, topped up every UPSTREAM_POOL_REFILL_S
+    UPSTREAM_POOL_ENABLED: bool = False
+    STT_POOL_SIZE: int = 4
+    TTS_WARM_CONNECTIONS: int = 4
+    UPSTREAM_POOL_REFILL_S: float = 5.0
+
+    # TTS HTTP: the shared keep-alive session's connection limit, idle keep-alive and timeouts
+    TTS_HTTP_POOL_LIMIT: int = 20
+    TTS_KEEPALIVE_S: float = 60.0
+    TTS_CONNECT_TIMEOUT_S: float = 5.0
+    TTS_READ_TIMEOUT_S: float = 15.0
+    # TTS backend: "http" (one request per sentence) or "cartesia_ws" (one streaming websocket per
+    # turn, text pushed as it is generated; falls back to HTTP on failure)
+    TTS_BACKEND: str = "http"
+    CARTESIA_WS_URL: str = "wss://api.cartesia.ai/tts/websocket"
+    # Streaming TTS: minimum characters pushed per websocket message (always whole words)
+    TTS_STREAM_MIN_CHARS: int = 12
+    # TTS audio cache keyed by provider, voice, sample rate and text: in-memory LRU budget,
+    # plus an optional on-disk tier of raw PCM files (disabled without TTS_CACHE_DIR)
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_MEMORY_MB: int = 64
+    TTS_CACHE_DIR: Optional[str] = None
+    TTS_CACHE_DISK_MB: int = 1024
+    # Response cache: in-process LRU tier in front of Redis (TTL bounds staleness if an
+    # invalidation is missed) and the pub/sub channel that keeps workers coherent
+    RESPONSE_CACHE_LOCAL_ENTRIES: int = 1024
+    RESPONSE_CACHE_LOCAL_TTL_S: float = 60.0
+    RESPONSE_CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    # Response cache: also store each cached answer's sentence audio (in Redis, next to the text)
+    # so a repeated question replays text and audio without the LLM or TTS
+    RESPONSE_AUDIO_CACHE: bool = False
+    # Semantic response cache (per process): answers history-free, non-time-sensitive
+    # queries whose embedding is within the cosine threshold of an earlier one
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 100_000
+    SEMANTIC_CACHE_TTL_S: float = 86400.0
+    # Single-flight: concurrent identical Groq/Tavily requests share one upstream call.
+    # With SINGLE_FLIGHT_REDIS, workers coordinate through a Redis lock and relay stream
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_REDIS: bool = False
+    SINGLE_FLIGHT_LOCK_TTL_S: float = 30.0
+    SINGLE_FLIGHT_STALL_S: float = 5.0
+    # Planning mode: how long a draft answer (generated in parallel) waits for search
+    # results before it is spoken without them
+    PLANNING_SEARCH_BUDGET_S: float = 0.8
+    # Web search: native async Tavily client with pooled keep-alive connections
+    TAVILY_SEARCH_URL: str = "https://api.tavily.com/search"
+    SEARCH_HTTP_POOL_LIMIT: int = 10
+    SEARCH_TIMEOUT_S: float = 10.0
+    # Search result cache (per process), keyed by normalized query and max_results.
+    # TTL per query category: volatile answers expire in minutes, general facts in hours
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 2048
+    SEARCH_CACHE_TTL_S: dict[str, float] = {
+        "prices": 120.0,
+        "news": 300.0,
+        "sports": 300.0,
+        "weather": 600.0,
+        "general": 6 * 3600.0,
+    }
+    # TTS: number of upcoming sentences synthesized concurrently per turn
+    TTS_LOOKAHEAD: int = 3
+    # TTS: forward audio frame-by-frame instead of one payload per sentence
+    TTS_STREAMING_DOWNLINK: bool = True
+    # TTS: minimum audio per websocket frame in streaming mode (jitter smoothing)
+    TTS_JITTER_BUFFER_MS: int = 40
+
     class Config:
         _here = Path(__file__).resolve()
         env_file = (
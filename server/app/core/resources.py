@@ -0,0 +1,229 @@
+import logging
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import redis.asyncio as redis
+from groq import AsyncGroq
+from prisma import Prisma
+
+from app.core.config import settings
+from app.services.cache_service import CacheService, LocalCache
+from app.services.connection_pool import UpstreamPool
+from app.services.history_service import HistoryService
+from app.services.ingest_service import IngestWorkerPool
+from app.services.llm_service import LLMService
+from app.services.persistence_service import PersistenceService
+from app.services.search_service import SearchService
+from app.services.semantic_cache import SemanticCache
+from app.services.session_service import SessionService
+from app.services.single_flight import SingleFlight
+from app.services.tavily_client import AsyncTavilyClient
+from app.services.transcript_service import TranscriptService
+from app.services.tts_cache import TTSAudioCache
+from app.services.tts_service import TTSService
+
+logger = logging.getLogger(__name__)
+
+
+def _database_url() -> Optional[str]:
+    """
+    DATABASE_URL with the Prisma pool settings applied.
+    Explicit connection_limit/pool_timeout parameters in the URL win.
+    """
+    if not settings.DATABASE_URL:
+        return None
+    parts = urlsplit(settings.DATABASE_URL)
+    query = dict(parse_qsl(parts.query))
+    if settings.DATABASE_POOL_SIZE:
+        query.setdefault("connection_limit", str(settings.DATABASE_POOL_SIZE))
+    query.setdefault("pool_timeout", str(settings.DATABASE_POOL_TIMEOUT))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class ResourceRegistry:
+    """
+    Process-wide registry of pooled provider clients and stateless services.
+    Built once in the FastAPI lifespan and shared by every connection;
+    per-connection state lives in ConversationState.
+    """
+
+    def __init__(self):
+        self.redis_pool: Optional[redis.ConnectionPool] = None
+        self.redis: Optional[redis.Redis] = None
+        self.redis_binary_pool: Optional[redis.ConnectionPool] = None
+        self.redis_binary: Optional[redis.Redis] = None
+        self.redis_pubsub: Optional[redis.Redis] = None
+        self.groq: Optional[AsyncGroq] = None
+        self.prisma: Optional[Prisma] = None
+
+        self.cache_service: Optional[CacheService] = None
+        self.semantic_cache: Optional[SemanticCache] = None
+        self.single_flight: Optional[SingleFlight] = None
+        self.history_service: Optional[HistoryService] = None
+        self.transcript_service: Optional[TranscriptService] = None
+        self.search_service: Optional[SearchService] = None
+        self.llm_service: Optional[LLMService] = None
+        self.tts_service: Optional[TTSService] = None
+        self.session_service: Optional[SessionService] = None
+        self.persistence_service: Optional[PersistenceService] = None
+        self.ingest_pool: Optional[IngestWorkerPool] = None
+        self.upstream_pool: Optional[UpstreamPool] = None
+
+    async def startup(self):
+        """Create the shared clients. Called once from the app lifespan."""
+        # Blocking pools: at the connection limit commands queue for a connection
+        # instead of failing with "Too many connections"
+        self.redis_pool = redis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_S,
+        )
+        self.redis = redis.Redis(connection_pool=self.redis_pool)
+        if settings.RESPONSE_AUDIO_CACHE:
+            # Cached PCM is binary: a separate small pool without response decoding
+            self.redis_binary_pool = redis.BlockingConnectionPool.from_url(
+                settings.REDIS_URL,
+                decode_responses=False,
+                max_connections=settings.REDIS_BINARY_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT_S,
+            )
+            self.redis_binary = redis.Redis(connection_pool=self.redis_binary_pool)
+        # The cache invalidation subscription holds its connection for good: keep it out of the pool
+        self.redis_pubsub = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.groq = AsyncGroq(api_key=settings.GROQ_API_KEY)
+
+        # One query engine and DB pool for the whole process (REST + websockets)
+        url = _database_url()
+        self.prisma = Prisma(datasource={"url": url}) if url else Prisma()
+        await self.prisma.connect()
+        self.session_service = SessionService(self.prisma)
+
+        self.cache_service = CacheService(
+            redis_client=self.redis,
+            binary_client=self.redis_binary,
+            pubsub_client=self.redis_pubsub,
+        )
+        self.cache_service.start()
+        self.history_service = HistoryService(redis_client=self.redis)
+        self.transcript_service = TranscriptService(self.history_service)
+        if settings.SINGLE_FLIGHT_ENABLED:
+            self.single_flight = SingleFlight(
+                redis_client=self.redis if settings.SINGLE_FLIGHT_REDIS else None,
+                lock_ttl=settings.SINGLE_FLIGHT_LOCK_TTL_S,
+                stall_timeout=settings.SINGLE_FLIGHT_STALL_S,
+            )
+        search_cache = None
+        if settings.SEARCH_CACHE_ENABLED:
+            # Per-entry TTLs come from SEARCH_CACHE_TTL_S; the default only applies to unknown categories
+            search_cache = LocalCache(
+                max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+                ttl=settings.SEARCH_CACHE_TTL_S.get("general", 3600.0),
+            )
+        self.search_service = SearchService(
+            client=AsyncTavilyClient(
+                api_key=settings.TAVILY_API_KEY,
+                url=settings.TAVILY_SEARCH_URL,
+                pool_limit=settings.SEARCH_HTTP_POOL_LIMIT,
+                timeout=settings.SEARCH_TIMEOUT_S,
+            ),
+            single_flight=self.single_flight,
+            cache=search_cache,
+        )
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                capacity=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl=settings.SEMANTIC_CACHE_TTL_S,
+            )
+        self.llm_service = LLMService(
+            client=self.groq,
+            search_service=self.search_service,
+            cache_service=self.cache_service,
+            semantic_cache=self.semantic_cache,
+            single_flight=self.single_flight,
+        )
+        tts_cache = None
+        if settings.TTS_CACHE_ENABLED:
+            tts_cache = TTSAudioCache(
+                memory_bytes=settings.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=settings.TTS_CACHE_DIR,
+                disk_bytes=settings.TTS_CACHE_DISK_MB * 1024 * 1024,
+            )
+        self.tts_service = TTSService(cache=tts_cache)
+        if settings.UPSTREAM_POOL_ENABLED:
+            # Warm STT sockets and TTS connections before the first session needs them
+            self.upstream_pool = UpstreamPool(
+                http=self.tts_service.http_session(),
+                tts_urls=[self.tts_service.cartesia_url, self.tts_service.deepgram_url],
+            )
+            self.upstream_pool.start()
+
+        self.persistence_service = PersistenceService(self.session_service, self.history_service)
+        self.persistence_service.start()
+
+        if settings.INGEST_MODE in ("thread", "process"):
+            self.ingest_pool = IngestWorkerPool(mode=settings.INGEST_MODE)
+            self.ingest_pool.start()
+        logger.info("Shared resources initialized")
+
+    async def shutdown(self):
+        """Close pooled clients. Called once from the app lifespan."""
+        if self.ingest_pool:
+            await self.ingest_pool.close()
+        if self.upstream_pool:
+            try:
+                await self.upstream_pool.close()
+            except Exception as e:
+                logger.error(f"Error closing upstream pool: {e}")
+        if self.persistence_service:
+            # Flush queued writes while the DB and Redis clients are still open
+            try:
+                await self.persistence_service.close()
+            except Exception as e:
+                logger.error(f"Error flushing pending writes: {e}")
+        if self.cache_service:
+            await self.cache_service.close()
+        if self.prisma and self.prisma.is_connected():
+            try:
+                await self.prisma.disconnect()
+            except Exception as e:
+                logger.error(f"Error disconnecting Prisma: {e}")
+        if self.tts_service:
+            try:
+                await self.tts_service.aclose()
+            except Exception as e:
+                logger.error(f"Error closing TTS session: {e}")
+        if self.llm_service:
+            await self.llm_service.aclose()
+        if self.search_service:
+            try:
+                await self.search_service.aclose()
+            except Exception as e:
+                logger.error(f"Error closing search session: {e}")
+        if self.groq:
+            try:
+                await self.groq.close()
+            except Exception as e:
+                logger.error(f"Error closing Groq client: {e}")
+        if self.redis:
+            try:
+                await self.redis.aclose()
+                await self.redis_pool.disconnect()
+            except Exception as e:
+                logger.error(f"Error closing Redis pool: {e}")
+        if self.redis_binary:
+            try:
+                await self.redis_binary.aclose()
+                await self.redis_binary_pool.disconnect()
+            except Exception as e:
+                logger.error(f"Error closing binary Redis pool: {e}")
+        if self.redis_pubsub:
+            try:
+                await self.redis_pubsub.aclose(close_connection_pool=True)
+            except Exception as e:
+                logger.error(f"Error closing Redis pub/sub client: {e}")
+        logger.info("Shared resources released")
+
+
+resources = ResourceRegistry()
@@ -4,6 +4,7 @@ from app.api.websocket import router as ws_router
 from app.api.sessions import router as sessions_router
 from app.core.config import settings
 from app.core.logger import setup_logging
+from app.core.resources import resources
 import logging
 
 setup_logging()
@@ -13,16 +14,41 @@ from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup logic can go here
+    # Build process-wide provider clients once; every connection shares them
+    await resources.startup()
     yield
     # Shutdown logic: ensuring any global resources are cleared
     logger.info("Shutting down cleanly...")
+    await resources.shutdown()
 
 app = FastAPI(title="Voice Assistant API", lifespan=lifespan)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    health = {"status": "healthy"}
+    if resources.upstream_pool:
+        health["upstream_pool"] = resources.upstream_pool.health()
+    return health
+
+@app.get("/metrics")
+async def metrics():
+    """Process-wide cache and pool statistics (per-tier hit ratios, pool health)."""
+    data = {}
+    if resources.cache_service:
+        data["response_cache"] = resources.cache_service.stats()
+    if resources.semantic_cache is not None:
+        data["semantic_cache"] = resources.semantic_cache.stats()
+    if resources.search_service:
+        data["search"] = resources.search_service.stats()
+    if resources.llm_service:
+        data["planning"] = resources.llm_service.stats()
+    if resources.single_flight:
+        data["single_flight"] = resources.single_flight.stats()
+    if resources.tts_service and resources.tts_service.cache:
+        data["tts_cache"] = resources.tts_service.cache.stats()
+    if resources.upstream_pool:
+        data["upstream_pool"] = resources.upstream_pool.health()
+    return data
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,35 @@
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_MODES = ("faster", "planning", "detailed")
+
+# Simplified system prompt (no search instructions needed)
+DEFAULT_SYSTEM_PROMPT = (
+    "You are a helpful and concise voice assistant. Give short, conversational answers suitable for real-time speech. "
+    "Keep responses under 2-3 sentences for better voice delivery."
+)
+
+
+@dataclass
+class ConversationState:
+    """
+    Per-connection conversation settings.
+    Shared services read these per call instead of holding them themselves.
+    """
+
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT
+    response_mode: str = "planning"  # Default mode: faster, planning, or detailed
+
+    def set_system_prompt(self, prompt: str):
+        self.system_prompt = prompt
+        logger.info(f"System prompt updated: {prompt[:50]}...")
+
+    def set_response_mode(self, mode: str):
+        """Set the response mode for query processing."""
+        if mode in RESPONSE_MODES:
+            self.response_mode = mode
+            logger.info(f"Response mode set to: {mode}")
+        else:
+            logger.warning(f"Invalid response mode: {mode}")
@@ -1,34 +1,229 @@
+import asyncio
 import redis.asyncio as redis
 import hashlib
+import time
+import uuid
+from collections import OrderedDict
 from app.core.config import settings
+from app.utils.text_normalization import normalize_query
+from typing import Optional
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class LocalCache:
+    """
+    Size-bounded in-process LRU with a per-entry TTL (the default, or one
+    given to set()). The TTL caps how long a worker can serve a stale entry
+    if an invalidation message is missed.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
 class CacheService:
-    def __init__(self):
-        self.pool = redis.ConnectionPool.from_url(settings.REDIS_URL, decode_responses=True, max_connections=10)
-        self.redis = redis.Redis(connection_pool=self.pool)
+    """
+    Two-tier response cache: an in-process LocalCache in front of Redis.
+    Queries are normalized before keying (case, punctuation, whitespace, STT
+    fillers). Writes and invalidations are published on a Redis channel so
+    every worker drops its local copy and re-reads Redis.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        binary_client: Optional[redis.Redis] = None,
+        pubsub_client: Optional[redis.Redis] = None,
+    ):
+        if redis_client is None:
+            self.pool = redis.BlockingConnectionPool.from_url(
+                settings.REDIS_URL, decode_responses=True, max_connections=10, timeout=settings.REDIS_POOL_TIMEOUT_S
+            )
+            redis_client = redis.Redis(connection_pool=self.pool)
+        self.redis = redis_client
+        # Raw bytes client for cached audio (the main client decodes every reply as UTF-8)
+        self.binary = binary_client
+        # The invalidation subscription pins a connection: give it its own client when sharing a pool
+        self.pubsub_client = pubsub_client or redis_client
         self.expiry = 3600 * 24 # 24 hours cache expiry
-        self.version = "v1"
+        # v2: keys are built from normalized queries; v3: operators, signs and decimals kept
+        self.version = "v3"
+        self.local = LocalCache(settings.RESPONSE_CACHE_LOCAL_ENTRIES, settings.RESPONSE_CACHE_LOCAL_TTL_S)
+        self.channel = settings.RESPONSE_CACHE_INVALIDATION_CHANNEL
+        # Lets a worker skip its own invalidation messages
+        self.worker_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def start(self):
+        """Subscribe to invalidations from other workers."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
 
     def _get_key(self, query: str, context: str = ""):
-        # Include version and hash query + context
-        combined = f"{query}:{context}"
+        # Include version and hash normalized query + context
+        combined = f"{normalize_query(query)}:{context}"
         hash_val = hashlib.md5(combined.encode()).hexdigest()
         return f"cache:{self.version}:{hash_val}"
 
     async def get_cached_response(self, query: str, context: str = ""):
+        key = self._get_key(query, context)
+        cached = self.local.get(key)
+        if cached is not None:
+            self.local_hits += 1
+            return cached
         try:
-            key = self._get_key(query, context)
-            return await self.redis.get(key)
+            cached = await self.redis.get(key)
         except Exception as e:
             logger.error(f"Redis cache get error: {e}")
             return None
+        if cached is None:
+            self.misses += 1
+            return None
+        self.redis_hits += 1
+        self.local.set(key, cached)
+        return cached
 
     async def set_cached_response(self, query: str, response: str, context: str = ""):
+        key = self._get_key(query, context)
+        self.local.set(key, response)
         try:
-            key = self._get_key(query, context)
             await self.redis.setex(key, self.expiry, response)
+            # Other workers may hold an older answer for this key
+            await self._publish(key)
         except Exception as e:
             logger.error(f"Redis cache set error: {e}")
+
+    async def invalidate(self, query: str, context: str = ""):
+        """Drop a cached response everywhere: Redis, this worker and (via pub/sub) the others."""
+        key = self._get_key(query, context)
+        self.local.discard(key)
+        try:
+            await self.redis.delete(key)
+            await self._publish(key)
+        except Exception as e:
+            logger.error(f"Redis cache invalidate error: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            # Share of all lookups answered by each tier
+            "local_hit_ratio": self.local_hits / lookups if lookups else 0.0,
+            "redis_hit_ratio": self.redis_hits / lookups if lookups else 0.0,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "local_entries": len(self.local),
+        }
+
+    async def _publish(self, key: str):
+        await self.redis.publish(self.channel, f"{self.worker_id}:{key}")
+
+    async def _listen(self):
+        delay = 0.5
+        while True:
+            pubsub = self.pubsub_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything published while we were disconnected is lost: start clean
+                self.local.clear()
+                delay = 0.5
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    sender, _, key = message["data"].partition(":")
+                    if sender != self.worker_id:
+                        self.local.discard(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error, resubscribing in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _get_audio_key(self, query: str, context: str, audio_format: str):
+        return f"{self._get_key(query, context)}:audio:{audio_format}"
+
+    async def get_cached_audio(self, query: str, response: str, context: str = "", audio_format: str = ""):
+        """
+        Sentence PCM stored for a cached response, as [(sentence, pcm), ...].
+        None unless it was synthesized from exactly this response text.
+        """
+        if self.binary is None:
+            return None
+        try:
+            entry = await self.binary.hgetall(self._get_audio_key(query, context, audio_format))
+            if not entry or entry.get(b"response") != hashlib.md5(response.encode()).hexdigest().encode():
+                return None
+            sentences = json.loads(entry[b"sentences"])
+            return [(sentence, entry[str(i).encode()]) for i, sentence in enumerate(sentences)]
+        except Exception as e:
+            logger.error(f"Redis audio cache get error: {e}")
+            return None
+
+    async def set_cached_audio(self, query: str, response: str, segments: list, context: str = "", audio_format: str = ""):
+        """Store sentence PCM for a cached response; segments is [(sentence, pcm), ...]."""
+        if self.binary is None or not segments:
+            return
+        try:
+            key = self._get_audio_key(query, context, audio_format)
+            mapping = {
+                "response": hashlib.md5(response.encode()).hexdigest(),
+                "sentences": json.dumps([sentence for sentence, _ in segments]),
+            }
+            mapping.update({str(i): pcm for i, (_, pcm) in enumerate(segments)})
+            async with self.binary.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.expiry)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis audio cache set error: {e}")
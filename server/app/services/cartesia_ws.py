@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import json
+import logging
+import uuid
+from typing import AsyncIterator, Optional
+
+from websockets.asyncio.client import ClientConnection, connect
+
+logger = logging.getLogger(__name__)
+
+
+class CartesiaStreamError(Exception):
+    """The websocket stream failed; unspoken_text() says what is left to synthesize."""
+
+
+class CartesiaTurnStream:
+    """
+    One Cartesia TTS websocket for one conversation turn.
+    All text of the turn goes to a single context_id with `continue: true`,
+    so the provider carries prosody across sentences and starts speaking
+    after the first few words. end() closes the context; audio() yields
+    PCM until the provider reports the context done.
+
+    Word timestamps are requested so that, if the stream fails, the text
+    whose audio never arrived can be handed to the HTTP fallback.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        voice_id: str,
+        url: str = "wss://api.cartesia.ai/tts/websocket",
+        model_id: str = "sonic-english",
+        version: str = "2024-06-10",
+        sample_rate: int = 16000,
+        connect_timeout: float = 5.0,
+    ):
+        """
+        Args:
+            api_key: Cartesia API key
+            voice_id: Voice used for the whole turn
+            url: Streaming TTS endpoint
+            model_id: Cartesia model
+            version: Cartesia-Version header
+            sample_rate: PCM output rate (16-bit mono)
+            connect_timeout: Seconds allowed for the websocket handshake
+        """
+        self.api_key = api_key
+        self.url = url
+        self.version = version
+        self.connect_timeout = connect_timeout
+        self.context_id = str(uuid.uuid4())
+        self._request = {
+            "model_id": model_id,
+            "voice": {"mode": "id", "id": voice_id},
+            "output_format": {"container": "raw", "encoding": "pcm_s16le", "sample_rate": sample_rate},
+            "context_id": self.context_id,
+            "add_timestamps": True,
+        }
+        self._ws: Optional[ClientConnection] = None
+        self._pushed: list[str] = []
+        self._spoken_words = 0
+        self._ended = False
+        self._done = False
+        self.audio_bytes = 0
+
+    async def start(self):
+        """Open the websocket. Raises on failure."""
+        self._ws = await asyncio.wait_for(
+            connect(
+                self.url,
+                additional_headers={"X-API-Key": self.api_key, "Cartesia-Version": self.version},
+                max_queue=64,
+            ),
+            timeout=self.connect_timeout,
+        )
+
+    async def push(self, text: str):
+        """Append text to the turn's context. Send whole words: the provider may mangle split ones."""
+        if not text or self._ended:
+            return
+        self._pushed.append(text)
+        await self._ws.send(json.dumps({**self._request, "transcript": text, "continue": True}))
+
+    async def end(self):
+        """No more text for this turn; the provider flushes and reports done."""
+        if self._ended:
+            return
+        self._ended = True
+        await self._ws.send(json.dumps({**self._request, "transcript": "", "continue": False}))
+
+    def unspoken_text(self) -> str:
+        """Pushed text past the last word the provider confirmed with a timestamp."""
+        words = " ".join(self._pushed).split()
+        return " ".join(words[self._spoken_words:])
+
+    async def audio(self) -> AsyncIterator[bytes]:
+        """Yield PCM until the context is done. Raises CartesiaStreamError on failure."""
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if message.get("context_id") not in (None, self.context_id):
+                    continue
+                kind = message.get("type")
+                if kind == "chunk":
+                    pcm = base64.b64decode(message["data"])
+                    self.audio_bytes += len(pcm)
+                    yield pcm
+                elif kind == "timestamps":
+                    self._spoken_words += len((message.get("word_timestamps") or {}).get("words") or [])
+                elif kind == "done":
+                    self._done = True
+                    return
+                elif kind == "error":
+                    raise CartesiaStreamError(message.get("error") or f"status {message.get('status_code')}")
+        except CartesiaStreamError:
+            raise
+        except Exception as e:
+            raise CartesiaStreamError(f"Cartesia stream lost: {e}") from e
+        raise CartesiaStreamError("Cartesia closed the stream before the turn was done")
+
+    async def aclose(self):
+        """Cancel the context if it is still generating and close the socket."""
+        if self._ws is None:
+            return
+        try:
+            if not self._done:
+                await self._ws.send(json.dumps({"context_id": self.context_id, "cancel": True}))
+            await self._ws.close()
+        except Exception as e:
+            logger.debug(f"Closing Cartesia stream: {e}")
+        self._ws = None
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from app.core.config import settings
+from app.services.deepgram_live import DeepgramLiveClient
+
+logger = logging.getLogger(__name__)
+
+
+async def _discard_transcript(transcript: str, is_final: bool):
+    # Pooled sockets carry no audio until a session binds its own callback
+    pass
+
+
+class UpstreamPool:
+    """
+    Process-wide warm pool of upstream connections, so connect and TLS
+    handshakes happen in the background instead of on a user's first utterance.
+
+    STT: keeps `stt_size` Deepgram live sockets open (asyncio backend only;
+    SDK streams block while connecting and hold threads). Sessions take one
+    with acquire_stt() and the pool refills behind them. Idle sockets get a
+    KeepAlive every refill tick so Deepgram does not time them out.
+
+    TTS: re-warms `tts_connections` connections per TTS host in TTSService's
+    keep-alive session before the idle timeout would drop them.
+    """
+
+    def __init__(
+        self,
+        http: aiohttp.ClientSession,
+        tts_urls: list[str],
+        stt_size: Optional[int] = None,
+        tts_connections: Optional[int] = None,
+        refill_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            http: TTSService's pooled session, where warmed connections must live
+            tts_urls: TTS endpoints whose hosts are kept warm
+            stt_size: Ready Deepgram live sockets to hold
+            tts_connections: Keep-alive connections to hold per TTS host
+            refill_interval: Seconds between maintenance passes
+        """
+        self.stt_size = settings.STT_POOL_SIZE if stt_size is None else stt_size
+        if settings.STT_BACKEND != "asyncio":
+            self.stt_size = 0
+        self.tts_connections = settings.TTS_WARM_CONNECTIONS if tts_connections is None else tts_connections
+        self.refill_interval = settings.UPSTREAM_POOL_REFILL_S if refill_interval is None else refill_interval
+        self.keepalive_timeout = settings.TTS_KEEPALIVE_S
+        # Scheme and host only: warming hits the origin, the path does not matter
+        self.tts_origins = sorted({f"{urlsplit(url).scheme}://{urlsplit(url).netloc}" for url in tts_urls})
+
+        self.http = http
+        self._ready: list[DeepgramLiveClient] = []
+        self._opening = 0
+        self._refill = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._last_tts_warm = 0.0
+
+        # Health counters
+        self.stt_hits = 0
+        self.stt_misses = 0
+        self.stt_connect_failures = 0
+        self.tts_warm_failures = 0
+
+    def start(self):
+        if self._worker is not None:
+            return
+        self._worker = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        ready, self._ready = self._ready, []
+        await asyncio.gather(*(client.aclose() for client in ready), return_exceptions=True)
+
+    def acquire_stt(self) -> Optional[DeepgramLiveClient]:
+        """
+        Take a connected Deepgram live socket, or None if none is ready
+        (the caller then connects itself). The caller must bind() its callbacks.
+        """
+        while self._ready:
+            client = self._ready.pop()
+            if client.is_open:
+                self.stt_hits += 1
+                self._refill.set()
+                return client
+        if self.stt_size:
+            self.stt_misses += 1
+        self._refill.set()
+        return None
+
+    def health(self) -> dict:
+        return {
+            "stt_ready": sum(1 for client in self._ready if client.is_open),
+            "stt_target": self.stt_size,
+            "stt_opening": self._opening,
+            "stt_hits": self.stt_hits,
+            "stt_misses": self.stt_misses,
+            "stt_connect_failures": self.stt_connect_failures,
+            "tts_hosts": self.tts_origins,
+            "tts_warm_connections": self.tts_connections,
+            "tts_last_warm_s": round(time.monotonic() - self._last_tts_warm, 1) if self._last_tts_warm else None,
+            "tts_warm_failures": self.tts_warm_failures,
+            "running": self._worker is not None and not self._worker.done(),
+        }
+
+    async def _maintain(self):
+        while True:
+            try:
+                self._prune_and_ping()
+                await asyncio.gather(self._fill_stt(), self._warm_tts())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Upstream pool maintenance failed: {e}")
+            self._refill.clear()
+            try:
+                # Wake early when a session took a socket
+                await asyncio.wait_for(self._refill.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _prune_and_ping(self):
+        alive = [client for client in self._ready if client.is_open]
+        dropped = len(self._ready) - len(alive)
+        if dropped:
+            logger.warning(f"Upstream pool dropped {dropped} dead STT socket(s)")
+        for client in alive:
+            client.keep_alive()
+        self._ready = alive
+
+    async def _fill_stt(self):
+        # Deferred import: stt_service pulls in the SDK and speech_recognition
+        from app.services.stt_service import live_options
+
+        missing = self.stt_size - len(self._ready) - self._opening
+        if missing <= 0:
+            return
+        self._opening += missing
+        try:
+            results = await asyncio.gather(
+                *(self._open_stt(live_options()) for _ in range(missing)), return_exceptions=True
+            )
+        finally:
+            self._opening -= missing
+        for client in results:
+            if isinstance(client, DeepgramLiveClient):
+                self._ready.append(client)
+            else:
+                self.stt_connect_failures += 1
+
+    async def _open_stt(self, options: dict) -> DeepgramLiveClient:
+        client = DeepgramLiveClient(
+            settings.DEEPGRAM_API_KEY,
+            _discard_transcript,
+            url=settings.DEEPGRAM_LIVE_URL,
+        )
+        if not await client.start(options):
+            raise ConnectionError("Deepgram live connect failed")
+        return client
+
+    async def _warm_tts(self):
+        # Re-warm at half the idle timeout, so warm connections never expire unused
+        if not self.tts_connections or time.monotonic() - self._last_tts_warm < self.keepalive_timeout / 2:
+            return
+        requests = [
+            self._warm_one(origin)
+            for origin in self.tts_origins
+            for _ in range(self.tts_connections)
+        ]
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        self.tts_warm_failures += sum(1 for result in results if isinstance(result, Exception))
+        self._last_tts_warm = time.monotonic()
+
+    async def _warm_one(self, origin: str):
+        # Any status will do: the point is the TCP/TLS connection left in the keep-alive pool
+        async with self.http.head(origin, timeout=aiohttp.ClientTimeout(total=5)) as response:
+            await response.read()
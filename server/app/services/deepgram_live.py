@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+import websockets
+from websockets.asyncio.client import ClientConnection, connect
+
+logger = logging.getLogger(__name__)
+
+# Control messages of the Deepgram live protocol
+_KEEP_ALIVE = json.dumps({"type": "KeepAlive"})
+_FINALIZE = json.dumps({"type": "Finalize"})
+_CLOSE_STREAM = json.dumps({"type": "CloseStream"})
+
+
+class DeepgramLiveClient:
+    """
+    Deepgram live transcription over a websocket driven by the event loop.
+    Replaces the SDK's threaded client (which holds OS threads per stream)
+    with one reader and one writer task. The surface mirrors the parts of the
+    SDK client STTService uses: send / keep_alive / finalize / finish are
+    non-blocking and queue their message for the writer task.
+
+    If the socket drops unexpectedly, or the reader or writer fails, the
+    client reconnects with exponential backoff; `on_error` is called only
+    when reconnecting gives up. A malformed message is logged and skipped.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        on_transcript: Callable[[str, bool], Awaitable[None]],
+        on_error: Optional[Callable[[Exception], None]] = None,
+        url: str = "wss://api.deepgram.com/v1/listen",
+        max_reconnects: int = 3,
+        reconnect_delay: float = 0.5,
+        max_queued: int = 200,
+    ):
+        """
+        Args:
+            api_key: Deepgram API key
+            on_transcript: Awaited with (transcript, is_final) for every non-empty result
+            on_error: Called once the connection is lost for good
+            url: Live transcription endpoint
+            max_reconnects: Reconnect attempts after an unexpected close
+            reconnect_delay: First reconnect delay in seconds, doubled per attempt
+            max_queued: Messages held while (re)connecting before audio is dropped
+        """
+        self.api_key = api_key
+        self.on_transcript = on_transcript
+        self.on_error = on_error
+        self.url = url
+        self.max_reconnects = max_reconnects
+        self.reconnect_delay = reconnect_delay
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._ws: Optional[ClientConnection] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._uri = url
+        self._finishing = False
+        self.dropped = 0
+
+    async def start(self, options: dict) -> bool:
+        """Open the stream with the given live options. False if the first connect fails."""
+        self._uri = f"{self.url}?{urlencode(_query_params(options))}"
+        try:
+            self._ws = await self._connect()
+        except Exception as e:
+            logger.error(f"Deepgram live connect failed: {e}")
+            return False
+        self._runner = asyncio.create_task(self._run())
+        return True
+
+    @property
+    def is_open(self) -> bool:
+        """True while the stream is connected (or reconnecting) and not finishing."""
+        return self._runner is not None and not self._runner.done() and not self._finishing
+
+    def bind(
+        self,
+        on_transcript: Callable[[str, bool], Awaitable[None]],
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """Point an already open stream (e.g. one taken from the warm pool) at new callbacks."""
+        self.on_transcript = on_transcript
+        self.on_error = on_error
+
+    def send(self, data) -> bool:
+        """Queue audio. Copies the payload, so callers may reuse their buffer."""
+        return self._enqueue(bytes(data))
+
+    def keep_alive(self) -> bool:
+        return self._enqueue(_KEEP_ALIVE)
+
+    def finalize(self) -> bool:
+        return self._enqueue(_FINALIZE)
+
+    def finish(self) -> bool:
+        """Ask Deepgram to flush and close the stream; returns without waiting."""
+        if self._finishing:
+            return False
+        self._finishing = True
+        if self._outbox.full():
+            # CloseStream must not be dropped: make room by discarding the oldest message
+            self._outbox.get_nowait()
+            self.dropped += 1
+        self._outbox.put_nowait(_CLOSE_STREAM)
+        return True
+
+    async def aclose(self, timeout: float = 2.0):
+        """finish() and wait for the server to close the stream."""
+        self.finish()
+        if self._runner is None:
+            return
+        done, _ = await asyncio.wait({self._runner}, timeout=timeout)
+        if not done:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+
+    def _enqueue(self, message) -> bool:
+        if self._finishing:
+            return False
+        try:
+            self._outbox.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            # Only while the socket is stalled or reconnecting: prefer fresh audio
+            self.dropped += 1
+            return False
+
+    async def _connect(self) -> ClientConnection:
+        return await connect(
+            self._uri,
+            additional_headers={"Authorization": f"Token {self.api_key}"},
+            max_queue=64,
+        )
+
+    async def _run(self):
+        error: Exception = ConnectionError("Deepgram live stream stopped")
+        try:
+            while True:
+                error = await self._serve(self._ws)
+                if self._finishing:
+                    return
+                self._ws = await self._reconnect(error)
+                if self._ws is None:
+                    break
+        except Exception as e:
+            # Never end silently: whatever stops the stream reaches on_error
+            logger.error(f"Deepgram live stream failed: {e}", exc_info=True)
+            error = e
+        if self.on_error:
+            self.on_error(error)
+
+    async def _serve(self, ws: ClientConnection) -> Exception:
+        """Pump one connection until it closes or fails; returns why it stopped."""
+        reader = asyncio.create_task(self._read(ws))
+        writer = asyncio.create_task(self._write(ws))
+        try:
+            await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
+            if not reader.done() and writer.exception() is None:
+                # CloseStream went out: read until Deepgram closes the stream
+                await asyncio.wait({reader})
+            for task in (reader, writer):
+                if task.done() and task.exception() is not None:
+                    error = task.exception()
+                    if not isinstance(error, websockets.ConnectionClosed):
+                        logger.error(f"Deepgram live stream failed: {error!r}", exc_info=error)
+                    return error
+            return ConnectionError("Deepgram closed the stream")
+        finally:
+            for task in (reader, writer):
+                task.cancel()
+            await asyncio.gather(reader, writer, return_exceptions=True)
+            # A failed reader or writer leaves the socket open
+            await ws.close()
+
+    async def _reconnect(self, error: Exception) -> Optional[ClientConnection]:
+        for attempt in range(self.max_reconnects):
+            delay = self.reconnect_delay * 2 ** attempt
+            logger.warning(f"Deepgram live stream dropped ({error}), reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            try:
+                return await self._connect()
+            except Exception as e:
+                error = e
+        logger.error(f"Deepgram live stream lost: {error}")
+        return None
+
+    async def _write(self, ws: ClientConnection):
+        while True:
+            message = await self._outbox.get()
+            # A message that fails here is lost with the connection
+            await ws.send(message)
+            if message is _CLOSE_STREAM:
+                return
+
+    async def _read(self, ws: ClientConnection):
+        async for raw in ws:
+            if not isinstance(raw, str):
+                continue
+            try:
+                message = json.loads(raw)
+                kind = message.get("type")
+                if kind == "Results":
+                    alternatives = message.get("channel", {}).get("alternatives") or [{}]
+                    transcript = alternatives[0].get("transcript", "")
+                    is_final = bool(message.get("is_final"))
+                else:
+                    transcript = ""
+            except (ValueError, AttributeError, TypeError, IndexError) as e:
+                logger.error(f"Skipping malformed Deepgram message ({e}): {raw[:200]}")
+                continue
+            if kind == "Error":
+                logger.error(f"Deepgram error: {message}")
+            if transcript:
+                try:
+                    await self.on_transcript(transcript, is_final)
+                except Exception as e:
+                    logger.error(f"STT callback error: {e}", exc_info=True)
+
+
+def _query_params(options: dict) -> dict:
+    """Live options as Deepgram query parameters (booleans as true/false, None omitted)."""
+    params = {}
+    for key, value in options.items():
+        if value is None:
+            continue
+        params[key] = str(value).lower() if isinstance(value, bool) else value
+    return params
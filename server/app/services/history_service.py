@@ -1,14 +1,17 @@
 import redis.asyncio as redis
 import json
 from app.core.config import settings
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 class HistoryService:
-    def __init__(self):
-        self.pool = redis.ConnectionPool.from_url(settings.REDIS_URL, decode_responses=True, max_connections=10)
-        self.redis = redis.Redis(connection_pool=self.pool)
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        if redis_client is None:
+            self.pool = redis.ConnectionPool.from_url(settings.REDIS_URL, decode_responses=True, max_connections=10)
+            redis_client = redis.Redis(connection_pool=self.pool)
+        self.redis = redis_client
         self.expiry = 3600 # 1 hour session expiry
 
     async def add_message(self, session_id: str, role: str, content: str):
@@ -19,6 +22,20 @@ class HistoryService:
         except Exception as e:
             logger.error(f"Redis add_message error: {e}")
 
+    async def add_messages(self, messages: list[tuple[str, str, str]]):
+        """Append (session_id, role, content) messages in one pipelined round-trip."""
+        if not messages:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for session_id, role, content in messages:
+                    pipe.rpush(f"session:{session_id}", json.dumps({"role": role, "content": content}))
+                for session_id in {m[0] for m in messages}:
+                    pipe.expire(f"session:{session_id}", self.expiry)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis add_messages error: {e}")
+
     async def get_history(self, session_id: str, limit: int = 10):
         try:
             messages = await self.redis.lrange(f"session:{session_id}", -limit, -1)
@@ -0,0 +1,340 @@
+import asyncio
+import itertools
+import logging
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.services.vad_service import SpeechGate, VADService
+from app.utils.audio_utils import StreamingAudioProcessor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestResult:
+    # True if any frame completed by the chunk is speech
+    is_speech: bool
+    # Audio to forward upstream (whole VAD frames); empty when the gate held it back
+    # or the chunk completed no frame
+    audio: bytes
+    # VAD decision for each frame the chunk completed, oldest first
+    frames: list[bool] = field(default_factory=list)
+    frame_ms: float = 0.0
+
+
+class IngestPipeline:
+    """
+    Per-connection ingest chain: VAD on the raw audio, optional speech gate,
+    then noise suppression on whatever is forwarded. Audio is re-framed into
+    fixed VAD frames first, so gating, endpointing and the DSP see the same
+    frames whatever the client's packet size.
+    Purely synchronous so it can run inline or on a worker thread.
+    """
+
+    def __init__(self, vad_service: VADService, audio_processor: StreamingAudioProcessor, speech_gate: Optional[SpeechGate] = None):
+        self.vad_service = vad_service
+        self.audio_processor = audio_processor
+        self.speech_gate = speech_gate
+
+    @classmethod
+    def create(cls, vad_mode: int = 1, sample_rate: int = 16000, gated: bool = False) -> "IngestPipeline":
+        speech_gate = None
+        if gated:
+            speech_gate = SpeechGate(
+                hangover_ms=settings.VAD_HANGOVER_MS,
+                preroll_ms=settings.VAD_PREROLL_MS,
+                sample_rate=sample_rate,
+            )
+        return cls(VADService(mode=vad_mode, sample_rate=sample_rate), StreamingAudioProcessor(sample_rate=sample_rate), speech_gate)
+
+    def spec(self) -> tuple[int, int, bool]:
+        """Arguments that rebuild an equivalent pipeline inside a worker process."""
+        return (self.vad_service.mode, self.vad_service.sample_rate, self.speech_gate is not None)
+
+    def process(self, raw_audio: bytes) -> IngestResult:
+        frames = self.vad_service.classify(raw_audio)
+        decisions = [speech for _, speech in frames]
+        result = IngestResult(is_speech=any(decisions), audio=b"", frames=decisions, frame_ms=self.vad_service.frame_duration_ms)
+        if not frames:
+            return result
+        if self.speech_gate is None:
+            result.audio = self.audio_processor.process(b"".join(frame for frame, _ in frames))
+            return result
+
+        # Runs of forwarded audio; the filters restart wherever the gate reopens after a gap
+        runs: list[tuple[bool, list[bytes]]] = []
+        for frame, speech in frames:
+            was_open = self.speech_gate.is_open
+            forwarded = self.speech_gate.update(frame, speech)
+            if not forwarded:
+                # Silence is neither filtered nor uploaded
+                continue
+            if not was_open or not runs:
+                runs.append((not was_open, []))
+            runs[-1][1].extend(forwarded)
+        audio = []
+        for reopened, chunks in runs:
+            if reopened:
+                self.audio_processor.reset()
+            audio.append(self.audio_processor.process(b"".join(chunks)))
+        result.audio = b"".join(audio)
+        return result
+
+
+class InlineIngestChannel:
+    """Runs the pipeline on the event loop as each frame arrives (default mode)."""
+
+    def __init__(self, pipeline: IngestPipeline, on_result: Callable[[IngestResult], Awaitable[None]]):
+        self.pipeline = pipeline
+        self.on_result = on_result
+
+    async def submit(self, raw_audio: bytes):
+        await self.on_result(self.pipeline.process(raw_audio))
+
+    async def aclose(self):
+        pass
+
+
+class PooledIngestChannel:
+    """
+    A connection's handle on the IngestWorkerPool.
+    Frames are processed strictly in arrival order and results are delivered
+    to `on_result` in that same order by a per-connection consumer task.
+    At most `pool.max_pending` frames wait for a worker; when the pool falls
+    behind, the oldest are dropped so the stream stays real-time.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, pool: "IngestWorkerPool", pipeline: IngestPipeline, on_result: Callable[[IngestResult], Awaitable[None]], shard: int = 0):
+        self.pool = pool
+        self.pipeline = pipeline
+        self.on_result = on_result
+        self.key = next(self._ids)
+        # Worker process that owns this connection's filter/VAD state (process mode)
+        self.shard = shard
+        # Frames not yet handed to a worker, and whether a worker currently owns this channel
+        self.pending: list[tuple[bytes, asyncio.Future]] = []
+        self.busy = False
+        self.dropped = 0
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def submit(self, raw_audio: bytes):
+        future = asyncio.get_running_loop().create_future()
+        if len(self.pending) >= self.pool.max_pending:
+            # The consumer skips cancelled futures, so the dropped frame is never delivered
+            _, oldest = self.pending.pop(0)
+            oldest.cancel()
+            self.dropped += 1
+            self.pool.frames_dropped += 1
+            if self.dropped == 1:
+                logger.warning(f"Ingest channel {self.key} fell behind, dropping oldest frames")
+        self.pending.append((raw_audio, future))
+        self._results.put_nowait(future)
+        self.pool._schedule(self)
+
+    async def aclose(self):
+        self.pending.clear()
+        self._consumer.cancel()
+        await asyncio.gather(self._consumer, return_exceptions=True)
+        self.pool._release(self)
+
+    async def _consume(self):
+        while True:
+            future = await self._results.get()
+            await asyncio.wait({future})
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                logger.error(f"Ingest worker error: {future.exception()}")
+                continue
+            try:
+                await self.on_result(future.result())
+            except Exception as e:
+                logger.error(f"Ingest result handler error: {e}")
+
+
+class IngestWorkerPool:
+    """
+    Process-wide worker pool for ingest DSP and VAD.
+    Frames from many connections are collected for a short linger window and
+    dispatched to workers in batches, so the event loop never does per-frame
+    numeric work. A connection is owned by at most one worker at a time, which
+    keeps its stateful filters and VAD consistent and its frames in order.
+
+    Thread mode shares the pipelines with the event loop; process mode pins each
+    connection to one worker process that holds its pipeline state, which avoids
+    GIL contention with the event loop entirely.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: Optional[int] = None,
+        linger_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.mode = mode
+        self.workers = workers or settings.INGEST_WORKERS
+        self.linger = (settings.INGEST_BATCH_LINGER_MS if linger_ms is None else linger_ms) / 1000
+        self.max_batch = max_batch or settings.INGEST_MAX_BATCH
+        self.max_pending = max_pending or settings.INGEST_MAX_PENDING
+        self._executors: list[Executor] = []
+        self._ready: deque[PooledIngestChannel] = deque()
+        self._wakeup = asyncio.Event()
+        self._collector: Optional[asyncio.Task] = None
+        self._next_shard = itertools.count()
+        self.frames_processed = 0
+        self.batches_dispatched = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        if self._collector is not None:
+            return
+        if self.mode == "process":
+            # One single-process executor per shard, so a connection always lands on the same process
+            self._executors = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers)]
+        else:
+            self._executors = [ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest")]
+        self._collector = asyncio.create_task(self._collect())
+        logger.info(f"Ingest worker pool started (mode={self.mode}, workers={self.workers})")
+
+    async def close(self):
+        if self._collector:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+            self._collector = None
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = []
+
+    def channel(self, pipeline: IngestPipeline, on_result: Callable[[IngestResult], Awaitable[None]]) -> PooledIngestChannel:
+        shard = next(self._next_shard) % self.workers if self.mode == "process" else 0
+        return PooledIngestChannel(self, pipeline, on_result, shard=shard)
+
+    def _release(self, channel: PooledIngestChannel):
+        """Drop a closed connection's pipeline state from its worker process."""
+        if self.mode == "process" and self._executors:
+            try:
+                self._executors[channel.shard].submit(_drop_pipelines, [channel.key])
+            except RuntimeError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "frames_processed": self.frames_processed,
+            "batches_dispatched": self.batches_dispatched,
+            "frames_dropped": self.frames_dropped,
+            "channels_waiting": len(self._ready),
+        }
+
+    def _schedule(self, channel: PooledIngestChannel):
+        if not channel.busy and channel not in self._ready:
+            self._ready.append(channel)
+            self._wakeup.set()
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            if self.linger:
+                # Let frames from other connections join this batch
+                await asyncio.sleep(self.linger)
+            self._wakeup.clear()
+
+            jobs = []
+            while self._ready and len(jobs) < self.max_batch:
+                channel = self._ready.popleft()
+                if channel.busy or not channel.pending:
+                    continue
+                channel.busy = True
+                frames, channel.pending = channel.pending, []
+                jobs.append((channel, frames))
+            if self._ready:
+                self._wakeup.set()
+            if not jobs:
+                continue
+
+            for group, call, work in self._partition(jobs):
+                future = loop.run_in_executor(self._executors[group[0][0].shard], call, work)
+                future.add_done_callback(lambda f, group=group: self._complete(group, f))
+            self.batches_dispatched += 1
+
+    def _partition(self, jobs: list) -> list:
+        """Split collected jobs into (group, worker function, payload) executor calls."""
+        calls = []
+        if self.mode == "process":
+            by_shard: dict[int, list] = {}
+            for job in jobs:
+                by_shard.setdefault(job[0].shard, []).append(job)
+            for group in by_shard.values():
+                work = [(channel.key, channel.pipeline.spec(), [raw for raw, _ in frames]) for channel, frames in group]
+                calls.append((group, _run_process_batch, work))
+        else:
+            # Spread the batch over the workers: one executor call per group of connections
+            group_size = -(-len(jobs) // self.workers)
+            for start in range(0, len(jobs), group_size):
+                group = jobs[start:start + group_size]
+                work = [(channel.pipeline, [raw for raw, _ in frames]) for channel, frames in group]
+                calls.append((group, _run_batch, work))
+        return calls
+
+    def _complete(self, group, batch_future: asyncio.Future):
+        cancelled = batch_future.cancelled()
+        error = None if cancelled else batch_future.exception()
+        outputs = None if cancelled or error else batch_future.result()
+        for index, (channel, frames) in enumerate(group):
+            results = error if outputs is None else outputs[index]
+            for frame_index, (_, future) in enumerate(frames):
+                if future.done():
+                    continue
+                if cancelled:
+                    future.cancel()
+                elif isinstance(results, Exception):
+                    future.set_exception(results)
+                else:
+                    future.set_result(results[frame_index])
+            self.frames_processed += len(frames)
+            channel.busy = False
+            if channel.pending:
+                self._schedule(channel)
+
+
+def _run_batch(work: list[tuple[IngestPipeline, list[bytes]]]) -> list:
+    """Worker-thread entry point: process each connection's frames in order."""
+    outputs = []
+    for pipeline, frames in work:
+        try:
+            outputs.append([pipeline.process(raw) for raw in frames])
+        except Exception as e:
+            outputs.append(e)
+    return outputs
+
+
+# Pipelines owned by this worker process (process mode), keyed by channel
+_WORKER_PIPELINES: dict[int, IngestPipeline] = {}
+
+
+def _run_process_batch(work: list[tuple[int, tuple[int, int, bool], list[bytes]]]) -> list:
+    """Worker-process entry point: same as _run_batch, with pipelines held in the worker."""
+    outputs = []
+    for key, spec, frames in work:
+        pipeline = _WORKER_PIPELINES.get(key)
+        if pipeline is None:
+            pipeline = _WORKER_PIPELINES[key] = IngestPipeline.create(*spec)
+        try:
+            outputs.append([pipeline.process(raw) for raw in frames])
+        except Exception as e:
+            outputs.append(e)
+    return outputs
+
+
+def _drop_pipelines(keys: list[int]):
+    for key in keys:
+        _WORKER_PIPELINES.pop(key, None)
@@ -1,20 +1,106 @@
 from groq import AsyncGroq
 import google.generativeai as genai
 from app.core.config import settings
-from app.services.search_service import SearchService
+from app.services.search_service import SearchService, has_results
 from app.services.cache_service import CacheService
+from app.services.semantic_cache import SemanticCache
+from app.services.single_flight import SingleFlight
+from app.utils.metrics import LatencyWindow
+from app.utils.text_normalization import normalize_query
+from app.models.conversation import ConversationState
+from dataclasses import dataclass
+from typing import Optional
 import logging
 import re
 import asyncio
+import time
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class CachedTurn:
+    """A cached response, with its synthesized sentence audio when that was stored too."""
+
+    text: str
+    segments: Optional[list[tuple[str, bytes]]] = None
+
+
+@dataclass
+class ResponseOutcome:
+    """Filled in by get_response: whether the answer was stored in the response cache."""
+
+    cached: bool = False
+
+
+class _DraftStream:
+    """
+    An LLM stream started ahead of its consumer. Tokens buffer until they are
+    taken with chunks(), or the draft is dropped with cancel().
+    """
+
+    def __init__(self, stream):
+        self.started_at = time.perf_counter()
+        self.first_token_ms: Optional[float] = None
+        self.buffered = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._pump(stream))
+
+    async def _pump(self, stream):
+        try:
+            async for chunk in stream:
+                if self.first_token_ms is None:
+                    self.first_token_ms = (time.perf_counter() - self.started_at) * 1000
+                self.buffered += 1
+                self._queue.put_nowait(chunk)
+            self._queue.put_nowait(None)
+        except Exception as e:
+            self._queue.put_nowait(e)
+
+    async def chunks(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self):
+        self._task.cancel()
+
+
 class LLMService:
-    def __init__(self):
-        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
-        self.search_service = SearchService()
-        self.cache_service = CacheService()
-        self.response_mode = "planning"  # Default mode: faster, planning, or detailed
+    """
+    Stateless LLM pipeline shared by all connections.
+    Per-connection settings (system prompt, response mode) live in ConversationState.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncGroq] = None,
+        search_service: Optional[SearchService] = None,
+        cache_service: Optional[CacheService] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        self.client = client or AsyncGroq(api_key=settings.GROQ_API_KEY)
+        self.search_service = search_service or SearchService()
+        self.cache_service = cache_service or CacheService()
+        # Optional paraphrase-tolerant tier behind the exact response cache
+        self.semantic_cache = semantic_cache
+        # Shares one Groq stream between concurrent identical requests
+        self.single_flight = single_flight
+
+        # Planning mode: how long a draft answer waits for search results, and
+        # searches that outlived their turn (kept running to fill the search cache)
+        self.search_budget = settings.PLANNING_SEARCH_BUDGET_S
+        self._background_searches: set[asyncio.Task] = set()
+        self.planning_branches = {"search_cached": 0, "grounded": 0, "draft": 0}
+        self.planning_late_results = 0
+        self.planning_discarded_chunks = 0
+        self.planning_search_latency = LatencyWindow()
+        self.planning_draft_first_token = LatencyWindow()
         
         # Initialize Gemini for fallback
         if settings.GOOGLE_API_KEY:
@@ -22,12 +108,6 @@ class LLMService:
             self.gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
         else:
             self.gemini_model = None
-
-        # Simplified system prompt (no search instructions needed)
-        self.system_prompt = (
-            "You are a helpful and concise voice assistant. Give short, conversational answers suitable for real-time speech. "
-            "Keep responses under 2-3 sentences for better voice delivery."
-        )
         
         # Convert keywords to set for O(1) lookup (optimization)
         self.search_keywords = {
@@ -102,19 +182,63 @@ class LLMService:
         logger.info(f"No search needed for query: '{query}'")
         return False
 
-    def set_system_prompt(self, prompt: str):
-        self.system_prompt = prompt
-        logger.info(f"System prompt updated: {prompt[:50]}...")
-    
-    def set_response_mode(self, mode: str):
-        """Set the response mode for query processing."""
-        if mode in ["faster", "planning", "detailed"]:
-            self.response_mode = mode
-            logger.info(f"Response mode set to: {mode}")
-        else:
-            logger.warning(f"Invalid response mode: {mode}")
+    async def get_cached_turn(
+        self,
+        user_input: str,
+        history: list,
+        state: ConversationState,
+        audio_format: str = "",
+    ) -> Optional[CachedTurn]:
+        """
+        Look up a whole cached turn before generating, so a hit can replay text and audio
+        immediately. Same conditions as the response cache: only queries without history.
+        """
+        if history or not user_input:
+            return None
+        text = await self.cache_service.get_cached_response(user_input, state.system_prompt)
+        if not text:
+            return None
+        segments = None
+        if audio_format:
+            segments = await self.cache_service.get_cached_audio(user_input, text, state.system_prompt, audio_format)
+        logger.info(f"Cache hit for query: {user_input} (audio: {'yes' if segments else 'no'})")
+        return CachedTurn(text=text, segments=segments)
+
+    async def cache_turn_audio(
+        self,
+        user_input: str,
+        history: list,
+        state: ConversationState,
+        response: str,
+        segments: list[tuple[str, bytes]],
+        audio_format: str,
+    ):
+        """Attach sentence audio to a response that get_response just cached (see ResponseOutcome)."""
+        if history or not segments:
+            return
+        await self.cache_service.set_cached_audio(user_input, response, segments, state.system_prompt, audio_format)
+
+    async def get_response(
+        self,
+        user_input: str,
+        history: list = [],
+        metrics_tracker=None,
+        state: Optional[ConversationState] = None,
+        cache_checked: bool = False,
+        outcome: Optional[ResponseOutcome] = None,
+    ):
+        """
+        Stream the answer to `user_input`.
 
-    async def get_response(self, user_input: str, history: list = [], metrics_tracker=None):
+        Args:
+            cache_checked: The caller already missed the response cache (get_cached_turn); skip that lookup
+            outcome: Set to cached=True once the answer is stored in the response cache
+        """
+        if state is None:
+            state = ConversationState()
+        system_prompt = state.system_prompt
+        response_mode = state.response_mode
+        
         if not user_input or not isinstance(user_input, str):
             logger.warning("Empty or invalid user input received")
             yield "I didn't catch that. Could you please repeat?"
@@ -124,81 +248,47 @@ class LLMService:
             history = []
         
         # Check cache first (only for queries without history)
-        if not history:
-            cached = await self.cache_service.get_cached_response(user_input, self.system_prompt)
+        if not history and not cache_checked:
+            cached = await self.cache_service.get_cached_response(user_input, system_prompt)
             if cached:
                 logger.info(f"Cache hit for query: {user_input}")
                 yield cached
                 return
 
+        # Time-sensitive queries (weather, news, prices...) are never answered from the semantic cache
+        time_sensitive = self._needs_web_search(user_input)
+        if not history and self.semantic_cache is not None and not time_sensitive:
+            similar = self.semantic_cache.lookup(user_input, system_prompt)
+            if similar:
+                yield similar
+                return
+
         # Mode-based decision: determine if we need web search
-        if self.response_mode == "faster":
+        if response_mode == "faster":
             # Faster mode: Skip search entirely, go direct to LLM
             needs_search = False
-        elif self.response_mode in ["planning", "detailed"]:
-            # Planning/Detailed mode: Use pre-classification logic
-            needs_search = self._needs_web_search(user_input)
         else:
-            # Default to planning behavior
-            needs_search = self._needs_web_search(user_input)
+            # Planning/Detailed (and default) mode: use pre-classification logic
+            needs_search = time_sensitive
         
         if needs_search:
             # Get mode config
-            config = self.mode_config.get(self.response_mode, self.mode_config["planning"])
+            config = self.mode_config.get(response_mode, self.mode_config["planning"])
             max_results = config["search_results"]
             
-            # PLANNING MODE: Parallel Search + LLM for faster response
-            if self.response_mode == "planning":
+            # PLANNING MODE: search and a draft LLM answer race (see _planning_response)
+            if response_mode == "planning":
                 yield f"[STATUS: Searching...]"
                 try:
-                    # Track search timing
-                    if metrics_tracker:
-                        metrics_tracker.start_timing("search_latency")
-                    
-                    # Start search and LLM in parallel
-                    search_task = asyncio.create_task(self.search_service.search(user_input, max_results=max_results))
-                    
-                    # Build messages for LLM (without search results first)
-                    messages = [{"role": "system", "content": self.system_prompt}]
-                    messages.extend(history)
-                    messages.append({"role": "user", "content": user_input})
-                    
-                    # Start LLM streaming immediately
-                    llm_started = False
-                    full_response = ""
-                    
-                    # Wait for search with timeout
-                    try:
-                        search_results = await asyncio.wait_for(search_task, timeout=0.8)  # 800ms timeout
-                        if metrics_tracker:
-                            metrics_tracker.stop_timing("search_latency")
-                        
-                        # If search completes quickly, use it
-                        if search_results and not llm_started:
-                            messages.append({"role": "system", "content": f"Search Results:\n{search_results[:2000]}"})
-                            logger.info(f"Search completed in time, using results")
-                    except asyncio.TimeoutError:
-                        # Search taking too long, proceed without it
-                        logger.info(f"Search timeout, proceeding with LLM only")
-                        if metrics_tracker:
-                            metrics_tracker.stop_timing("search_latency")
-                    
-                    # Stream LLM response
-                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker):
-                        full_response += chunk
+                    async for chunk in self._planning_response(user_input, history, system_prompt, config, metrics_tracker, response_mode, outcome):
                         yield chunk
-                    
-                    # Cache the response
-                    if not history and full_response:
-                        await self.cache_service.set_cached_response(user_input, full_response, self.system_prompt)
-                        
                 except Exception as e:
                     logger.error(f"Parallel search flow failed: {e}")
                     # Fallback to direct LLM
-                    messages = [{"role": "system", "content": self.system_prompt}]
+                    messages = [{"role": "system", "content": system_prompt}]
                     messages.extend(history)
                     messages.append({"role": "user", "content": user_input})
-                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker):
+                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode):
                         yield chunk
             else:
                 # DETAILED MODE: Sequential search (wait for complete results)
@@ -217,45 +307,47 @@ class LLMService:
                     logger.info(f"Search completed, results length: {len(raw_results)} chars")
                     
                     # Build messages with search results
-                    messages = [{"role": "system", "content": self.system_prompt}]
+                    messages = [{"role": "system", "content": system_prompt}]
                     messages.extend(history)
                     messages.append({"role": "system", "content": f"Search Results for '{user_input}':\n{search_results}\n\nAnswer the user's question using these search results."})
                     messages.append({"role": "user", "content": user_input})
                     
                     # Generate response with search results
                     full_response = ""
-                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker):
+                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode):
                         full_response += chunk
                         yield chunk
                     
                     # Cache the response
                     if not history and full_response:
-                        await self.cache_service.set_cached_response(user_input, full_response, self.system_prompt)
+                        await self._cache_response(user_input, full_response, system_prompt, outcome)
                         
                 except Exception as e:
                     logger.error(f"Search flow failed: {e}")
                     # Fallback to regular LLM response
-                    messages = [{"role": "system", "content": self.system_prompt}]
+                    messages = [{"role": "system", "content": system_prompt}]
                     messages.extend(history)
                     messages.append({"role": "user", "content": user_input})
-                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker):
+                    async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode):
                         yield chunk
         else:
             # Regular path: Direct LLM response (no search needed)
-            config = self.mode_config.get(self.response_mode, self.mode_config["planning"])
-            messages = [{"role": "system", "content": self.system_prompt}]
+            config = self.mode_config.get(response_mode, self.mode_config["planning"])
+            messages = [{"role": "system", "content": system_prompt}]
             messages.extend(history)
             messages.append({"role": "user", "content": user_input})
             
             try:
                 full_response = ""
-                async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker):
+                async for chunk in self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode):
                     full_response += chunk
                     yield chunk
                 
                 # Cache the response
                 if not history and full_response:
-                    await self.cache_service.set_cached_response(user_input, full_response, self.system_prompt)
+                    await self._cache_response(user_input, full_response, system_prompt, outcome)
+                    if self.semantic_cache is not None and not time_sensitive:
+                        self.semantic_cache.add(user_input, full_response, system_prompt)
                     
             except Exception as e:
                 logger.error(f"Groq primary flow failed, attempting fallback: {e}")
@@ -265,13 +357,125 @@ class LLMService:
                 else:
                     yield "I'm sorry, I'm having trouble processing that right now."
 
-    async def _stream_groq_response(self, messages, max_tokens=None, metrics_tracker=None):
+    async def _planning_response(self, user_input, history, system_prompt, config, metrics_tracker, response_mode, outcome=None):
+        """
+        Planning mode: start the search and, unless it is answered from the
+        search cache, an ungrounded draft generation at the same time. The
+        draft buffers instead of being spoken (spoken text can't be taken
+        back) until the search returns or the budget runs out:
+
+        - results within the budget: drop the draft, stream a grounded answer
+        - budget exceeded or search failed: release the draft, already ahead
+          by the time it had to wait. A search still in flight keeps running
+          in the background so its result is in the search cache next turn.
+          The draft is not put in the response cache, so that next turn
+          answers from the search instead.
+
+        Per-turn timings go to metrics_tracker, process-wide ones to stats().
+        """
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(history)
+        messages.append({"role": "user", "content": user_input})
+        start = time.perf_counter()
+
+        search_task = asyncio.create_task(self.search_service.search(user_input, max_results=config["search_results"]))
+        search_task.add_done_callback(lambda task: self._on_planning_search_done(task, start))
+        # A cached search finishes on its first step; then no draft is needed
+        await asyncio.sleep(0)
+        draft = None
+        if not search_task.done():
+            draft = _DraftStream(self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode))
+
+        try:
+            await asyncio.wait({search_task}, timeout=self.search_budget)
+            decision_ms = (time.perf_counter() - start) * 1000
+            search_results = None
+            if search_task.done() and not search_task.cancelled() and search_task.exception() is None:
+                search_results = search_task.result()
+
+            if has_results(search_results):
+                branch = "grounded" if draft else "search_cached"
+                if draft:
+                    draft.cancel()
+                    self.planning_discarded_chunks += draft.buffered
+                logger.info(f"Search completed in {decision_ms:.0f}ms, using results")
+                messages.append({"role": "system", "content": f"Search Results:\n{search_results[:2000]}"})
+                stream = self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode)
+            else:
+                branch = "draft"
+                if not search_task.done():
+                    logger.info(f"Search exceeded {self.search_budget * 1000:.0f}ms budget, answering without it")
+                    self._background_searches.add(search_task)
+                    search_task.add_done_callback(self._background_searches.discard)
+                if draft is None:
+                    # Search failed on its first step: nothing was drafted
+                    draft = _DraftStream(self._stream_groq_response(messages, max_tokens=config["max_tokens"], metrics_tracker=metrics_tracker, response_mode=response_mode))
+                stream = draft.chunks()
+
+            self.planning_branches[branch] += 1
+            if metrics_tracker:
+                metrics_tracker.planning_branch = branch
+                # Time until the branch was chosen: the search time, capped at the budget
+                metrics_tracker.record_timing("search_latency", decision_ms)
+
+            full_response = ""
+            async for chunk in stream:
+                full_response += chunk
+                yield chunk
+
+            if draft and draft.first_token_ms is not None:
+                self.planning_draft_first_token.record(draft.first_token_ms)
+                if metrics_tracker:
+                    metrics_tracker.record_timing("draft_first_token", draft.first_token_ms)
+
+            # Cache the response (grounded answers only)
+            if branch != "draft" and not history and full_response:
+                await self._cache_response(user_input, full_response, system_prompt, outcome)
+        finally:
+            if draft:
+                draft.cancel()
+            # Orphaned by a cancelled turn or an error: nobody will read it
+            if not search_task.done() and search_task not in self._background_searches:
+                search_task.cancel()
+
+    async def _cache_response(self, user_input: str, response: str, system_prompt: str, outcome: Optional[ResponseOutcome]):
+        await self.cache_service.set_cached_response(user_input, response, system_prompt)
+        if outcome is not None:
+            outcome.cached = True
+
+    def _on_planning_search_done(self, task: asyncio.Task, start: float):
+        if task.cancelled():
+            return
+        self.planning_search_latency.record((time.perf_counter() - start) * 1000)
+        if task in self._background_searches and task.exception() is None and has_results(task.result()):
+            self.planning_late_results += 1
+
+    def stats(self) -> dict:
+        """Planning-mode outcomes and timings, for tuning PLANNING_SEARCH_BUDGET_S."""
+        return {
+            "search_budget_ms": self.search_budget * 1000,
+            "branches": dict(self.planning_branches),
+            "background_searches": len(self._background_searches),
+            "late_results_cached": self.planning_late_results,
+            "discarded_draft_chunks": self.planning_discarded_chunks,
+            "search_latency": self.planning_search_latency.percentiles(),
+            "draft_first_token": self.planning_draft_first_token.percentiles(),
+        }
+
+    async def aclose(self):
+        """Cancel searches still running for finished turns. Called once from the app lifespan."""
+        tasks = list(self._background_searches)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _stream_groq_response(self, messages, max_tokens=None, metrics_tracker=None, response_mode: str = "planning"):
         """
         Simple streaming from Groq without search detection.
         Just streams tokens as they arrive.
         Uses mode-specific model for optimal performance.
         """
-        config = self.mode_config.get(self.response_mode, self.mode_config["planning"])
+        config = self.mode_config.get(response_mode, self.mode_config["planning"])
         
         if max_tokens is None:
             max_tokens = config["max_tokens"]
@@ -281,7 +485,21 @@ class LLMService:
         # Update metrics with actual model being used
         if metrics_tracker:
             metrics_tracker.set_model(model)
-        
+
+        if self.single_flight is None:
+            async for content in self._groq_completion(model, messages, max_tokens):
+                yield content
+            return
+
+        # Identical requests (same prompt and normalized user turns) share one upstream stream
+        key = SingleFlight.key("llm", model, str(max_tokens), *(
+            f"{m['role']}:{normalize_query(m['content']) if m['role'] == 'user' else m['content']}"
+            for m in messages
+        ))
+        async for content in self.single_flight.stream(key, lambda: self._groq_completion(model, messages, max_tokens)):
+            yield content
+
+    async def _groq_completion(self, model: str, messages: list, max_tokens: int):
         completion = await self.client.chat.completions.create(
             model=model,
             messages=messages,
@@ -289,9 +507,13 @@ class LLMService:
             max_tokens=max_tokens,
         )
         
-        async for chunk in completion:
-            if content := chunk.choices[0].delta.content:
-                yield content
+        try:
+            async for chunk in completion:
+                if content := chunk.choices[0].delta.content:
+                    yield content
+        finally:
+            # Close the HTTP stream right away when the turn is cancelled so Groq stops generating
+            await completion.close()
 
     async def _get_gemini_fallback(self, user_input, history):
         try:
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+from app.services.history_service import HistoryService
+
+if TYPE_CHECKING:
+    # Annotation only: importing it at runtime needs a generated Prisma client
+    from app.services.session_service import SessionService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMessage:
+    session_id: str
+    text: str
+    is_user: bool
+    auto_title: bool = False
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def role(self) -> str:
+        return "user" if self.is_user else "assistant"
+
+
+class PersistenceService:
+    """
+    Process-wide write-behind queue for conversation writes.
+    Batches message inserts (Redis history + Postgres) and session updatedAt
+    bumps off the turn's critical path. The queue is bounded; producers only
+    wait when it is full. Everything queued is flushed on shutdown.
+    """
+
+    def __init__(
+        self,
+        session_service: "SessionService",
+        history_service: HistoryService,
+        max_pending: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+    ):
+        self.session_service = session_service
+        self.history_service = history_service
+        self.batch_size = batch_size or settings.PERSIST_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.PERSIST_FLUSH_INTERVAL_MS) / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending or settings.PERSIST_MAX_PENDING)
+        self._worker: Optional[asyncio.Task] = None
+
+        # Unflushed history writes per session, so readers can wait for their own writes
+        self._pending_history: dict[str, int] = defaultdict(int)
+        self._flushed = asyncio.Condition()
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Flush everything still queued and stop the worker."""
+        if self._worker is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def record_message(self, session_id: str, text: str, is_user: bool, auto_title: bool = False):
+        """
+        Queue a message for Redis history and the session database.
+
+        Args:
+            session_id: Unique session identifier
+            text: Message text
+            is_user: True for user messages, False for assistant messages
+            auto_title: Generate the session title once this message is stored
+        """
+        if not text or not text.strip():
+            logger.warning(f"Attempted to store empty message for session {session_id}")
+            return
+        self._pending_history[session_id] += 1
+        try:
+            await self._queue.put(PendingMessage(session_id, text.strip(), is_user, auto_title))
+        except BaseException:
+            self._pending_history[session_id] -= 1
+            if self._pending_history[session_id] <= 0:
+                del self._pending_history[session_id]
+            raise
+
+    async def wait_for_history(self, session_id: str, skip_latest: bool = False):
+        """
+        Wait until queued history writes for this session have reached Redis.
+
+        Args:
+            skip_latest: Don't wait for the most recent write (e.g. the user message
+                a turn was started for, which the turn already has). Writes reach
+                Redis in order, so everything before it is still waited for.
+        """
+        allowed = 1 if skip_latest else 0
+        if self._pending_history.get(session_id, 0) <= allowed:
+            return
+        async with self._flushed:
+            await self._flushed.wait_for(lambda: self._pending_history.get(session_id, 0) <= allowed)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Drain anything queued behind the shutdown marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start:start + self.batch_size])
+
+    async def _flush(self, batch: list[PendingMessage]):
+        try:
+            await self.history_service.add_messages(
+                [(m.session_id, m.role, m.text) for m in batch]
+            )
+        finally:
+            async with self._flushed:
+                for m in batch:
+                    self._pending_history[m.session_id] -= 1
+                    if self._pending_history[m.session_id] <= 0:
+                        del self._pending_history[m.session_id]
+                self._flushed.notify_all()
+
+        stored = await self._store(batch)
+        for session_id in {m.session_id for m in stored if m.auto_title}:
+            try:
+                await self.session_service.auto_title_if_first_exchange(session_id)
+            except Exception as e:
+                logger.error(f"Auto-title failed for session {session_id}: {e}")
+
+    async def _store(self, batch: list[PendingMessage]) -> list[PendingMessage]:
+        """
+        Insert a batch into the session database and return the messages that
+        were stored. A failed insert is retried per session, then per message,
+        so one bad row (e.g. its session was deleted mid-turn) only drops itself.
+        """
+        try:
+            await self.session_service.add_messages([self._row(m) for m in batch])
+            return batch
+        except Exception as e:
+            if len(batch) == 1:
+                m = batch[0]
+                logger.error(f"Dropping message for session {m.session_id}: {e}")
+                return []
+            logger.warning(f"Failed to persist {len(batch)} messages, retrying in smaller batches: {e}")
+
+        by_session: dict[str, list[PendingMessage]] = defaultdict(list)
+        for m in batch:
+            by_session[m.session_id].append(m)
+        # A single-session batch splits straight into single messages
+        groups = list(by_session.values()) if len(by_session) > 1 else [[m] for m in batch]
+
+        stored = []
+        for group in groups:
+            stored.extend(await self._store(group))
+        return stored
+
+    @staticmethod
+    def _row(m: PendingMessage) -> dict:
+        return {"sessionId": m.session_id, "text": m.text, "isUser": m.is_user, "timestamp": m.timestamp}
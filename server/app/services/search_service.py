@@ -1,37 +1,128 @@
-from tavily import TavilyClient
 from app.core.config import settings
+from app.services.cache_service import LocalCache
+from app.services.single_flight import SingleFlight
+from app.services.tavily_client import AsyncTavilyClient
+from app.utils.metrics import LatencyWindow
+from app.utils.text_normalization import normalize_query
+from typing import Optional
 import logging
-import asyncio
+import time
 
 logger = logging.getLogger(__name__)
 
+# Search cache categories, most volatile first: the first category with a
+# matching word decides how long a result may be served from cache
+SEARCH_CATEGORIES = [
+    ("prices", frozenset({"price", "prices", "stock", "stocks", "market", "trading", "crypto", "bitcoin",
+                          "ethereum", "exchange", "rate", "rates", "cost", "worth"})),
+    ("news", frozenset({"news", "breaking", "latest", "headlines", "happened", "happening", "announcement",
+                        "update", "today", "tonight", "yesterday", "now", "current", "recent"})),
+    ("sports", frozenset({"score", "game", "match", "won", "lost", "championship", "tournament", "playing"})),
+    ("weather", frozenset({"weather", "temperature", "forecast", "rain", "snow", "sunny", "cloudy", "tomorrow"})),
+]
+
+
+# Placeholder texts search() returns instead of results
+NO_RESULTS = "No relevant search results found."
+SEARCH_ERROR_PREFIX = "Error performing search"
+
+
+def has_results(text: Optional[str]) -> bool:
+    """False for the placeholder texts search() returns when it found nothing or failed."""
+    return bool(text) and text != NO_RESULTS and not text.startswith(SEARCH_ERROR_PREFIX)
+
+
+def search_category(query: str) -> str:
+    """Cache category of a search query ("general" when nothing time-sensitive matches)."""
+    words = set(normalize_query(query).split())
+    for category, keywords in SEARCH_CATEGORIES:
+        if words & keywords:
+            return category
+    return "general"
+
+
 class SearchService:
-    def __init__(self):
-        self.client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+    """
+    Web search for grounding LLM answers, shared by all connections.
+
+    Results are cached in process, keyed by normalized query and
+    max_results, for a TTL that depends on the query's category (minutes
+    for prices and news, hours for general facts; SEARCH_CACHE_TTL_S).
+    Misses for the same key share one Tavily call via SingleFlight. Errors
+    are never cached.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncTavilyClient] = None,
+        single_flight: Optional[SingleFlight] = None,
+        cache: Optional[LocalCache] = None,
+    ):
+        self.client = client or AsyncTavilyClient(api_key=settings.TAVILY_API_KEY)
+        self.single_flight = single_flight
+        self.cache = cache
+        self.ttls = settings.SEARCH_CACHE_TTL_S
+
+        self.hits = 0
+        self.misses = 0
+        self.latency = LatencyWindow()
+        self.upstream_latency = LatencyWindow()
 
     async def search(self, query: str, max_results: int = 3) -> str:
+        start = time.perf_counter()
+        key = SingleFlight.key("search", normalize_query(query), str(max_results))
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Search cache hit for query: {query}")
+            result = cached
+        else:
+            self.misses += 1
+            if self.single_flight is None:
+                result = await self._search(query, max_results, key)
+            else:
+                # Concurrent searches for the same normalized query share one Tavily call
+                result = await self.single_flight.call(key, lambda: self._search(query, max_results, key))
+        self.latency.record((time.perf_counter() - start) * 1000)
+        return result
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cache_entries": len(self.cache) if self.cache is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency": self.latency.percentiles(),
+            "upstream_latency": self.upstream_latency.percentiles(),
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _search(self, query: str, max_results: int, key: str) -> str:
         try:
-            # Run synchronous Tavily client in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.search(
-                    query=query, 
-                    search_depth="basic",  # Changed from "advanced" for faster results
-                    max_results=max_results
-                )
+            start = time.perf_counter()
+            response = await self.client.search(
+                query,
+                max_results=max_results,
+                search_depth="basic",  # Changed from "advanced" for faster results
             )
-            
+            self.upstream_latency.record((time.perf_counter() - start) * 1000)
+
             context = ""
             for result in response.get("results", []):
                 context += f"Source: {result.get('url')}\nContent: {result.get('content')}\n\n"
-            
+
             if not context:
                 logger.warning(f"No search results found for query: {query}")
-                return "No relevant search results found."
-            
+                return NO_RESULTS
+
             logger.info(f"Search successful for query: {query}, found {len(response.get('results', []))} results")
+            if self.cache is not None:
+                category = search_category(query)
+                self.cache.set(key, context, ttl=self.ttls.get(category, self.ttls["general"]))
             return context
         except Exception as e:
             logger.error(f"Tavily Search Error: {e}", exc_info=True)
-            return f"Error performing search: {str(e)}"
+            return f"{SEARCH_ERROR_PREFIX}: {str(e)}"
@@ -0,0 +1,292 @@
+import logging
+import time
+import zlib
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+
+from app.utils.text_normalization import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Spoken contractions as they come out of normalize_query (apostrophes stripped),
+# expanded so "what's" and "what is" share their n-grams
+_CONTRACTIONS = {
+    "whats": "what is", "wheres": "where is", "whos": "who is", "hows": "how is",
+    "whens": "when is", "whys": "why is", "thats": "that is", "theres": "there is",
+    "dont": "do not", "doesnt": "does not", "cant": "can not", "isnt": "is not",
+    "im": "i am", "ive": "i have", "youre": "you are", "id": "i would",
+}
+
+# Words that don't carry the question's subject. Everything else (question words,
+# negations, numbers, entities) must match for a hit, in order
+_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "am", "of", "in", "on", "at", "for", "to",
+    "me", "i", "you", "it", "this", "that", "there", "my", "your", "some", "please", "tell", "about",
+    "can", "could", "would", "will", "do", "does", "did", "give", "know", "like", "just", "so",
+})
+
+
+def _words(text: str) -> list[str]:
+    return [word for part in normalize_query(text).split() for word in _CONTRACTIONS.get(part, part).split()]
+
+
+def _content_words(text: str) -> tuple[str, ...]:
+    return tuple(word for word in _words(text) if word not in _STOPWORDS)
+
+
+def _same_word(a: str, b: str) -> bool:
+    """Equal, or a one-edit STT slip in a longer word ("capitol"); numbers must match exactly."""
+    if a == b:
+        return True
+    if min(len(a), len(b)) < 5 or abs(len(a) - len(b)) > 1 or any(c.isdigit() for c in a + b):
+        return False
+    # Strip the common prefix and suffix; at most one substitution, insertion or deletion may remain
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    j = 0
+    while j < min(len(a), len(b)) - i and a[-1 - j] == b[-1 - j]:
+        j += 1
+    return max(len(a), len(b)) - i - j <= 1
+
+
+def same_question(a: tuple[str, ...], b: tuple[str, ...]) -> bool:
+    """
+    Lexical guard on top of cosine similarity: the content words must match one
+    to one and in order. Character n-grams alone score entity swaps
+    ("austria" / "australia") and reversals ("celsius to fahrenheit" / the
+    reverse) above any useful threshold.
+    """
+    return len(a) == len(b) and all(_same_word(x, y) for x, y in zip(a, b))
+
+
+class QueryFeaturizer:
+    """
+    Cheap local query embedding: character n-grams of the normalized query,
+    hashed into `dim` buckets with a random sign, L2-normalized. Paraphrases
+    that share most of their wording (which is what STT produces for one
+    intent) land close together in cosine space. No model, no network.
+    """
+
+    def __init__(self, dim: int = 256, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Unit vector for a query, or None if nothing is left after normalization."""
+        normalized = " ".join(_words(text))
+        if not normalized:
+            return None
+        padded = f" {normalized} "
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for i in range(max(1, len(padded) - self.ngram + 1)):
+            h = zlib.crc32(padded[i:i + self.ngram].encode())
+            # Top bit picks the sign so hash collisions tend to cancel out
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+
+class SemanticCache:
+    """
+    Process-local approximate response cache for history-free turns.
+
+    Query embeddings live in one float32 matrix used as a ring buffer (the
+    oldest entry is overwritten when full). The matrix starts small and
+    doubles as entries arrive, so memory follows the entries actually held
+    rather than `capacity`. Lookups don't scan
+    the whole matrix: every row is also filed under a random-hyperplane LSH
+    signature in `tables` hash tables, and a query only scores the rows in
+    its own buckets, with one batched matrix product for exact cosine
+    similarity and argpartition for the top k. That keeps a lookup around a
+    millisecond at 100k entries, at the cost of occasionally missing a
+    neighbour that no table put in the query's bucket: with the defaults the
+    index finds the brute-force best match for ~98% of queries over the
+    threshold (benchmarks/semantic_cache.py). More tables or candidates buy
+    recall with latency.
+    """
+
+    # Rows allocated up front; the matrix doubles from here as entries arrive
+    initial_rows = 1024
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        capacity: int = 100_000,
+        ttl: float = 24 * 3600,
+        featurizer: Optional[QueryFeaturizer] = None,
+        tables: int = 32,
+        bits: int = 18,
+        max_candidates: int = 1024,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            capacity: Entries held before the oldest is overwritten
+            ttl: Seconds an entry stays servable
+            featurizer: Query embedding (hashed char n-grams by default)
+            tables: LSH tables; more raise recall and candidate count
+            bits: Hyperplanes per table; more mean smaller buckets
+            max_candidates: Rows scored per lookup at most (smallest buckets first)
+            seed: Hyperplane RNG seed
+        """
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.featurizer = featurizer or QueryFeaturizer()
+        dim = self.featurizer.dim
+        self.bits = bits
+        self.tables = tables
+        self.max_candidates = max_candidates
+
+        rows = min(capacity, self.initial_rows)
+        self._vectors = np.zeros((rows, dim), dtype=np.float32)
+        self._answers: list[Optional[str]] = [None] * rows
+        self._questions: list[Optional[tuple[str, ...]]] = [None] * rows
+        self._contexts = np.zeros(rows, dtype=np.int64)
+        self._stored_at = np.zeros(rows, dtype=np.float64)
+        self._signatures = np.zeros((rows, tables), dtype=np.int64)
+        self._next = 0
+        self._size = 0
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((dim, tables * bits)).astype(np.float32)
+        self._powers = (1 << np.arange(bits, dtype=np.int64))
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in range(tables)]
+
+        # Near neighbours over the threshold checked against the lexical guard per lookup
+        self.guard_candidates = 3
+
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, query: str, answer: str, context: str = ""):
+        vector = self.featurizer.embed(query)
+        if vector is None or not answer:
+            return
+        row = self._next
+        if row == len(self._answers):
+            self._grow()
+        if self._answers[row] is not None:
+            self._unindex(row)
+        self._vectors[row] = vector
+        self._answers[row] = answer
+        self._questions[row] = _content_words(query)
+        self._contexts[row] = _context_id(context)
+        self._stored_at[row] = time.time()
+        self._signatures[row] = self._signature(vector[None, :])[0]
+        for table, signature in enumerate(self._signatures[row]):
+            self._buckets[table].setdefault(int(signature), []).append(row)
+        self._next = (row + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def search(self, query: str, k: int = 1, context: str = "") -> list[tuple[float, str]]:
+        """Up to k (similarity, answer) pairs for the closest live entries, best first."""
+        return [(score, self._answers[row]) for score, row in self._nearest(query, k, context)]
+
+    def lookup(self, query: str, context: str = "") -> Optional[str]:
+        """
+        The answer of the closest entry that clears the threshold and asks the
+        same question (same_question); None otherwise.
+        """
+        words = _content_words(query)
+        for score, row in self._nearest(query, self.guard_candidates, context):
+            if score < self.threshold:
+                break
+            if same_question(words, self._questions[row]):
+                self.hits += 1
+                logger.info(f"Semantic cache hit ({score:.3f}) for query: {query}")
+                return self._answers[row]
+            self.rejected += 1
+        self.misses += 1
+        return None
+
+    def _nearest(self, query: str, k: int, context: str) -> list[tuple[float, int]]:
+        vector = self.featurizer.embed(query)
+        if vector is None or not self._size:
+            return []
+        rows = self._candidates(vector)
+        if rows.size == 0:
+            return []
+        live = (self._contexts[rows] == _context_id(context)) & (self._stored_at[rows] >= time.time() - self.ttl)
+        rows = rows[live]
+        if rows.size == 0:
+            return []
+        scores = self._vectors[rows] @ vector
+        if rows.size > k:
+            # Headroom for rows found through several tables, deduplicated below
+            top = np.argpartition(scores, -min(rows.size, k * self.tables))[-k * self.tables:]
+            rows, scores = rows[top], scores[top]
+        results, seen = [], set()
+        for i in np.argsort(scores)[::-1]:
+            row = int(rows[i])
+            if row not in seen:
+                seen.add(row)
+                results.append((float(scores[i]), row))
+                if len(results) == k:
+                    break
+        return results
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "rejected_by_guard": self.rejected,
+        }
+
+    def _grow(self):
+        """Double the row storage (up to capacity)."""
+        rows = min(self.capacity, 2 * len(self._answers))
+        extra = rows - len(self._answers)
+        self._vectors = np.concatenate((self._vectors, np.zeros((extra, self._vectors.shape[1]), dtype=np.float32)))
+        self._answers.extend([None] * extra)
+        self._questions.extend([None] * extra)
+        self._contexts = np.concatenate((self._contexts, np.zeros(extra, dtype=np.int64)))
+        self._stored_at = np.concatenate((self._stored_at, np.zeros(extra, dtype=np.float64)))
+        self._signatures = np.concatenate((self._signatures, np.zeros((extra, self.tables), dtype=np.int64)))
+
+    def _signature(self, vectors: np.ndarray) -> np.ndarray:
+        """LSH bucket id per table for each row of `vectors`."""
+        bits = (vectors @ self._planes > 0).reshape(len(vectors), self.tables, self.bits)
+        return bits.astype(np.int64) @ self._powers
+
+    def _candidates(self, vector: np.ndarray) -> np.ndarray:
+        """Rows sharing a bucket with the query in any table (may repeat across tables)."""
+        groups = []
+        for bucket, signature in zip(self._buckets, self._signature(vector[None, :])[0].tolist()):
+            rows = bucket.get(signature)
+            if rows:
+                groups.append(rows)
+        # Crowded buckets say little about the query and dominate the tail latency:
+        # take the most selective ones first and stop at the candidate budget
+        groups.sort(key=len)
+        total = 0
+        for taken, rows in enumerate(groups):
+            if total + len(rows) > self.max_candidates and taken:
+                groups = groups[:taken]
+                break
+            total += len(rows)
+        return np.fromiter(chain.from_iterable(groups), dtype=np.int64, count=total)
+
+    def _unindex(self, row: int):
+        for table, signature in enumerate(self._signatures[row]):
+            bucket = self._buckets[table].get(int(signature))
+            if bucket:
+                bucket.remove(row)
+                if not bucket:
+                    del self._buckets[table][int(signature)]
+
+
+def _context_id(context: str) -> int:
+    # Answers only apply under the system prompt they were generated with
+    return zlib.crc32(context.encode())
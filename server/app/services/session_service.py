@@ -1,10 +1,10 @@
 from prisma import Prisma
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 
 class SessionService:
-    def __init__(self):
-        self.prisma = Prisma()
+    def __init__(self, prisma: Optional[Prisma] = None):
+        self.prisma = prisma or Prisma()
     
     async def connect(self):
         await self.prisma.connect()
@@ -65,6 +65,22 @@ class SessionService:
             data={'updatedAt': datetime.utcnow()}
         )
     
+    async def add_messages(self, messages: List[Dict]):
+        """Insert a batch of messages and bump updatedAt once per touched session"""
+        if not messages:
+            return
+        await self.prisma.message.create_many(data=messages)
+        await self.prisma.session.update_many(
+            where={'id': {'in': list({m['sessionId'] for m in messages})}},
+            data={'updatedAt': datetime.utcnow()}
+        )
+    
+    async def auto_title_if_first_exchange(self, session_id: str):
+        """Auto-generate title after the first exchange (when message count == 2)"""
+        count = await self.prisma.message.count(where={'sessionId': session_id})
+        if count == 2:
+            await self.auto_title(session_id)
+    
     async def auto_title(self, session_id: str):
         """Auto-generate title from first message"""
         messages = await self.get_session_messages(session_id)
@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+class FlightAbandoned(Exception):
+    """The flight stopped before completing (every subscriber left, or the remote leader went quiet)."""
+
+
+class _Flight:
+    """One in-flight upstream call: a replay buffer of its chunks plus a wake-up event."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.id = uuid.uuid4().hex
+        self.chunks: list = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk):
+        self.chunks.append(chunk)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._wake()
+
+    async def changed(self):
+        await self._changed.wait()
+
+    def _wake(self):
+        # Waiters hold the old event; the next wait gets a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Process-wide deduplication of identical in-flight upstream calls.
+
+    The first caller for a key starts the upstream call as a detached task
+    (the leader); concurrent callers with the same key subscribe to it.
+    Chunks go into a per-flight replay buffer, so every subscriber gets the
+    whole stream from the start no matter when it joined. Subscribers only
+    read the buffer: cancelling one never touches the others or the
+    leader. The upstream call is cancelled once its last subscriber leaves
+    (e.g. every user barged in), so nobody pays for tokens no one reads.
+
+    With a Redis client, flights are also coordinated across workers: the
+    leader takes a short-lived lock and mirrors its chunks to a Redis
+    stream, and a worker that finds the lock taken relays that stream to
+    its local subscribers instead of calling upstream. If the remote leader
+    goes quiet before producing anything, the worker calls upstream itself.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        prefix: str = "singleflight",
+        lock_ttl: float = 30.0,
+        stall_timeout: float = 5.0,
+    ):
+        """
+        Args:
+            redis_client: Enables cross-worker coordination (decode_responses=True)
+            prefix: Redis key prefix for locks and relay streams
+            lock_ttl: Seconds a leader's lock (and relay stream) lives at most
+            stall_timeout: Seconds without a relayed chunk before a remote leader is given up on
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.stall_timeout = stall_timeout
+        self._flights: dict[str, _Flight] = {}
+
+        self.leaders = 0
+        self.followers = 0
+        self.remote_followers = 0
+        self.abandoned = 0
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        """
+        Yield the chunks of the flight for `key`, starting `factory()` as its
+        leader if none is in flight. Upstream errors are re-raised in every
+        subscriber.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(key)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._lead(flight, factory))
+        else:
+            self.followers += 1
+        flight.subscribers += 1
+        try:
+            index = 0
+            while True:
+                while index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed()
+        finally:
+            flight.subscribers -= 1
+            if not flight.subscribers and not flight.done:
+                # Unregister here too: a leader cancelled before it ran never reaches its finally
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    async def call(self, key: str, fn: Callable[[], Awaitable]):
+        """Single-flight for a plain coroutine: one shared result per key."""
+        async def once():
+            yield await fn()
+
+        async with aclosing(self.stream(key, once)) as results:
+            async for result in results:
+                return result
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "remote_followers": self.remote_followers,
+            "abandoned": self.abandoned,
+        }
+
+    async def _lead(self, flight: _Flight, factory: Callable[[], AsyncIterator]):
+        relay = None
+        try:
+            if self.redis is not None:
+                owner = await self._claim(flight)
+                if owner == flight.id:
+                    relay = self._stream_key(owner)
+                elif owner is not None:
+                    if await self._follow_remote(flight, self._stream_key(owner)):
+                        flight.finish()
+                        return
+                    if flight.chunks:
+                        raise FlightAbandoned("remote leader stopped mid-stream")
+            self.leaders += 1
+            async for chunk in factory():
+                flight.publish(chunk)
+                if relay:
+                    await self._relay(relay, {"c": chunk})
+            flight.finish()
+            if relay:
+                await self._relay(relay, {"e": ""})
+        except asyncio.CancelledError:
+            self.abandoned += 1
+            flight.finish(FlightAbandoned("all subscribers left"))
+            if relay:
+                await asyncio.shield(self._relay(relay, {"e": "abandoned"}))
+            raise
+        except Exception as e:
+            flight.finish(e)
+            if relay:
+                await self._relay(relay, {"e": str(e) or type(e).__name__})
+        finally:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            if relay:
+                await asyncio.shield(self._release(flight))
+
+    async def _follow_remote(self, flight: _Flight, stream_key: str) -> bool:
+        """
+        Relay another worker's flight. True if it completed; False if it
+        ended early or stalled (whatever was relayed stays in the buffer).
+        """
+        self.remote_followers += 1
+        last_id = "0"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.stall_timeout
+        try:
+            while loop.time() < deadline:
+                block = max(1, int((deadline - loop.time()) * 1000))
+                response = await self.redis.xread({stream_key: last_id}, block=block)
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        deadline = loop.time() + self.stall_timeout
+                        if "c" in fields:
+                            flight.publish(fields["c"])
+                        elif fields.get("e") == "":
+                            return True
+                        else:
+                            logger.warning(f"Remote single-flight leader failed: {fields.get('e')}")
+                            return False
+        except redis.RedisError as e:
+            logger.error(f"Single-flight relay read failed: {e}")
+            return False
+        logger.warning("Remote single-flight leader stalled, calling upstream")
+        return False
+
+    async def _claim(self, flight: _Flight) -> Optional[str]:
+        """
+        Id of the flight leading this key across workers: ours if we took the
+        lock, another worker's if it holds it, None if Redis is unavailable
+        (fail open: the caller leads without mirroring).
+        """
+        lock = self._lock_key(flight.key)
+        ttl = int(self.lock_ttl * 1000)
+        try:
+            for _ in range(2):
+                if await self.redis.set(lock, flight.id, nx=True, px=ttl):
+                    return flight.id
+                owner = await self.redis.get(lock)
+                if owner:
+                    return owner
+                # Released between SET and GET: try once more
+        except redis.RedisError as e:
+            logger.error(f"Single-flight lock failed: {e}")
+        return None
+
+    async def _release(self, flight: _Flight):
+        try:
+            if await self.redis.get(self._lock_key(flight.key)) == flight.id:
+                await self.redis.delete(self._lock_key(flight.key))
+        except redis.RedisError as e:
+            logger.error(f"Single-flight unlock failed: {e}")
+
+    async def _relay(self, stream_key: str, fields: dict):
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.xadd(stream_key, fields)
+                pipe.pexpire(stream_key, int(self.lock_ttl * 1000))
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Single-flight relay write failed: {e}")
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.prefix}:lock:{key}"
+
+    def _stream_key(self, flight_id: str) -> str:
+        return f"{self.prefix}:stream:{flight_id}"
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Optional
+
+from app.core.config import settings
+from app.utils.metrics import MetricsTracker
+from app.utils.sentence_detection import SmartSentenceBuffer
+from app.utils.text_normalization import normalize_transcript
+
+logger = logging.getLogger(__name__)
+
+
+class Speculation:
+    """
+    One speculative LLM generation for a stable interim transcript.
+    Tokens are buffered, never sent, until the final transcript commits the
+    speculation (its turn replays them) or it is cancelled. The first complete
+    sentence can be handed to `prefetch` so its audio is synthesized early.
+    """
+
+    def __init__(
+        self,
+        transcript: str,
+        tokens: AsyncIterator[str],
+        prefetch: Optional[Callable[[str], Optional[asyncio.Task]]] = None,
+    ):
+        """
+        Args:
+            transcript: Interim transcript the generation answers
+            tokens: LLM token stream for that transcript
+            prefetch: Starts early TTS for a sentence and returns its task
+        """
+        self.transcript = transcript
+        self.normalized = normalize_transcript(transcript)
+        self.started_at = time.monotonic()
+        self.tokens: list[str] = []
+        self.done = False
+        self._prefetch = prefetch
+        self._prefetched: Optional[tuple[str, asyncio.Task]] = None
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(tokens))
+
+    def matches(self, transcript: str) -> bool:
+        return normalize_transcript(transcript) == self.normalized
+
+    async def replay(self) -> AsyncIterator[str]:
+        """Yield the buffered tokens, then the rest of the generation as it arrives."""
+        index = 0
+        while True:
+            if index < len(self.tokens):
+                yield self.tokens[index]
+                index += 1
+                continue
+            if self.done:
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+    def take_prefetched(self, sentence: str) -> Optional[asyncio.Task]:
+        """Hand over the early TTS task if it was started for `sentence`."""
+        if self._prefetched is None or self._prefetched[0] != sentence:
+            return None
+        task = self._prefetched[1]
+        self._prefetched = None
+        return task
+
+    def cancel(self):
+        """Drop the speculation: stop generating and discard early audio."""
+        self._task.cancel()
+        if self._prefetched is not None:
+            self._prefetched[1].cancel()
+            self._prefetched = None
+
+    async def aclose(self):
+        self.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self, tokens: AsyncIterator[str]):
+        sentence_buffer = SmartSentenceBuffer()
+        try:
+            async for chunk in tokens:
+                self.tokens.append(chunk)
+                self._changed.set()
+                if self._prefetch is None or chunk.startswith("[STATUS: "):
+                    continue
+                for sentence in sentence_buffer.add_chunk(chunk):
+                    task = self._prefetch(sentence)
+                    if task is not None:
+                        self._prefetched = (sentence, task)
+                    # Only the first sentence is synthesized ahead of the commit
+                    self._prefetch = None
+                    break
+        except Exception as e:
+            logger.error(f"Speculative generation failed: {e}")
+        finally:
+            self.done = True
+            self._changed.set()
+
+
+class Speculator:
+    """
+    Per-connection speculative generation (opt-in via SPECULATIVE_LLM).
+    Once an interim transcript has stayed unchanged for `stable_ms`, starts a
+    Speculation for it. The final transcript either commits that speculation,
+    if it matches after normalization, or cancels it.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str], AsyncIterator[str]],
+        metrics: MetricsTracker,
+        can_start: Callable[[], bool],
+        prefetch: Optional[Callable[[str], Optional[asyncio.Task]]] = None,
+        stable_ms: Optional[int] = None,
+    ):
+        """
+        Args:
+            generate: Returns the LLM token stream for a transcript
+            metrics: Tracker that records hit rate and saved time
+            can_start: False while speculating would be unsafe (e.g. a turn is still running)
+            prefetch: Early TTS hook passed to each Speculation
+            stable_ms: How long an interim must stay unchanged before speculating
+        """
+        self.generate = generate
+        self.metrics = metrics
+        self.can_start = can_start
+        self.prefetch = prefetch
+        self.stable = (settings.SPECULATION_STABLE_MS if stable_ms is None else stable_ms) / 1000
+        self.current: Optional[Speculation] = None
+        # Normalized interim the stability timer is waiting on
+        self._pending: Optional[str] = None
+        self._timer: Optional[asyncio.Task] = None
+
+    def on_interim(self, transcript: str):
+        """(Re)start the stability window for a new interim transcript."""
+        normalized = normalize_transcript(transcript)
+        if not normalized:
+            return
+        if self.current is not None:
+            if self.current.normalized == normalized:
+                return
+            # The user kept talking: the running speculation answers the wrong question
+            self.current.cancel()
+            self.current = None
+        if self._timer is not None and self._pending == normalized:
+            return
+        self._cancel_timer()
+        self._pending = normalized
+        self._timer = asyncio.create_task(self._start_when_stable(transcript))
+
+    def on_final(self, transcript: str) -> Optional[Speculation]:
+        """
+        Resolve the running speculation against the final transcript.
+
+        Returns:
+            The speculation to commit, or None if there was none or it missed
+        """
+        self._cancel_timer()
+        speculation, self.current = self.current, None
+        if speculation is None:
+            return None
+        if speculation.matches(transcript):
+            saved_ms = (time.monotonic() - speculation.started_at) * 1000
+            self.metrics.record_speculation(hit=True, saved_ms=saved_ms)
+            logger.info(f"Speculation hit, {saved_ms:.0f}ms head start")
+            return speculation
+        speculation.cancel()
+        self.metrics.record_speculation(hit=False)
+        logger.info("Speculation missed, final transcript differs")
+        return None
+
+    def discard(self):
+        """Cancel everything, e.g. after the system prompt or response mode changed."""
+        self._cancel_timer()
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None
+
+    async def aclose(self):
+        timer, speculation = self._timer, self.current
+        self.discard()
+        if timer is not None:
+            await asyncio.gather(timer, return_exceptions=True)
+        if speculation is not None:
+            await speculation.aclose()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = None
+
+    async def _start_when_stable(self, transcript: str):
+        await asyncio.sleep(self.stable)
+        self._timer = None
+        self._pending = None
+        if not self.can_start():
+            return
+        logger.info(f"Speculating on stable interim: {transcript}")
+        self.current = Speculation(transcript, self.generate(transcript), prefetch=self.prefetch)
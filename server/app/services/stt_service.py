@@ -1,71 +1,80 @@
 import asyncio
 from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
 from app.core.config import settings
+from app.services.deepgram_live import DeepgramLiveClient
+from app.utils.audio_buffer import FrameBuffer
 import logging
 import speech_recognition as sr
 import io
+import time
 import wave
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
+
+def live_options() -> dict:
+    """Deepgram live transcription options shared by every stream (and the warm pool)."""
+    return dict(
+        model="nova-2-general",
+        language="en-US",
+        smart_format=True,
+        encoding="linear16",
+        channels=1,
+        sample_rate=16000,
+        interim_results=True,
+        endpointing=settings.STT_ENDPOINTING_MS,
+        # Disable VAD for AI voice detection
+        vad_events=False,
+    )
+
+
 class STTService:
-    def __init__(self, websocket_callback):
-        self.dg_client = DeepgramClient(settings.DEEPGRAM_API_KEY)
+    def __init__(self, websocket_callback, pool=None):
+        self.backend = settings.STT_BACKEND
+        self.dg_client = DeepgramClient(settings.DEEPGRAM_API_KEY) if self.backend == "sdk" else None
         self.callback = websocket_callback
+        # Process-wide UpstreamPool of ready Deepgram sockets (asyncio backend only)
+        self.pool = pool
         self.dg_connection = None
         self.deepgram_failed = False
         self.audio_buffer = []
         self.recognizer = sr.Recognizer()
         self.fallback_active = False
+        self.keepalive_interval = settings.STT_KEEPALIVE_INTERVAL_S
+        # Batch audio into fixed packets (16kHz 16-bit mono: 32 bytes per ms) to cut Deepgram sends
+        self.packets = FrameBuffer(settings.STT_SEND_PACKET_MS * 32)
+        self.fallback_batch_packets = max(1, 2000 // settings.STT_SEND_PACKET_MS)  # ~2 seconds
+        self.last_sent = 0.0
+        self._keepalive_task = None
+        # Lazy lifecycle: connect on the first speech frame, disconnect after idle_close seconds without speech
+        self.lazy = settings.STT_LAZY_CONNECT
+        self.idle_close = settings.STT_IDLE_CLOSE_S if self.lazy else 0
+        self.started = False
+        self.last_speech = 0.0
+        # Recent audio held while disconnected, replayed ahead of the first speech frame
+        self.preroll_bytes = settings.STT_PREROLL_MS * 32
+        self._preroll: deque[bytes] = deque()
+        self._preroll_size = 0
+        # Lazy open in progress: audio waits in self.packets until the stream is up
+        self._connecting = None
+        self._finalize_pending = False
 
     async def start(self):
         max_retries = 3
         retry_delay = 1
         self.loop = asyncio.get_running_loop()
+        self.started = True
+        self.last_speech = time.monotonic()
         
         for attempt in range(max_retries):
             try:
-                # Initialize new connection
-                self.dg_connection = self.dg_client.listen.live.v("1")
-
-                def on_message(self_inner, result, **kwargs):
-                    sentence = result.channel.alternatives[0].transcript
-                    if len(sentence) > 0:
-                        try:
-                            asyncio.run_coroutine_threadsafe(
-                                self.callback(sentence, result.is_final), 
-                                self.loop
-                            )
-                        except Exception as e:
-                            logger.error(f"STT callback error: {e}")
-
-                def on_error(self_inner, error, **kwargs):
-                    logger.error(f"Deepgram Connection Error: {error}")
-                    # Mark Deepgram as failed to activate fallback
-                    self.deepgram_failed = True
-                    if not self.fallback_active:
-                        logger.warning("Activating SpeechRecognition fallback")
-                        self.fallback_active = True
-
-                self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
-                self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
-
-                options = LiveOptions(
-                    model="nova-2-general",
-                    language="en-US",
-                    smart_format=True,
-                    encoding="linear16",
-                    channels=1,
-                    sample_rate=16000,
-                    interim_results=True,
-                    endpointing=500,
-                    # Disable VAD for AI voice detection
-                    vad_events=False,
-                )
-                
-                if self.dg_connection.start(options) is not False:
-                    logger.info("Deepgram connection established")
+                if await self._open_connection():
+                    logger.info(f"Deepgram connection established ({self.backend} backend)")
                     self.deepgram_failed = False
+                    self.last_sent = time.monotonic()
+                    if (self.keepalive_interval > 0 or self.idle_close > 0) and self._keepalive_task is None:
+                        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
                     return True
                 
             except Exception as e:
@@ -80,11 +89,104 @@ class STTService:
         self.fallback_active = True
         return True  # Return True to continue with fallback
 
-    async def send_audio(self, buffer):
+    def _on_connection_error(self, error):
+        logger.error(f"Deepgram Connection Error: {error}")
+        # Mark Deepgram as failed to activate fallback
+        self.deepgram_failed = True
+        if not self.fallback_active:
+            logger.warning("Activating SpeechRecognition fallback")
+            self.fallback_active = True
+
+    async def _open_connection(self) -> bool:
+        if self.backend == "asyncio":
+            # A pre-warmed socket skips the connect and TLS handshake entirely
+            pooled = self.pool.acquire_stt() if self.pool else None
+            if pooled is not None:
+                pooled.bind(self.callback, on_error=self._on_connection_error)
+                self.dg_connection = pooled
+                return True
+            # Event-loop native client: no per-connection threads
+            self.dg_connection = DeepgramLiveClient(
+                settings.DEEPGRAM_API_KEY,
+                self.callback,
+                on_error=self._on_connection_error,
+                url=settings.DEEPGRAM_LIVE_URL,
+            )
+            return await self.dg_connection.start(live_options())
+
+        # Initialize new connection
+        self.dg_connection = self.dg_client.listen.live.v("1")
+
+        def on_message(self_inner, result, **kwargs):
+            sentence = result.channel.alternatives[0].transcript
+            if len(sentence) > 0:
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        self.callback(sentence, result.is_final), 
+                        self.loop
+                    )
+                except Exception as e:
+                    logger.error(f"STT callback error: {e}")
+
+        def on_error(self_inner, error, **kwargs):
+            self._on_connection_error(error)
+
+        self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
+        self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
+        # The SDK's start() blocks on the websocket handshake: keep it off the event loop
+        started = await asyncio.to_thread(self.dg_connection.start, LiveOptions(**live_options()))
+        return started is not False
+
+    async def send_audio(self, buffer, is_speech: bool = True):
+        if is_speech:
+            self.last_speech = time.monotonic()
+        if not self.started:
+            if not is_speech:
+                self._hold_preroll(buffer)
+                return
+            logger.info("First speech frame, opening STT stream")
+            self.started = True
+            while self._preroll:
+                self.packets.write(self._preroll.popleft())
+            self._preroll_size = 0
+            # Connect (and retry) in the background so ingest never waits on the handshake
+            self._connecting = asyncio.create_task(self._connect())
+        self.packets.write(buffer)
+        if self._connecting is not None:
+            return
+        for packet in self.packets.frames():
+            await self._send_packet(packet)
+
+    async def _connect(self):
+        """Open the stream, then send the audio buffered meanwhile (and a Finalize requested meanwhile)."""
+        try:
+            await self.start()
+        finally:
+            self._connecting = None
+        for packet in self.packets.frames():
+            await self._send_packet(packet)
+        if self._finalize_pending:
+            self._finalize_pending = False
+            await self.finalize()
+
+    def _hold_preroll(self, buffer):
+        self._preroll.append(bytes(buffer))
+        self._preroll_size += len(buffer)
+        while self._preroll and self._preroll_size - len(self._preroll[0]) >= self.preroll_bytes:
+            self._preroll_size -= len(self._preroll.popleft())
+
+    async def flush(self):
+        """Send audio still short of a full packet (end of speech, shutdown)."""
+        if len(self.packets) and self._connecting is None:
+            await self._send_packet(self.packets.read_all())
+
+    async def _send_packet(self, buffer):
         # Try Deepgram first if available
         if self.dg_connection and not self.deepgram_failed:
             try:
+                # Sent synchronously, so the buffer view need not be copied
                 self.dg_connection.send(buffer)
+                self.last_sent = time.monotonic()
             except Exception as e:
                 logger.error(f"Deepgram send failed: {e}")
                 self.deepgram_failed = True
@@ -92,13 +194,63 @@ class STTService:
         
         # Use SpeechRecognition fallback if Deepgram failed
         if self.fallback_active:
-            self.audio_buffer.append(buffer)
+            self.audio_buffer.append(bytes(buffer))
             
-            # Process buffer when it reaches ~2 seconds (32KB chunks at 16kHz)
-            if len(self.audio_buffer) >= 60:  # ~2 seconds of audio
+            # Process buffer when it reaches ~2 seconds of audio
+            if len(self.audio_buffer) >= self.fallback_batch_packets:
                 await self._process_with_speech_recognition()
                 self.audio_buffer = []
 
+    async def finalize(self):
+        """
+        End of utterance detected server-side: push out buffered audio and ask
+        Deepgram to emit the final transcript now rather than after its own endpointing.
+        """
+        if self._connecting is not None:
+            # Still opening: finalize once the buffered audio has gone out
+            self._finalize_pending = True
+            return
+        await self.flush()
+        if self.dg_connection and not self.deepgram_failed:
+            try:
+                self.dg_connection.finalize()
+            except Exception as e:
+                logger.error(f"Deepgram Finalize failed: {e}")
+        elif self.fallback_active and self.audio_buffer:
+            await self._process_with_speech_recognition()
+            self.audio_buffer = []
+
+    async def _keepalive_loop(self):
+        """
+        Send Deepgram KeepAlive while no audio is flowing (e.g. the VAD gate holds back silence),
+        and in lazy mode close the stream once nobody has spoken for idle_close seconds.
+        """
+        while True:
+            now = time.monotonic()
+            if self.idle_close > 0 and now - self.last_speech >= self.idle_close:
+                logger.info(f"No speech for {self.idle_close:g}s, closing STT stream")
+                self._keepalive_task = None
+                await self._close_connection()
+                return
+            waits = []
+            if self.keepalive_interval > 0:
+                waits.append(self.keepalive_interval - (now - self.last_sent))
+            if self.idle_close > 0:
+                waits.append(self.idle_close - (now - self.last_speech))
+            if min(waits) > 0:
+                await asyncio.sleep(min(waits))
+                continue
+            if len(self.packets):
+                # A trailing partial packet is real audio, better than a KeepAlive
+                await self.flush()
+                continue
+            if self.dg_connection and not self.deepgram_failed:
+                try:
+                    self.dg_connection.keep_alive()
+                except Exception as e:
+                    logger.error(f"Deepgram KeepAlive failed: {e}")
+            self.last_sent = time.monotonic()
+
     async def _process_with_speech_recognition(self):
         """Process buffered audio with SpeechRecognition fallback."""
         try:
@@ -139,11 +291,37 @@ class STTService:
             logger.error(f"SpeechRecognition fallback error: {e}")
 
     async def stop(self):
-        if self.dg_connection:
-            self.dg_connection.finish()
-            self.dg_connection = None
-        
-        # Clear audio buffer
+        if self._connecting is not None:
+            self._connecting.cancel()
+            self._connecting = None
+        self._finalize_pending = False
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        await self._close_connection()
+        self._preroll.clear()
+        self._preroll_size = 0
+
+    async def _close_connection(self):
+        # Detach and reset before awaiting anything: speech arriving while the old
+        # stream closes starts a new one instead of having its frames cleared here
+        connection, self.dg_connection = self.dg_connection, None
+        tail = bytes(self.packets.read_all()) if len(self.packets) else b""
+        self.packets.clear()
         self.audio_buffer = []
+        deepgram_ok = not self.deepgram_failed
         self.fallback_active = False
         self.deepgram_failed = False
+        # The next speech frame reopens the stream
+        self.started = False
+
+        if connection:
+            if tail and deepgram_ok:
+                try:
+                    connection.send(tail)
+                except Exception as e:
+                    logger.error(f"Deepgram send failed: {e}")
+            if isinstance(connection, DeepgramLiveClient):
+                await connection.aclose()
+            else:
+                await asyncio.to_thread(connection.finish)
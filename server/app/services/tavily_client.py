@@ -0,0 +1,66 @@
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class TavilySearchError(Exception):
+    """The Tavily search API answered with an error status."""
+
+
+class AsyncTavilyClient:
+    """
+    Native asyncio client for the Tavily search API.
+
+    Replaces the SDK's blocking `requests` client, which had to run in the
+    default executor. One long-lived aiohttp session keeps a small pool of
+    keep-alive connections to the API, so repeat searches skip the TCP/TLS
+    handshake and no threads are tied up while a search is in flight.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        url: str = "https://api.tavily.com/search",
+        pool_limit: int = 10,
+        timeout: float = 10.0,
+    ):
+        """
+        Args:
+            api_key: Tavily API key
+            url: Search endpoint
+            pool_limit: Max simultaneous connections to the API
+            timeout: Seconds allowed for a whole search request
+        """
+        self.api_key = api_key
+        self.url = url
+        self.pool_limit = pool_limit
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def http_session(self) -> aiohttp.ClientSession:
+        """The pooled session, created on first use (inside the running loop)."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_limit, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+        return self.session
+
+    async def search(self, query: str, max_results: int = 3, search_depth: str = "basic") -> dict:
+        """Raw search response (`results` list of url/content/score dicts). Raises on failure."""
+        payload = {"query": query, "search_depth": search_depth, "max_results": max_results}
+        async with self.http_session().post(self.url, json=payload) as response:
+            if response.status != 200:
+                detail = (await response.text())[:200]
+                raise TavilySearchError(f"Tavily returned {response.status}: {detail}")
+            return await response.json()
+
+    async def aclose(self):
+        """Close the pooled session. Called once from the app lifespan."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
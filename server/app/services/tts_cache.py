@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from app.utils.text_normalization import normalize_tts_text
+
+logger = logging.getLogger(__name__)
+
+
+class TTSAudioCache:
+    """
+    Process-wide content-addressed cache of synthesized PCM.
+
+    Entries are keyed by (provider, voice, sample rate, normalized text), so
+    the same sentence in the same voice is only paid for once. Two tiers:
+    a byte-bounded in-memory LRU, and optionally a directory of raw PCM
+    files (one per key, also byte-bounded and LRU) that are read back via
+    mmap and promoted into memory on a hit. Disk reads and writes run off the
+    event loop, and writes are atomic (a unique temp file + rename), so
+    neither a crash nor two concurrent writes of one key leave a truncated
+    or interleaved entry behind.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: Optional[str] = None, disk_bytes: int = 0):
+        """
+        Args:
+            memory_bytes: In-memory tier budget; entries larger than a quarter of it stay on disk only
+            disk_dir: Directory for the disk tier (None disables it)
+            disk_bytes: Disk tier budget
+        """
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir if disk_dir and disk_bytes > 0 else None
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        # Disk index: key -> file size, least recently used first
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_size = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def key(provider: str, voice: str, sample_rate: int, text: str) -> str:
+        identity = f"{provider}\0{voice}\0{sample_rate}\0{normalize_tts_text(text)}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    async def get(self, *keys: str) -> Optional[bytes]:
+        """
+        Cached PCM for the first key present (e.g. one per provider, in
+        preference order), or None. Disk hits are promoted to memory.
+        """
+        for key in keys:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+        for key in keys:
+            if key in self._disk:
+                try:
+                    audio = await asyncio.to_thread(self._read_disk, key)
+                except (OSError, ValueError) as e:
+                    # Missing or empty file: forget the entry
+                    logger.warning(f"TTS cache disk read failed: {e}")
+                    self._disk_size -= self._disk.pop(key, 0)
+                    continue
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.disk_hits += 1
+                self._put_memory(key, audio)
+                return audio
+        self.misses += 1
+        return None
+
+    def frames(self, audio: bytes, chunk_size: int) -> Iterator[bytes]:
+        """Split cached PCM into sample-aligned chunks, like a provider stream."""
+        chunk_size = max(2, chunk_size & ~1)
+        for offset in range(0, len(audio), chunk_size):
+            yield audio[offset:offset + chunk_size]
+
+    async def put(self, key: str, audio: bytes):
+        if not audio:
+            return
+        self.stores += 1
+        self._put_memory(key, audio)
+        if self.disk_dir and key not in self._disk and len(audio) <= self.disk_bytes:
+            try:
+                await asyncio.to_thread(self._write_disk, key, audio)
+            except OSError as e:
+                logger.error(f"TTS cache disk write failed: {e}")
+                return
+            if key not in self._disk:
+                self._disk[key] = len(audio)
+                self._disk_size += len(audio)
+                self._evict_disk()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_size,
+        }
+
+    def _put_memory(self, key: str, audio: bytes):
+        if len(audio) > self.memory_bytes // 4:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pcm")
+
+    def _read_disk(self, key: str) -> bytes:
+        """Worker-thread read of one entry. Raises OSError/ValueError for a missing or empty file."""
+        path = self._path(key)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            audio = mapped[:]
+        # Touch it so recency survives a restart (the index is rebuilt from mtimes)
+        os.utime(path)
+        return audio
+
+    def _write_disk(self, key: str, audio: bytes):
+        # A unique temp file per write: concurrent puts of one key never share it
+        with tempfile.NamedTemporaryFile(dir=self.disk_dir, prefix=f"{key}.", suffix=".tmp", delete=False) as f:
+            f.write(audio)
+        try:
+            os.replace(f.name, self._path(key))
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def _evict_disk(self):
+        while self._disk_size > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _load_disk_index(self):
+        """Index files left by earlier runs, least recently used first."""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".tmp"):
+                # Left by a write that never finished
+                try:
+                    os.remove(os.path.join(self.disk_dir, name))
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".pcm"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+        self._evict_disk()
@@ -0,0 +1,341 @@
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.services.tts_service import TTSService
+from app.utils.audio_buffer import FrameBuffer
+from app.utils.sentence_detection import SmartSentenceBuffer
+
+logger = logging.getLogger(__name__)
+
+# TTS output format: 16-bit mono PCM at 16kHz
+BYTES_PER_MS = 16000 * 2 // 1000
+
+
+class TTSScheduler:
+    """
+    Per-turn TTS synthesis scheduler.
+    Synthesizes up to `lookahead` upcoming sentences concurrently while
+    delivering their PCM to the client strictly in sentence order.
+
+    In streaming mode the sentence at the head of the queue is forwarded
+    frame-by-frame as it arrives; sentences behind it keep buffering.
+    """
+
+    def __init__(
+        self,
+        tts_service: TTSService,
+        send_audio: Callable[[bytes], Awaitable[None]],
+        is_cancelled: Callable[[], bool],
+        lookahead: Optional[int] = None,
+        on_first_audio: Optional[Callable[[], None]] = None,
+        streaming: Optional[bool] = None,
+        jitter_buffer_ms: Optional[int] = None,
+        record: bool = False,
+    ):
+        """
+        Args:
+            tts_service: Service used to synthesize each sentence
+            send_audio: Coroutine that delivers a PCM payload to the client
+            is_cancelled: Returns True once the turn was interrupted or superseded
+            lookahead: Maximum number of sentences synthesized at once
+            on_first_audio: Called right before the first PCM payload is sent
+            streaming: Forward frames as they arrive instead of whole sentences
+            jitter_buffer_ms: Minimum audio per frame sent in streaming mode
+            record: Keep each sentence's PCM for recording() (e.g. to cache the turn's audio)
+        """
+        self.tts_service = tts_service
+        self.send_audio = send_audio
+        self.is_cancelled = is_cancelled
+        self.on_first_audio = on_first_audio
+        self.lookahead = max(1, lookahead or settings.TTS_LOOKAHEAD)
+        self.streaming = settings.TTS_STREAMING_DOWNLINK if streaming is None else streaming
+        if jitter_buffer_ms is None:
+            jitter_buffer_ms = settings.TTS_JITTER_BUFFER_MS
+        # Keep frames sample-aligned (2 bytes per sample)
+        self.min_frame_bytes = max(2, (jitter_buffer_ms * BYTES_PER_MS) & ~1)
+        self._framer = FrameBuffer(self.min_frame_bytes)
+
+        self._slots = asyncio.Semaphore(self.lookahead)
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._synth_tasks: list[asyncio.Task] = []
+        self._closed = False
+        self._audio_sent = False
+        # (sentence, PCM chunks) per submitted sentence while recording; None once a sentence failed
+        self._recorded: Optional[list[tuple[str, list[bytes]]]] = [] if record else None
+        self._sender = asyncio.create_task(self._deliver())
+
+    @staticmethod
+    def prefetch(tts_service: TTSService, sentence: str) -> asyncio.Task:
+        """
+        Synthesize a sentence before its turn exists (speculative generation).
+        Pass the returned task to submit(prefetched=...) to use the audio.
+        """
+        async def collect() -> list[bytes]:
+            return [chunk async for chunk in tts_service.stream_audio(sentence) if chunk]
+        return asyncio.create_task(collect())
+
+    def submit(self, sentence: str, prefetched: Optional[asyncio.Task] = None):
+        """Queue a sentence for synthesis. Returns immediately."""
+        if self._closed or self.is_cancelled():
+            if prefetched is not None:
+                prefetched.cancel()
+            return
+        chunks: asyncio.Queue = asyncio.Queue()
+        recorded = None
+        if self._recorded is not None:
+            recorded = []
+            self._recorded.append((sentence, recorded))
+        task = asyncio.create_task(self._synthesize(sentence, chunks, prefetched, recorded))
+        self._synth_tasks.append(task)
+        self._pending.put_nowait(chunks)
+
+    def submit_audio(self, pcm: bytes):
+        """Queue already synthesized audio (e.g. a cached sentence) in order with the rest."""
+        if self._closed or self.is_cancelled() or not pcm:
+            return
+        chunks: asyncio.Queue = asyncio.Queue()
+        chunks.put_nowait(pcm)
+        chunks.put_nowait(None)
+        self._pending.put_nowait(chunks)
+
+    def recording(self) -> Optional[list[tuple[str, bytes]]]:
+        """Every sentence's complete PCM, in order; None if not recording or anything was lost."""
+        if not self._recorded or self.is_cancelled():
+            return None
+        return [(sentence, b"".join(parts)) for sentence, parts in self._recorded]
+
+    async def finish(self):
+        """Wait until every submitted sentence has been delivered (or the turn was cancelled)."""
+        if not self._closed:
+            self._closed = True
+            self._pending.put_nowait(None)
+        try:
+            await self._sender
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        """Cancel outstanding synthesis and delivery. Safe to call more than once."""
+        self._closed = True
+        tasks = [t for t in (self._sender, *self._synth_tasks) if not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._synth_tasks.clear()
+
+    async def _synthesize(
+        self,
+        sentence: str,
+        chunks: asyncio.Queue,
+        prefetched: Optional[asyncio.Task] = None,
+        recorded: Optional[list[bytes]] = None,
+    ):
+        """Synthesize one sentence, pushing PCM chunks into its queue. None marks the end."""
+        sentence_hash = hashlib.md5(sentence.encode()).hexdigest()[:8]
+        complete = False
+        try:
+            if prefetched is not None:
+                try:
+                    audio = await prefetched
+                except Exception as e:
+                    logger.warning(f"Prefetched TTS failed for sentence hash {sentence_hash}, resynthesizing: {e}")
+                else:
+                    logger.info(f"TTS using prefetched audio for sentence hash: {sentence_hash}")
+                    for audio_chunk in audio:
+                        chunks.put_nowait(audio_chunk)
+                    if recorded is not None:
+                        recorded.extend(audio)
+                    complete = True
+                    return
+            async with self._slots:
+                if self.is_cancelled():
+                    return
+                logger.info(f"TTS generating audio for sentence (hash: {sentence_hash}): {sentence[:50]}...")
+                total = 0
+                async for audio_chunk in self.tts_service.stream_audio(sentence, chunk_size=self.min_frame_bytes):
+                    if self.is_cancelled():
+                        logger.info(f"TTS interrupted for sentence hash: {sentence_hash}")
+                        return
+                    if audio_chunk:
+                        total += len(audio_chunk)
+                        chunks.put_nowait(audio_chunk)
+                        if recorded is not None:
+                            recorded.append(audio_chunk)
+                logger.info(f"TTS completed for sentence hash: {sentence_hash}, audio size: {total} bytes")
+                # stream_audio swallows provider errors; no audio means the sentence failed
+                complete = total > 0
+        except Exception as e:
+            logger.error(f"TTS streaming error for sentence hash {sentence_hash}: {e}")
+        finally:
+            if recorded is not None and not complete:
+                self._recorded = None
+            chunks.put_nowait(None)
+
+    async def _send(self, pcm: bytes):
+        if not self._audio_sent:
+            self._audio_sent = True
+            if self.on_first_audio:
+                self.on_first_audio()
+        await self.send_audio(pcm)
+
+    async def _deliver(self):
+        while True:
+            chunks = await self._pending.get()
+            if chunks is None:
+                return
+            if self.streaming:
+                await self._deliver_streaming(chunks)
+            else:
+                await self._deliver_buffered(chunks)
+            if self.is_cancelled():
+                return
+
+    async def _deliver_buffered(self, chunks: asyncio.Queue):
+        pcm_parts = []
+        while (chunk := await chunks.get()) is not None:
+            pcm_parts.append(chunk)
+        if pcm_parts and not self.is_cancelled():
+            await self._send(b"".join(pcm_parts))
+
+    async def _deliver_streaming(self, chunks: asyncio.Queue):
+        # Small jitter buffer: coalesce network chunks into whole jitter-buffer frames
+        # (sample-aligned, min_frame_bytes each) so the client never schedules tiny buffers.
+        self._framer.clear()
+        while (chunk := await chunks.get()) is not None:
+            if self.is_cancelled():
+                return
+            self._framer.write(chunk)
+            frames = self._framer.read_frames()
+            if frames is not None:
+                await self._send(bytes(frames))
+        tail = self._framer.read_aligned()
+        if tail is not None and not self.is_cancelled():
+            await self._send(bytes(tail))
+
+
+class StreamingTTSScheduler(TTSScheduler):
+    """
+    Per-turn scheduler for the cartesia_ws backend.
+    Instead of one synthesis per sentence, LLM text is pushed word by word
+    into a single streaming websocket for the whole turn and its PCM is
+    forwarded as it arrives (always in streaming delivery mode).
+
+    If the websocket cannot be opened or fails mid-turn, the text whose
+    audio never arrived, plus everything pushed afterwards, is regrouped
+    into sentences and synthesized over the HTTP path instead.
+    """
+
+    def __init__(
+        self,
+        tts_service: TTSService,
+        send_audio: Callable[[bytes], Awaitable[None]],
+        is_cancelled: Callable[[], bool],
+        clean_sentence: Callable[[str], str],
+        on_first_audio: Optional[Callable[[], None]] = None,
+        jitter_buffer_ms: Optional[int] = None,
+        min_chars: Optional[int] = None,
+    ):
+        """
+        Args:
+            clean_sentence: Per-sentence cleanup applied on the HTTP fallback path
+            min_chars: Minimum text per websocket push (sent on word boundaries)
+        """
+        super().__init__(
+            tts_service,
+            send_audio,
+            is_cancelled,
+            lookahead=1,
+            on_first_audio=on_first_audio,
+            streaming=True,
+            jitter_buffer_ms=jitter_buffer_ms,
+        )
+        self.clean_sentence = clean_sentence
+        self.min_chars = settings.TTS_STREAM_MIN_CHARS if min_chars is None else min_chars
+        self._words = ""
+        # Whole-word text for the stream; None marks the end of the turn
+        self._text: asyncio.Queue = asyncio.Queue()
+        chunks: asyncio.Queue = asyncio.Queue()
+        self._synth_tasks.append(asyncio.create_task(self._stream(chunks)))
+        self._pending.put_nowait(chunks)
+
+    def push_text(self, text: str):
+        """Queue raw LLM text. Returns immediately."""
+        if self._closed or self.is_cancelled() or not text:
+            return
+        self._words += text
+        # Hold back the trailing partial word
+        cut = max(self._words.rfind(" "), self._words.rfind("\n"))
+        if cut + 1 >= self.min_chars:
+            self._text.put_nowait(self._words[:cut + 1])
+            self._words = self._words[cut + 1:]
+
+    def submit(self, sentence: str, prefetched: Optional[asyncio.Task] = None):
+        """Sentence-at-a-time callers work too; the text joins the same stream."""
+        if prefetched is not None:
+            prefetched.cancel()
+        self.push_text(sentence if sentence.endswith(" ") else sentence + " ")
+
+    async def finish(self):
+        if not self._closed:
+            if self._words.strip():
+                self._text.put_nowait(self._words)
+            self._words = ""
+            self._text.put_nowait(None)
+        await super().finish()
+
+    async def _stream(self, chunks: asyncio.Queue):
+        stream = None
+        unspoken = ""
+        try:
+            try:
+                stream = await self.tts_service.open_stream()
+                writer = asyncio.create_task(self._write(stream))
+                try:
+                    async for pcm in stream.audio():
+                        if self.is_cancelled():
+                            return
+                        chunks.put_nowait(pcm)
+                    return
+                finally:
+                    writer.cancel()
+                    await asyncio.gather(writer, return_exceptions=True)
+            except Exception as e:
+                if self.is_cancelled():
+                    return
+                unspoken = stream.unspoken_text() if stream else ""
+                logger.warning(f"Streaming TTS failed, falling back to HTTP: {e}")
+            await self._fallback(unspoken, chunks)
+        finally:
+            if stream is not None:
+                await stream.aclose()
+            chunks.put_nowait(None)
+
+    async def _write(self, stream):
+        while (text := await self._text.get()) is not None:
+            await stream.push(text)
+        await stream.end()
+
+    async def _fallback(self, unspoken: str, chunks: asyncio.Queue):
+        """Synthesize the unspoken and still-arriving text sentence by sentence over HTTP."""
+        sentence_buffer = SmartSentenceBuffer()
+        sentences = sentence_buffer.add_chunk(unspoken + " ") if unspoken else []
+        while True:
+            for sentence in sentences:
+                clean = self.clean_sentence(sentence)
+                if not clean:
+                    continue
+                async for pcm in self.tts_service.stream_audio(clean, chunk_size=self.min_frame_bytes):
+                    if self.is_cancelled():
+                        return
+                    chunks.put_nowait(pcm)
+            if sentence_buffer is None:
+                return
+            text = await self._text.get()
+            if text is None:
+                sentences, sentence_buffer = sentence_buffer.flush(), None
+            else:
+                sentences = sentence_buffer.add_chunk(text)
@@ -1,6 +1,11 @@
 import asyncio
+import hashlib
 import aiohttp
+from typing import Optional
 from app.core.config import settings
+from app.services.cartesia_ws import CartesiaTurnStream
+from app.services.tts_cache import TTSAudioCache
+from app.utils.audio_buffer import FrameBuffer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,30 +17,61 @@ class TTSService:
     Streams PCM audio at 16kHz for real-time playback.
     """
     
-    def __init__(self):
+    def __init__(self, pool_limit: Optional[int] = None, cache: Optional[TTSAudioCache] = None):
+        """
+        Args:
+            pool_limit: Max concurrent provider connections (defaults to TTS_HTTP_POOL_LIMIT)
+            cache: Synthesized audio cache (None disables caching)
+        """
+        self.cache = cache
+        # One keep-alive session for every sentence of every conversation: DNS, TCP and
+        # TLS setup are paid once per pooled connection instead of once per sentence
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.pool_limit = settings.TTS_HTTP_POOL_LIMIT if pool_limit is None else pool_limit
         self.cartesia_api_key = settings.CARTESIA_API_KEY
         self.deepgram_api_key = settings.DEEPGRAM_API_KEY
         self.deepgram_voice = "aura-2-odysseus-en"
         self.cartesia_voice_id = "a0e99841-438c-4a64-b679-ae501e7d6091"
         self.deepgram_url = "https://api.deepgram.com/v1/speak"
         self.cartesia_url = "https://api.cartesia.ai/tts/bytes"
+        self.cartesia_ws_url = settings.CARTESIA_WS_URL
+        self.sample_rate = 16000
+        self.backend = settings.TTS_BACKEND
     
-    async def stream_audio(self, text: str):
+    @property
+    def audio_format(self) -> str:
+        """Identifies voices and PCM format, for caches that store this service's audio."""
+        identity = f"{self.cartesia_voice_id}:{self.deepgram_voice}:pcm_s16le:{self.sample_rate}"
+        return hashlib.md5(identity.encode()).hexdigest()[:12]
+
+    async def stream_audio(self, text: str, chunk_size: int = 16384):
         """
         Stream TTS audio with Cartesia primary, Deepgram fallback.
         
         Args:
             text: Text to convert to speech
+            chunk_size: Number of bytes to accumulate before yielding a chunk
             
         Yields:
             bytes: PCM audio chunks (16-bit signed, 16kHz)
         """
         if not text or not text.strip():
             return
+
+        # A cached sentence streams straight from memory or disk, with no upstream call
+        if self.cache:
+            audio = await self.cache.get(
+                self.cache.key("cartesia", self.cartesia_voice_id, self.sample_rate, text),
+                self.cache.key("deepgram", self.deepgram_voice, self.sample_rate, text),
+            )
+            if audio is not None:
+                for chunk in self.cache.frames(audio, chunk_size):
+                    yield chunk
+                return
         
         # Try Deepgram first
         try:
-            async for chunk in self._stream_cartesia(text):
+            async for chunk in self._cached("cartesia", self.cartesia_voice_id, text, self._stream_cartesia(text, chunk_size)):
                 yield chunk
             return  # Success
         except Exception as e:
@@ -43,12 +79,73 @@ class TTSService:
         
         # Fallback to Deepgram
         try:
-            async for chunk in self._stream_deepgram(text):
+            async for chunk in self._cached("deepgram", self.deepgram_voice, text, self._stream_deepgram(text, chunk_size)):
                 yield chunk
         except Exception as e:
             logger.error(f"Both TTS providers failed: {e}")
+
+    async def _cached(self, provider: str, voice: str, text: str, stream):
+        """Pass a provider stream through, storing its audio once it completes."""
+        if not self.cache:
+            async for chunk in stream:
+                yield chunk
+            return
+        parts = []
+        async for chunk in stream:
+            parts.append(chunk)
+            yield chunk
+        # Only reached when the provider finished and the consumer read it all
+        await self.cache.put(self.cache.key(provider, voice, self.sample_rate, text), b"".join(parts))
     
-    async def _stream_deepgram(self, text: str):
+    async def open_stream(self) -> CartesiaTurnStream:
+        """Connect a Cartesia websocket for one turn (the cartesia_ws backend). Raises on failure."""
+        stream = CartesiaTurnStream(
+            self.cartesia_api_key,
+            self.cartesia_voice_id,
+            url=self.cartesia_ws_url,
+            connect_timeout=settings.TTS_CONNECT_TIMEOUT_S,
+        )
+        await stream.start()
+        return stream
+
+    def http_session(self) -> aiohttp.ClientSession:
+        """The long-lived pooled session, created on first use (inside the running loop)."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_limit,
+                    keepalive_timeout=settings.TTS_KEEPALIVE_S,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    connect=settings.TTS_CONNECT_TIMEOUT_S,
+                    sock_read=settings.TTS_READ_TIMEOUT_S,
+                ),
+            )
+        return self.session
+
+    async def aclose(self):
+        """Close the pooled session. Called once from the app lifespan."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    @staticmethod
+    async def _frames(response: aiohttp.ClientResponse, chunk_size: int):
+        """Re-frame the response body into sample-aligned chunks of chunk_size bytes."""
+        # Network chunks can have odd lengths; frames must never split an int16 sample
+        framer = FrameBuffer(max(2, chunk_size & ~1))
+        async for chunk in response.content.iter_chunked(8192):
+            framer.write(chunk)
+            for frame in framer.frames():
+                # Copied out: the scheduler queues frames past the framer's next write
+                yield bytes(frame)
+        tail = framer.read_aligned()
+        if tail:
+            yield bytes(tail)
+
+    async def _stream_deepgram(self, text: str, chunk_size: int = 16384):
         """Stream audio from Deepgram Aura."""
         headers = {
             "Authorization": f"Token {self.deepgram_api_key}",
@@ -58,31 +155,24 @@ class TTSService:
         params = {
             "model": self.deepgram_voice,
             "encoding": "linear16",
-            "sample_rate": "16000"
+            "sample_rate": str(self.sample_rate)
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.deepgram_url,
-                headers=headers,
-                params=params,
-                json={"text": text}
-            ) as response:
-                if response.status == 200:
-                    buffer = b""
-                    async for chunk in response.content.iter_chunked(8192):
-                        if chunk:
-                            buffer += chunk
-                            while len(buffer) >= 16384:
-                                yield buffer[:16384]
-                                buffer = buffer[16384:]
-                    if buffer:
-                        yield buffer
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Deepgram error ({response.status}): {error_text}")
+        session = self.http_session()
+        async with session.post(
+            self.deepgram_url,
+            headers=headers,
+            params=params,
+            json={"text": text}
+        ) as response:
+            if response.status == 200:
+                async for frame in self._frames(response, chunk_size):
+                    yield frame
+            else:
+                error_text = await response.text()
+                raise Exception(f"Deepgram error ({response.status}): {error_text}")
     
-    async def _stream_cartesia(self, text: str):
+    async def _stream_cartesia(self, text: str, chunk_size: int = 16384):
         """Stream audio from Cartesia AI (fallback)."""
         headers = {
             "X-API-Key": self.cartesia_api_key,
@@ -100,26 +190,19 @@ class TTSService:
             "output_format": {
                 "container": "raw",
                 "encoding": "pcm_s16le",
-                "sample_rate": 16000
+                "sample_rate": self.sample_rate
             }
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.cartesia_url,
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    buffer = b""
-                    async for chunk in response.content.iter_chunked(8192):
-                        if chunk:
-                            buffer += chunk
-                            while len(buffer) >= 16384:
-                                yield buffer[:16384]
-                                buffer = buffer[16384:]
-                    if buffer:
-                        yield buffer
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Cartesia error ({response.status}): {error_text}")
+        session = self.http_session()
+        async with session.post(
+            self.cartesia_url,
+            headers=headers,
+            json=payload
+        ) as response:
+            if response.status == 200:
+                async for frame in self._frames(response, chunk_size):
+                    yield frame
+            else:
+                error_text = await response.text()
+                raise Exception(f"Cartesia error ({response.status}): {error_text}")
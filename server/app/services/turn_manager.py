@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TurnManager:
+    """
+    Runs each conversation turn as its own asyncio task.
+    Starting a new turn or a barge-in cancels the running turn immediately;
+    cancellation propagates into whatever the turn is awaiting (Groq stream,
+    TTS requests), and the old turn's cleanup finishes before the next starts.
+    """
+
+    def __init__(self, cancel_timeout: float = 1.0):
+        """
+        Args:
+            cancel_timeout: Seconds to wait for a cancelled turn to finish its cleanup
+        """
+        self.cancel_timeout = cancel_timeout
+        self.generation = 0
+        self._current: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_idle(self) -> bool:
+        """True when no turn is running."""
+        return self._current is None or self._current.done()
+
+    def is_current(self, generation: int) -> bool:
+        """True while `generation` is the most recently started turn."""
+        return generation == self.generation
+
+    async def start(self, turn: Callable[[int], Awaitable[None]]) -> asyncio.Task:
+        """
+        Cancel the running turn (if any) and start a new one.
+
+        Args:
+            turn: Coroutine function called with the new turn's generation id
+
+        Returns:
+            The task running the new turn
+        """
+        async with self._lock:
+            # Invalidate the old generation first so its cleanup sees itself as cancelled
+            self.generation += 1
+            generation = self.generation
+            await self._cancel_current()
+            self._current = asyncio.create_task(self._run(turn, generation))
+            return self._current
+
+    async def cancel(self):
+        """Cancel the running turn (barge-in)."""
+        async with self._lock:
+            # Invalidate the generation so checks inside the turn fail right away
+            self.generation += 1
+            await self._cancel_current()
+
+    async def aclose(self):
+        """Cancel the running turn when the connection closes."""
+        await self.cancel()
+
+    async def _cancel_current(self):
+        task, self._current = self._current, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        done, _ = await asyncio.wait({task}, timeout=self.cancel_timeout)
+        if not done:
+            logger.warning(f"Cancelled turn did not finish cleanup within {self.cancel_timeout}s")
+
+    async def _run(self, turn: Callable[[int], Awaitable[None]], generation: int):
+        try:
+            await turn(generation)
+        except asyncio.CancelledError:
+            logger.info(f"Turn {generation} cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Turn {generation} failed: {e}", exc_info=True)
+        finally:
+            if self._current is asyncio.current_task():
+                self._current = None
@@ -1,4 +1,9 @@
 import logging
+from collections import deque
+from typing import Optional
+
+from app.core.config import settings
+from app.utils.audio_buffer import FrameBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -6,15 +11,18 @@ class VADService:
     """
     Voice Activity Detection Service
     Uses webrtcvad if available, falls back to energy-based detection.
+    Incoming chunks are re-framed into exact VAD frames, so decisions do not
+    depend on how the client packetizes its audio.
     """
     
-    def __init__(self, mode: int = 1, sample_rate: int = 16000):
+    def __init__(self, mode: int = 1, sample_rate: int = 16000, frame_ms: Optional[int] = None):
         """
         Initialize VAD service.
         
         Args:
             mode: Aggressiveness mode (0-3), 0 is least aggressive, 3 is most aggressive
             sample_rate: Audio sample rate in Hz (must be 8000, 16000, 32000, or 48000)
+            frame_ms: VAD frame duration (10, 20 or 30 ms), defaults to VAD_FRAME_MS
         """
         self.mode = mode
         self.sample_rate = sample_rate
@@ -22,8 +30,13 @@ class VADService:
         self.vad = None
         
         # Frame duration in milliseconds (10, 20, or 30 ms for webrtcvad)
-        self.frame_duration_ms = 30
+        self.frame_duration_ms = frame_ms or settings.VAD_FRAME_MS
+        if self.frame_duration_ms not in (10, 20, 30):
+            raise ValueError(f"VAD frame duration must be 10, 20 or 30 ms, got {self.frame_duration_ms}")
         self.frame_size = int(sample_rate * self.frame_duration_ms / 1000)
+        # Audio not yet covered by a full frame carries over to the next chunk
+        self.frames = FrameBuffer(self.frame_size * 2)
+        self.last_frame_speech = False
         
         # Energy-based VAD fallback parameters
         self.energy_threshold = 30  # More sensitive for quiet microphones
@@ -43,26 +56,46 @@ class VADService:
         except Exception as e:
             logger.error(f"Failed to initialize webrtcvad: {e}, using energy-based VAD")
     
-    def is_speech(self, audio_chunk: bytes) -> bool:
+    def classify(self, audio_chunk: bytes) -> list[tuple[bytes, bool]]:
         """
-        Determine if the audio chunk contains speech.
-        
+        Re-frame a chunk and decide each frame it completes.
+
         Args:
             audio_chunk: Raw PCM audio data (16-bit signed)
-            
+
         Returns:
-            True if speech is detected, False otherwise
+            (frame, is_speech) for every complete frame, oldest first. A partial
+            frame at the end is held until the next chunk completes it.
         """
         if len(audio_chunk) == 0:
-            return False
-            
-        if self.use_webrtc and self.vad:
-            result = self._webrtc_is_speech(audio_chunk)
-        else:
-            result = self._energy_is_speech(audio_chunk)
-        
-        # Track state changes for logging
-        if result:
+            return []
+
+        self.frames.write(audio_chunk)
+        decisions = []
+        for frame in self.frames.frames():
+            if self.use_webrtc and self.vad:
+                speech = self._webrtc_is_speech(frame)
+            else:
+                speech = self._energy_is_speech(frame)
+            decisions.append((bytes(frame), speech))
+            self._track(speech)
+        if decisions:
+            self.last_frame_speech = decisions[-1][1]
+        return decisions
+
+    def is_speech(self, audio_chunk: bytes) -> bool:
+        """
+        True if any frame the chunk completes is speech. A chunk that completes
+        no frame keeps the previous frame's decision.
+        """
+        decisions = self.classify(audio_chunk)
+        if not decisions:
+            return self.last_frame_speech
+        return any(speech for _, speech in decisions)
+
+    def _track(self, speech: bool):
+        # Track state changes for logging (counted in frames)
+        if speech:
             self.speech_frame_count += 1
             self.silence_frame_count = 0
             if self.last_speech_state != True:
@@ -74,35 +107,23 @@ class VADService:
             if self.last_speech_state != False and self.silence_frame_count > 10:
                 logger.info(f"[VAD] Silence detected")
                 self.last_speech_state = False
-        
-        return result
     
-    def _webrtc_is_speech(self, audio_chunk: bytes) -> bool:
+    def reset(self):
+        """Drop any partial frame, e.g. when the audio stream restarts."""
+        self.frames.clear()
+        self.last_frame_speech = False
+
+    def _webrtc_is_speech(self, frame: memoryview) -> bool:
         """
-        Use webrtcvad for speech detection.
+        Use webrtcvad for speech detection on one exact frame (10, 20, or 30ms).
         """
         try:
-            # webrtcvad requires specific frame sizes (10, 20, or 30ms)
-            # If chunk is not the right size, we'll process what we can
-            chunk_len = len(audio_chunk)
-            bytes_per_frame = self.frame_size * 2  # 2 bytes per sample (16-bit)
-            
-            if chunk_len < bytes_per_frame:
-                # Not enough data, consider it silence
-                return False
-
-            # Scan all full frames in this chunk; treat as speech if any frame is speech.
-            for i in range(0, chunk_len - bytes_per_frame + 1, bytes_per_frame):
-                frame = audio_chunk[i : i + bytes_per_frame]
-                if self.vad.is_speech(frame, self.sample_rate):
-                    return True
-            return False
-            
+            return self.vad.is_speech(frame, self.sample_rate)
         except Exception as e:
             logger.error(f"WebRTC VAD error: {e}, falling back to energy-based detection")
-            return self._energy_is_speech(audio_chunk)
+            return self._energy_is_speech(frame)
     
-    def _energy_is_speech(self, audio_chunk: bytes) -> bool:
+    def _energy_is_speech(self, audio_chunk) -> bool:
         """
         Fallback energy-based speech detection.
         """
@@ -123,3 +144,140 @@ class VADService:
         except Exception as e:
             logger.error(f"Energy-based VAD error: {e}")
             return True  # When in doubt, pass audio through
+
+
+class SpeechGate:
+    """
+    Decides which audio is forwarded upstream based on VAD decisions.
+    Opens on speech, stays open for a hangover window after the last speech
+    frame, and keeps a short pre-roll ring buffer of recent silent audio that
+    is flushed ahead of the first speech frame so word onsets are not clipped.
+    """
+
+    def __init__(self, hangover_ms: int = 800, preroll_ms: int = 300, sample_rate: int = 16000):
+        """
+        Args:
+            hangover_ms: Audio still forwarded after the last speech frame
+            preroll_ms: Audio kept from before speech starts
+            sample_rate: Audio sample rate in Hz (16-bit mono)
+        """
+        self.bytes_per_ms = sample_rate * 2 // 1000
+        self.hangover_bytes = hangover_ms * self.bytes_per_ms
+        self.preroll_bytes = preroll_ms * self.bytes_per_ms
+        self.is_open = False
+        self._silence_bytes = 0
+        self._preroll: deque[bytes] = deque()
+        self._preroll_size = 0
+
+    def reset(self):
+        self.is_open = False
+        self._silence_bytes = 0
+        self._preroll.clear()
+        self._preroll_size = 0
+
+    def update(self, chunk: bytes, is_speech: bool) -> list[bytes]:
+        """
+        Feed one chunk and its VAD decision.
+
+        Returns:
+            Chunks to forward upstream, in order (empty while the gate is closed)
+        """
+        if is_speech:
+            self._silence_bytes = 0
+            if self.is_open:
+                return [chunk]
+            self.is_open = True
+            forwarded = list(self._preroll)
+            forwarded.append(chunk)
+            self._preroll.clear()
+            self._preroll_size = 0
+            return forwarded
+
+        if self.is_open:
+            self._silence_bytes += len(chunk)
+            if self._silence_bytes <= self.hangover_bytes:
+                return [chunk]
+            self.is_open = False
+            logger.debug("[VAD] Gate closed after hangover")
+
+        # Closed: remember the most recent audio as pre-roll
+        self._preroll.append(chunk)
+        self._preroll_size += len(chunk)
+        while self._preroll and self._preroll_size - len(self._preroll[0]) >= self.preroll_bytes:
+            self._preroll_size -= len(self._preroll.popleft())
+        return []
+
+
+class EndpointDetector:
+    """
+    Server-side end-of-utterance detection.
+    Fires once per utterance: after at least `min_speech_ms` of speech, on a
+    run of `silence_ms` VAD silence, or earlier when the client reports
+    speech_end. Re-arms when speech starts again.
+    """
+
+    def __init__(self, silence_ms: int = 300, min_speech_ms: int = 200, use_client_hint: bool = True):
+        """
+        Args:
+            silence_ms: Continuous silence that ends an utterance
+            min_speech_ms: Speech required before an endpoint can fire (ignores clicks and coughs)
+            use_client_hint: Let the client's speech_end message end the utterance
+        """
+        self.silence_ms = silence_ms
+        self.min_speech_ms = min_speech_ms
+        self.use_client_hint = use_client_hint
+        self._speech_ms = 0.0
+        self._silence_ms = 0.0
+
+    def reset(self):
+        self._speech_ms = 0.0
+        self._silence_ms = 0.0
+
+    @property
+    def in_utterance(self) -> bool:
+        return self._speech_ms >= self.min_speech_ms
+
+    def update(self, is_speech: bool, duration_ms: float) -> bool:
+        """
+        Feed the VAD decision for one frame.
+
+        Returns:
+            True if this frame ends the utterance
+        """
+        if is_speech:
+            self._speech_ms += duration_ms
+            self._silence_ms = 0.0
+            return False
+        if not self.in_utterance:
+            # Silence before enough speech: forget any short blip
+            self._speech_ms = 0.0
+            return False
+        self._silence_ms += duration_ms
+        if self._silence_ms >= self.silence_ms:
+            self.reset()
+            return True
+        return False
+
+    def update_frames(self, decisions: list[bool], frame_ms: float) -> bool:
+        """
+        Feed the VAD decisions for consecutive frames, oldest first.
+
+        Returns:
+            True if any of them ends the utterance
+        """
+        ended = False
+        for is_speech in decisions:
+            ended = self.update(is_speech, frame_ms) or ended
+        return ended
+
+    def client_speech_end(self) -> bool:
+        """
+        Apply the client's speech_end hint.
+
+        Returns:
+            True if it ends the utterance (the server also heard speech and has not fired yet)
+        """
+        if not self.use_client_hint or not self.in_utterance:
+            return False
+        self.reset()
+        return True
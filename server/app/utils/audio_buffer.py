@@ -0,0 +1,97 @@
+from typing import Iterator, Optional
+
+
+class FrameBuffer:
+    """
+    FIFO byte buffer that re-frames a PCM stream into fixed-size frames.
+    Incoming chunks of any size are appended to one reusable bytearray and
+    complete frames are handed out as memoryview slices of it, so framing
+    costs one copy in and none out. Consumed space is reclaimed by moving the
+    unread tail to the front; the buffer only grows when a write does not fit.
+
+    Returned views are only valid until the next write() or clear(): consume
+    (or copy) them before feeding more audio.
+    """
+
+    def __init__(self, frame_bytes: int, capacity: int = 0, sample_bytes: int = 2):
+        """
+        Args:
+            frame_bytes: Size of each frame handed out by frames()
+            capacity: Initial buffer size in bytes (defaults to a few frames)
+            sample_bytes: Bytes per sample across channels; frames never split one
+        """
+        if frame_bytes <= 0:
+            raise ValueError("frame_bytes must be positive")
+        if frame_bytes % sample_bytes:
+            raise ValueError(f"frame_bytes must be a multiple of {sample_bytes} (whole samples)")
+        self.frame_bytes = frame_bytes
+        self.sample_bytes = sample_bytes
+        self._buf = bytearray(max(capacity, frame_bytes * 4))
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+
+    @classmethod
+    def for_duration(cls, frame_ms: float, sample_rate: int = 16000, sample_width: int = 2, channels: int = 1) -> "FrameBuffer":
+        """Framer for `frame_ms` of PCM, rounded down to whole samples (at least one)."""
+        sample_bytes = sample_width * channels
+        samples = max(1, int(sample_rate * frame_ms / 1000))
+        return cls(samples * sample_bytes, sample_bytes=sample_bytes)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def write(self, data) -> None:
+        """Append a chunk (bytes, bytearray or memoryview)."""
+        size = len(data)
+        if not size:
+            return
+        if self._end + size > len(self._buf):
+            self._make_room(size)
+        self._view[self._end:self._end + size] = data
+        self._end += size
+
+    def read(self, size: int) -> Optional[memoryview]:
+        """Take exactly `size` bytes, or None if fewer are buffered."""
+        if self._end - self._start < size:
+            return None
+        start = self._start
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+        return self._view[start:start + size]
+
+    def read_all(self) -> memoryview:
+        """Take everything buffered, including a trailing partial frame."""
+        return self.read(len(self))
+
+    def read_aligned(self) -> Optional[memoryview]:
+        """Take every whole sample buffered (e.g. the tail at end of stream), or None."""
+        size = len(self) - len(self) % self.sample_bytes
+        return self.read(size) if size else None
+
+    def read_frames(self) -> Optional[memoryview]:
+        """Take all complete frames as one view, or None if there is not a full frame yet."""
+        size = len(self) - len(self) % self.frame_bytes
+        return self.read(size) if size else None
+
+    def frames(self) -> Iterator[memoryview]:
+        """Yield every complete frame currently buffered, oldest first."""
+        while self._end - self._start >= self.frame_bytes:
+            yield self.read(self.frame_bytes)
+
+    def clear(self) -> None:
+        self._start = self._end = 0
+
+    def _make_room(self, size: int):
+        pending = self._end - self._start
+        if pending + size <= len(self._buf):
+            # Reuse the existing buffer: slide the unread tail to the front
+            self._view[:pending] = self._view[self._start:self._end]
+        else:
+            # A new buffer rather than a resize, so outstanding views stay valid
+            grown = bytearray(max(len(self._buf) * 2, pending + size))
+            grown[:pending] = self._view[self._start:self._end]
+            self._buf = grown
+            self._view = memoryview(grown)
+        self._start, self._end = 0, pending
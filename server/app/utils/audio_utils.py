@@ -44,3 +44,246 @@ def process_audio_chunk(chunk_bytes: bytes) -> bytes:
     audio_data = apply_noise_gate(audio_data)
     
     return audio_data.tobytes()
+
+
+# Block response matrices depend only on the filter design, so all connections share them.
+# Bounded: chunks are cut into fixed steps, so only block lengths up to block_size and
+# chains of up to step_blocks blocks ever occur
+_BIQUAD_MATRICES: dict[tuple, np.ndarray] = {}
+
+
+class BiquadHighPass:
+    """
+    Streaming second-order (RBJ biquad) high-pass filter.
+    Keeps its state across chunks, so consecutive chunks are filtered as one
+    continuous signal. The recursion is evaluated exactly with precomputed
+    state-space matrices: each block of `block_size` samples is a small matrix
+    product, and a fixed chain matrix hands the state across the blocks of
+    one step (`step_blocks` blocks). Steps are processed together, with only
+    the 2-sample state carried from step to step in a scalar loop, so the cost
+    is linear in the chunk length and the matrices never depend on it.
+    """
+
+    def __init__(self, cutoff: float = 200, fs: int = 16000, q: float = 0.7071, block_size: int = 32, step_blocks: int = 16):
+        w0 = 2 * np.pi * cutoff / fs
+        cos_w0 = np.cos(w0)
+        alpha = np.sin(w0) / (2 * q)
+        a0 = 1 + alpha
+        b0 = (1 + cos_w0) / 2 / a0
+        b1 = -(1 + cos_w0) / a0
+        b2 = (1 + cos_w0) / 2 / a0
+        a1 = -2 * cos_w0 / a0
+        a2 = (1 - alpha) / a0
+
+        # Transposed direct form II as a state-space system:
+        # y[n] = b0 x[n] + z1;  z' = A z + B x[n]
+        self.b0 = b0
+        self.A = np.array([[-a1, 1.0], [-a2, 0.0]])
+        self.B = np.array([b1 - a1 * b0, b2 - a2 * b0])
+        self.block_size = block_size
+        self.step_blocks = step_blocks
+        self.state = np.zeros(2)
+        self._design = (cutoff, fs, q)
+
+    def reset(self):
+        self.state = np.zeros(2)
+
+    def _powers(self, n: int) -> np.ndarray:
+        """A^k for k = 0..n."""
+        powers = np.empty((n + 1, 2, 2))
+        powers[0] = np.eye(2)
+        for k in range(1, n + 1):
+            powers[k] = self.A @ powers[k - 1]
+        return powers
+
+    def _block_matrices(self, n: int) -> tuple:
+        """
+        Exact response matrices for one block of n samples, laid out for row-vector blocks:
+        (input -> output, input -> end state, start state -> output, A^n).
+        """
+        key = (self._design, "block", n)
+        cached = _BIQUAD_MATRICES.get(key)
+        if cached is not None:
+            return cached
+        powers = self._powers(n)
+        # Impulse response: h[0] = b0, h[k] = (A^(k-1) B)[0]
+        h = np.empty(n)
+        h[0] = self.b0
+        h[1:] = powers[:n - 1, 0, :] @ self.B
+        idx = np.arange(n)
+        lag = idx[None, :] - idx[:, None]
+        input_to_out = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+        # End state contributed by each input sample: A^(n-1-k) B
+        input_to_state = powers[n - 1::-1] @ self.B
+        # Zero-input response: y[k] = (A^k z)[0]
+        state_to_out = powers[:n, 0, :].T
+        cached = (input_to_out, input_to_state, state_to_out, powers[n])
+        _BIQUAD_MATRICES[key] = cached
+        return cached
+
+    def _chain_matrix(self, n: int, m: int) -> np.ndarray:
+        """
+        Maps [z0, d_0 .. d_(m-1)] to [z_0 .. z_m], where z_(j+1) = A^n z_j + d_j,
+        i.e. the start state of every block plus the final state.
+        """
+        key = (self._design, "chain", n, m)
+        cached = _BIQUAD_MATRICES.get(key)
+        if cached is not None:
+            return cached
+        a_n = self._block_matrices(n)[3]
+        block_powers = np.empty((m + 1, 2, 2))
+        block_powers[0] = np.eye(2)
+        for k in range(1, m + 1):
+            block_powers[k] = a_n @ block_powers[k - 1]
+        chain = np.zeros((2 * (m + 1), 2 * (m + 1)))
+        for j in range(m + 1):
+            rows = slice(2 * j, 2 * j + 2)
+            chain[rows, 0:2] = block_powers[j]
+            for i in range(j):
+                chain[rows, 2 * (i + 1):2 * (i + 2)] = block_powers[j - 1 - i]
+        _BIQUAD_MATRICES[key] = chain
+        return chain
+
+    def _process_blocks(self, blocks: np.ndarray) -> np.ndarray:
+        m, n = blocks.shape
+        input_to_out, input_to_state, state_to_out, a_n = self._block_matrices(n)
+        driven = blocks @ input_to_state
+        if m == 1:
+            starts = self.state[None, :]
+            self.state = a_n @ self.state + driven[0]
+        else:
+            states = (self._chain_matrix(n, m) @ np.concatenate((self.state, driven.ravel()))).reshape(m + 1, 2)
+            starts = states[:m]
+            self.state = states[m]
+        return blocks @ input_to_out + starts @ state_to_out
+
+    def _process_steps(self, steps: np.ndarray) -> np.ndarray:
+        """Filter k steps of m blocks of n samples, shaped (k, m, n)."""
+        k, m, n = steps.shape
+        input_to_out, input_to_state, state_to_out, _ = self._block_matrices(n)
+        chain = self._chain_matrix(n, m)
+        from_start, from_driven = chain[:, :2], chain[:, 2:]
+        # Block states of every step as if it started from rest...
+        zero_start = (steps @ input_to_state).reshape(k, 2 * m) @ from_driven.T
+        # ...then the actual start state of each step, carried across steps
+        (p00, p01), (p10, p11) = from_start[-2:].tolist()
+        z0, z1 = self.state.tolist()
+        starts = np.empty((k, 2))
+        for i, (e0, e1) in enumerate(zero_start[:, -2:].tolist()):
+            starts[i] = z0, z1
+            z0, z1 = p00 * z0 + p01 * z1 + e0, p10 * z0 + p11 * z1 + e1
+        self.state = np.array([z0, z1])
+        states = (zero_start + starts @ from_start.T).reshape(k, m + 1, 2)
+        return steps @ input_to_out + states[:, :m] @ state_to_out
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Filter a float chunk, continuing from the previous chunk's state."""
+        n = self.block_size
+        out = np.empty(len(samples))
+        pos = len(samples) // (n * self.step_blocks) * (n * self.step_blocks)
+        if pos:
+            out[:pos] = self._process_steps(samples[:pos].reshape(-1, self.step_blocks, n)).ravel()
+        # Remainder: fewer than step_blocks whole blocks, then a partial block
+        n_full = pos + (len(samples) - pos) // n * n
+        if n_full > pos:
+            out[pos:n_full] = self._process_blocks(samples[pos:n_full].reshape(-1, n)).ravel()
+        if n_full < len(samples):
+            out[n_full:] = self._process_blocks(samples[n_full:].reshape(1, -1)).ravel()
+        return out
+
+
+class NoiseGate:
+    """
+    Streaming soft noise gate with attack/release smoothing.
+    The envelope is tracked per sub-block and the gain is ramped linearly
+    between sub-blocks, so gating never introduces steps at chunk edges.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.008,
+        floor: float = 0.2,
+        attack_ms: float = 1.0,
+        release_ms: float = 50.0,
+        fs: int = 16000,
+        sub_block: int = 32,
+    ):
+        """
+        Args:
+            threshold: Envelope level (full scale = 1.0) below which the gate closes
+            floor: Gain applied while the gate is closed (attenuate instead of hard-zero)
+            attack_ms: Time constant for opening the gate
+            release_ms: Time constant for closing the gate
+            fs: Sample rate in Hz
+            sub_block: Samples per envelope/gain update
+        """
+        self.threshold = threshold
+        self.floor = floor
+        self.sub_block = sub_block
+        step_ms = 1000 * sub_block / fs
+        self.attack_coeff = float(np.exp(-step_ms / attack_ms))
+        self.release_coeff = float(np.exp(-step_ms / release_ms))
+        self.gain = 1.0
+        self._ramp_steps = np.arange(1, sub_block + 1) / sub_block
+
+    def reset(self):
+        self.gain = 1.0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        n = len(samples)
+        if n == 0:
+            return samples
+        n_blocks = -(-n // self.sub_block)
+        padded_len = n_blocks * self.sub_block
+        magnitude = np.abs(samples)
+        if padded_len != n:
+            magnitude = np.concatenate((magnitude, np.zeros(padded_len - n)))
+        envelope = magnitude.reshape(n_blocks, self.sub_block).max(axis=1)
+        is_open = envelope >= self.threshold
+
+        # Steady state (gate fully open or fully closed for the whole chunk): constant gain
+        if is_open.all() or not is_open.any():
+            target = 1.0 if is_open[0] else self.floor
+            if abs(self.gain - target) < 1e-4:
+                self.gain = target
+                return samples if target == 1.0 else samples * target
+
+        gains = [self.gain]
+        gain = self.gain
+        for block_open in is_open.tolist():
+            target = 1.0 if block_open else self.floor
+            coeff = self.attack_coeff if target > gain else self.release_coeff
+            gain = target + coeff * (gain - target)
+            gains.append(gain)
+        self.gain = gain
+
+        # Ramp linearly from the gain at the start of each sub-block to the gain at its end
+        gains = np.asarray(gains)
+        ramp = gains[:-1, None] + np.diff(gains)[:, None] * self._ramp_steps
+        return samples * ramp.ravel()[:n]
+
+
+class StreamingAudioProcessor:
+    """
+    Per-connection ingest DSP chain: stateful high-pass filter followed by a
+    noise gate. Replaces process_audio_chunk, which filters each chunk as a
+    standalone signal with an FFT.
+    """
+
+    def __init__(self, sample_rate: int = 16000, cutoff: int = 200, gate_threshold: float = 0.008):
+        self.high_pass = BiquadHighPass(cutoff=cutoff, fs=sample_rate)
+        self.noise_gate = NoiseGate(threshold=gate_threshold, fs=sample_rate)
+
+    def reset(self):
+        self.high_pass.reset()
+        self.noise_gate.reset()
+
+    def process(self, chunk_bytes: bytes) -> bytes:
+        """Filter a raw 16-bit PCM chunk, continuing from the previous chunk."""
+        audio_data = np.frombuffer(chunk_bytes, dtype=np.int16)
+        if len(audio_data) == 0:
+            return b""
+        samples = audio_data / 32768.0
+        samples = self.high_pass.process(samples)
+        samples = self.noise_gate.process(samples)
+        return np.clip(samples * 32768.0, -32768, 32767).astype(np.int16).tobytes()
@@ -1,4 +1,5 @@
 import time
+from collections import deque
 from functools import wraps
 import logging
 
@@ -9,6 +10,12 @@ class MetricsTracker:
         self.metrics = {}
         self.tokens_count = 0
         self.model_name = "Llama 3.3 70B" # Default
+        # Speculative generation outcomes (hits are committed, misses cancelled)
+        self.speculation_hits = 0
+        self.speculation_misses = 0
+        self.speculation_saved_ms = 0.0
+        # Planning mode: which branch answered (search_cached / grounded / draft)
+        self.planning_branch = None
 
     def set_model(self, model: str):
         self.model_name = model
@@ -23,9 +30,20 @@ class MetricsTracker:
             return duration
         return 0
 
+    def record_timing(self, name: str, duration_ms: float):
+        """Record a duration measured elsewhere (e.g. by a background task)."""
+        self.metrics[name] = {"duration": duration_ms}
+
     def add_tokens(self, count: int):
         self.tokens_count += count
 
+    def record_speculation(self, hit: bool, saved_ms: float = 0.0):
+        if hit:
+            self.speculation_hits += 1
+            self.speculation_saved_ms += saved_ms
+        else:
+            self.speculation_misses += 1
+
     def get_tps(self):
         # Calculate TPS based on llm_generation duration
         gen_duration = self.metrics.get("llm_generation", {}).get("duration", 0)
@@ -37,8 +55,35 @@ class MetricsTracker:
         data = {k: v.get("duration", 0) for k, v in self.metrics.items()}
         data["tps"] = self.get_tps()
         data["model"] = self.model_name
+        resolved = self.speculation_hits + self.speculation_misses
+        if resolved:
+            data["speculation_hit_rate"] = self.speculation_hits / resolved
+            data["speculation_saved_ms"] = self.speculation_saved_ms / max(1, self.speculation_hits)
+        if self.planning_branch:
+            data["planning_branch"] = self.planning_branch
         return data
 
+class LatencyWindow:
+    """Rolling window of the most recent latencies (ms), for process-wide percentile reporting."""
+
+    def __init__(self, size: int = 1024):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, ms: float):
+        self._samples.append(ms)
+
+    def percentiles(self) -> dict:
+        if not self._samples:
+            return {"count": 0}
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+        return {
+            "count": len(ordered),
+            "p50_ms": round(ordered[round(last * 0.50)], 1),
+            "p95_ms": round(ordered[round(last * 0.95)], 1),
+            "p99_ms": round(ordered[round(last * 0.99)], 1),
+        }
+
 def time_it(name: str):
     def decorator(func):
         @wraps(func)
@@ -0,0 +1,39 @@
+import unicodedata
+
+# Sentence punctuation and quotes, stripped only at word edges: operators, signs
+# and decimal points change what was asked ("5+3" vs "5-3", "C++" vs "C", "2.5")
+_EDGE_PUNCTUATION = ".,!?;:\"“”‘’«»…—"
+
+
+def normalize_transcript(text: str) -> str:
+    """
+    Canonical form of a transcript for comparison: lowercase, no sentence
+    punctuation, single spaces. Apostrophes are dropped so "don't" and "dont"
+    compare equal.
+    """
+    if not text:
+        return ""
+    text = text.lower().replace("’", "'").replace("'", "")
+    words = (word.strip(_EDGE_PUNCTUATION) for word in text.split())
+    return " ".join(word for word in words if word)
+
+# Hesitation tokens STT transcribes verbatim; they never change what was asked
+_FILLER_WORDS = frozenset({"um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "hmm", "mm", "mhm"})
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a user query for cache keys: normalize_transcript plus
+    dropping STT filler words, so "Um, what's the weather?" and
+    "whats the weather" share one entry.
+    """
+    return " ".join(word for word in normalize_transcript(text).split() if word not in _FILLER_WORDS)
+
+
+def normalize_tts_text(text: str) -> str:
+    """
+    Canonical form of text sent to TTS, for cache keys. Only whitespace and
+    Unicode composition are normalized: case and punctuation change how the
+    text is spoken, so they stay part of the key.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
@@ -0,0 +1,49 @@
+"""
+Ingest DSP microbenchmark.
+
+Compares the per-chunk FFT filter (process_audio_chunk) with the stateful
+StreamingAudioProcessor on 20 ms frames and on the 4096-sample chunks the
+browser ScriptProcessor sends, reporting microseconds per call and per 20 ms
+of audio.
+
+Usage:
+    PYTHONPATH=. python benchmarks/audio_dsp.py
+"""
+import timeit
+
+import numpy as np
+
+from app.utils.audio_utils import StreamingAudioProcessor, process_audio_chunk
+
+SAMPLE_RATE = 16000
+FRAME_20MS = SAMPLE_RATE // 50
+
+
+def _signal(n_samples: int, amplitude: float) -> bytes:
+    t = np.arange(n_samples) / SAMPLE_RATE
+    speech_like = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 50 * t)
+    noise = np.random.default_rng(0).normal(0, 0.05, n_samples)
+    return (np.clip(speech_like + noise, -1, 1) * amplitude).astype(np.int16).tobytes()
+
+
+def _time_us(fn, chunk: bytes, number: int) -> float:
+    fn(chunk)
+    return min(timeit.repeat(lambda: fn(chunk), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    processor = StreamingAudioProcessor()
+    print(f"{'chunk':>14} {'level':>7} {'fft us':>9} {'stream us':>10} {'fft us/20ms':>12} {'stream us/20ms':>15}")
+    for n_samples in (FRAME_20MS, 4096):
+        for label, amplitude in (("speech", 8000), ("quiet", 40)):
+            chunk = _signal(n_samples, amplitude)
+            number = 2000 if n_samples == FRAME_20MS else 300
+            fft_us = _time_us(process_audio_chunk, chunk, number)
+            stream_us = _time_us(processor.process, chunk, number)
+            frames = n_samples / FRAME_20MS
+            print(f"{n_samples:>8} smp {label:>7} {fft_us:>9.1f} {stream_us:>10.1f} "
+                  f"{fft_us / frames:>12.1f} {stream_us / frames:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
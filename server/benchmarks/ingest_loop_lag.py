@@ -0,0 +1,108 @@
+"""
+Event-loop lag under N simulated speakers.
+
+Each simulated connection sends a 20 ms, 16 kHz PCM frame every 20 ms through
+the real ingest pipeline (webrtcvad + StreamingAudioProcessor): inline on the
+event loop, or via the IngestWorkerPool in thread or process mode. A probe task sleeps 5 ms in a
+loop and records how late it wakes up, which is the delay every other
+coroutine on the loop (token streaming, TTS sends) would see.
+
+Usage:
+    PYTHONPATH=. python benchmarks/ingest_loop_lag.py --speakers 50 100 200 --seconds 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from app.services.ingest_service import IngestPipeline, IngestWorkerPool, InlineIngestChannel
+
+FRAME_SAMPLES = 320
+FRAME_SECONDS = 0.02
+PROBE_INTERVAL = 0.005
+
+
+def _frame(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    t = np.arange(FRAME_SAMPLES) / 16000
+    signal = 0.3 * np.sin(2 * np.pi * 180 * t) + rng.normal(0, 0.05, FRAME_SAMPLES)
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+async def _probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def _speaker(channel, frame: bytes, deadline: float):
+    next_send = time.perf_counter()
+    while time.perf_counter() < deadline:
+        await channel.submit(frame)
+        next_send += FRAME_SECONDS
+        await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+
+async def _run(mode: str, speakers: int, seconds: float) -> dict:
+    pool = None
+    if mode != "inline":
+        pool = IngestWorkerPool(mode=mode)
+        pool.start()
+
+    delivered = 0
+
+    async def on_result(result):
+        nonlocal delivered
+        delivered += 1
+
+    channels = []
+    for i in range(speakers):
+        pipeline = IngestPipeline.create()
+        if pool:
+            channels.append(pool.channel(pipeline, on_result))
+        else:
+            channels.append(InlineIngestChannel(pipeline, on_result))
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(_speaker(c, _frame(i), deadline) for i, c in enumerate(channels)))
+    await asyncio.sleep(0.1)
+    stop.set()
+    await probe
+    for channel in channels:
+        await channel.aclose()
+    if pool:
+        await pool.close()
+
+    lags.sort()
+    return {
+        "delivered": delivered,
+        "p50": statistics.median(lags),
+        "p99": lags[int(len(lags) * 0.99)],
+        "max": lags[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--speakers", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    print(f"{'mode':>7} {'speakers':>8} {'frames':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for speakers in args.speakers:
+        for mode in ("inline", "thread", "process"):
+            r = await _run(mode, speakers, args.seconds)
+            print(f"{mode:>7} {speakers:>8} {r['delivered']:>8} {r['p50']:>11.2f} {r['p99']:>11.2f} {r['max']:>11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
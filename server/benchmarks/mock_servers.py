@@ -0,0 +1,363 @@
+"""
+Local stand-ins for upstream services, for benchmarks and manual testing.
+
+MockDeepgramServer speaks enough of the Deepgram live protocol for STTService:
+it accepts binary audio, emits an interim Results message for every
+`interim_every_ms` of audio received, answers Finalize with a final result and
+closes on CloseStream (after a Metadata message, like Deepgram).
+
+MockTTSServer answers the two HTTP TTS endpoints TTSService calls (Cartesia
+/tts/bytes and Deepgram /v1/speak) with streamed silent PCM, and counts the
+TCP connections it accepts so connection reuse is visible.
+
+MockCartesiaWSServer speaks the Cartesia streaming TTS websocket protocol:
+text pushed to a context (continue: true) is answered with base64 PCM chunks
+and word timestamps; an empty transcript with continue: false ends the
+context with a done message, and cancel stops it. `fail_after_chunks` drops
+the socket mid-turn to exercise the HTTP fallback.
+
+MockTavilyServer answers POST /search like the Tavily search API, after
+`latency_ms`, with `max_results` canned results, and counts requests and TCP
+connections.
+
+Usage (standalone, then point DEEPGRAM_LIVE_URL / the TTS URLs at it):
+    PYTHONPATH=. python benchmarks/mock_servers.py deepgram --port 8765
+    PYTHONPATH=. python benchmarks/mock_servers.py tts --port 8766
+    PYTHONPATH=. python benchmarks/mock_servers.py cartesia-ws --port 8767
+    PYTHONPATH=. python benchmarks/mock_servers.py tavily --port 8768
+"""
+import argparse
+import asyncio
+import base64
+import json
+
+from aiohttp import web
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+# 16kHz 16-bit mono
+BYTES_PER_MS = 32
+
+
+def _results(transcript: str, is_final: bool, **extra) -> str:
+    # Full Results shape: the Deepgram SDK parses every field
+    return json.dumps({
+        "type": "Results",
+        "channel_index": [0, 1],
+        "duration": 0.5,
+        "start": 0.0,
+        "is_final": is_final,
+        "speech_final": is_final,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.99, "words": []}]},
+        "metadata": {
+            "request_id": "mock",
+            "model_info": {"name": "mock", "version": "0", "arch": "mock"},
+            "model_uuid": "mock",
+        },
+        "from_finalize": False,
+        **extra,
+    })
+
+
+class MockDeepgramServer:
+    """Deepgram live transcription stand-in; use as an async context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, interim_every_ms: int = 500):
+        self.host = host
+        self.port = port
+        self.interim_bytes = interim_every_ms * BYTES_PER_MS
+        self.connections = 0
+        self.audio_bytes = 0
+        self.audio_messages = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v1/listen"
+
+    async def __aenter__(self) -> "MockDeepgramServer":
+        self._server = await serve(self._handle, self.host, self.port, max_queue=64)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws: ServerConnection):
+        self.connections += 1
+        received = 0
+        words = 0
+        async for message in ws:
+            if isinstance(message, bytes):
+                self.audio_messages += 1
+                self.audio_bytes += len(message)
+                before = received // self.interim_bytes
+                received += len(message)
+                if received // self.interim_bytes > before:
+                    words += 1
+                    await ws.send(_results(" ".join(["word"] * words), is_final=False))
+                continue
+            kind = json.loads(message).get("type")
+            if kind == "Finalize":
+                if words:
+                    await ws.send(_results(" ".join(["word"] * words), is_final=True, from_finalize=True))
+                words = 0
+            elif kind == "CloseStream":
+                await ws.send(json.dumps({"type": "Metadata", "duration": received / BYTES_PER_MS / 1000}))
+                await ws.close()
+                return
+
+
+class MockTTSServer:
+    """HTTP TTS stand-in; use as an async context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        first_byte_ms: float = 0.0,
+        handshake_ms: float = 0.0,
+        ms_per_char: float = 60.0,
+        chunk_bytes: int = 4096,
+    ):
+        """
+        Args:
+            first_byte_ms: Simulated synthesis delay before the first audio byte
+            handshake_ms: Extra delay on a connection's first request, standing in for
+                the TCP/TLS round trips a new connection costs over a real network
+            ms_per_char: Audio duration returned per character of text
+            chunk_bytes: Size of each streamed body chunk
+        """
+        self.host = host
+        self.port = port
+        self.first_byte = first_byte_ms / 1000
+        self.handshake = handshake_ms / 1000
+        self.ms_per_char = ms_per_char
+        self.chunk_bytes = chunk_bytes
+        self.requests = 0
+        self._peers: set = set()
+        self._runner = None
+
+    @property
+    def connections(self) -> int:
+        """Distinct TCP connections that carried at least one request."""
+        return len(self._peers)
+
+    @property
+    def cartesia_url(self) -> str:
+        return f"http://{self.host}:{self.port}/tts/bytes"
+
+    @property
+    def deepgram_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/speak"
+
+    async def __aenter__(self) -> "MockTTSServer":
+        app = web.Application()
+        app.router.add_post("/tts/bytes", self._cartesia)
+        app.router.add_post("/v1/speak", self._deepgram)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+    async def _cartesia(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        return await self._speak(request, payload.get("transcript", ""))
+
+    async def _deepgram(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        return await self._speak(request, payload.get("text", ""))
+
+    async def _speak(self, request: web.Request, text: str) -> web.StreamResponse:
+        self.requests += 1
+        peer = request.transport.get_extra_info("peername")
+        delay = self.first_byte
+        if peer not in self._peers:
+            self._peers.add(peer)
+            delay += self.handshake
+        if delay:
+            await asyncio.sleep(delay)
+        response = web.StreamResponse(headers={"Content-Type": "application/octet-stream"})
+        await response.prepare(request)
+        remaining = int(len(text) * self.ms_per_char) * BYTES_PER_MS
+        chunk = b"\0" * self.chunk_bytes
+        while remaining > 0:
+            await response.write(chunk[:remaining])
+            remaining -= self.chunk_bytes
+        await response.write_eof()
+        return response
+
+
+class MockCartesiaWSServer:
+    """Cartesia streaming TTS websocket stand-in; use as an async context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        first_byte_ms: float = 0.0,
+        ms_per_char: float = 60.0,
+        fail_after_chunks: int = 0,
+    ):
+        """
+        Args:
+            first_byte_ms: Simulated delay before the audio of each pushed text
+            ms_per_char: Audio duration returned per character of text
+            fail_after_chunks: Close the socket after this many audio chunks (0 = never)
+        """
+        self.host = host
+        self.port = port
+        self.first_byte = first_byte_ms / 1000
+        self.ms_per_char = ms_per_char
+        self.fail_after_chunks = fail_after_chunks
+        self.connections = 0
+        self.messages: list[dict] = []
+        self.chunks_sent = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/tts/websocket"
+
+    async def __aenter__(self) -> "MockCartesiaWSServer":
+        self._server = await serve(self._handle, self.host, self.port, max_queue=64)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws: ServerConnection):
+        self.connections += 1
+        cancelled: set[str] = set()
+        # Synthesis is sequential per socket, like one context generating in order
+        work: asyncio.Queue = asyncio.Queue()
+        speaker = asyncio.create_task(self._speak(ws, work, cancelled))
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                self.messages.append(message)
+                if message.get("cancel"):
+                    cancelled.add(message["context_id"])
+                    continue
+                await work.put(message)
+        except ConnectionClosed:
+            pass
+        finally:
+            speaker.cancel()
+            await asyncio.gather(speaker, return_exceptions=True)
+
+    async def _speak(self, ws: ServerConnection, work: asyncio.Queue, cancelled: set):
+        while True:
+            message = await work.get()
+            context_id = message.get("context_id")
+            if context_id in cancelled:
+                continue
+            text = message.get("transcript", "")
+            if text:
+                if self.first_byte:
+                    await asyncio.sleep(self.first_byte)
+                pcm = b"\0" * (int(len(text) * self.ms_per_char) * BYTES_PER_MS)
+                for offset in range(0, len(pcm), 8192):
+                    await ws.send(json.dumps({
+                        "type": "chunk", "context_id": context_id, "status_code": 206, "done": False,
+                        "data": base64.b64encode(pcm[offset:offset + 8192]).decode(),
+                    }))
+                    self.chunks_sent += 1
+                    if self.fail_after_chunks and self.chunks_sent >= self.fail_after_chunks:
+                        await ws.close(1011, "mock failure")
+                        return
+                if message.get("add_timestamps"):
+                    words = text.split()
+                    await ws.send(json.dumps({
+                        "type": "timestamps", "context_id": context_id, "status_code": 206, "done": False,
+                        "word_timestamps": {"words": words, "start": [0.0] * len(words), "end": [0.0] * len(words)},
+                    }))
+            if not message.get("continue", False):
+                await ws.send(json.dumps({"type": "done", "context_id": context_id, "status_code": 206, "done": True}))
+
+
+class MockTavilyServer:
+    """Tavily search API stand-in; use as an async context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 300.0):
+        """
+        Args:
+            latency_ms: Simulated search time before the response
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.queries: list[str] = []
+        self._peers: set = set()
+        self._runner = None
+
+    @property
+    def connections(self) -> int:
+        return len(self._peers)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/search"
+
+    async def __aenter__(self) -> "MockTavilyServer":
+        app = web.Application()
+        app.router.add_post("/search", self._search)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+    async def _search(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self._peers.add(request.transport.get_extra_info("peername"))
+        payload = await request.json()
+        self.queries.append(payload.get("query", ""))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        results = [
+            {"url": f"https://example.com/{i}", "content": f"Result {i} for {payload.get('query')}", "score": 0.9}
+            for i in range(payload.get("max_results", 3))
+        ]
+        return web.json_response({"query": payload.get("query"), "results": results})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("service", choices=["deepgram", "tts", "cartesia-ws", "tavily"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.service == "tavily":
+        async with MockTavilyServer(args.host, args.port) as server:
+            print(f"Mock Tavily listening on {server.url}")
+            await asyncio.Future()
+    if args.service == "cartesia-ws":
+        async with MockCartesiaWSServer(args.host, args.port) as server:
+            print(f"Mock Cartesia websocket listening on {server.url}")
+            await asyncio.Future()
+    if args.service == "tts":
+        async with MockTTSServer(args.host, args.port) as server:
+            print(f"Mock TTS listening on {server.cartesia_url} and {server.deepgram_url}")
+            await asyncio.Future()
+    async with MockDeepgramServer(args.host, args.port) as server:
+        print(f"Mock Deepgram listening on {server.url}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+PCM framer throughput microbenchmark.
+
+Re-frames a TTS-sized PCM stream arriving in network chunks into fixed
+frames two ways:
+  concat:  buffer += chunk; buffer = buffer[n:]  (the old provider loop; every
+           frame copies the whole remainder, quadratic in frames per chunk)
+  framer:  FrameBuffer (one copy in, one copy out per frame)
+and reports MB/s for 20 ms and 100 ms frames and several network chunk sizes,
+including odd sizes, where the concat loop also splits samples across frames.
+
+Usage:
+    PYTHONPATH=. python benchmarks/pcm_framer.py
+"""
+import timeit
+
+from app.utils.audio_buffer import FrameBuffer
+
+STREAM_BYTES = 4 * 1024 * 1024  # ~2 minutes of 16kHz 16-bit mono
+
+
+def _chunks(chunk_bytes: int) -> list[bytes]:
+    payload = bytes(range(256)) * (STREAM_BYTES // 256)
+    return [payload[i:i + chunk_bytes] for i in range(0, len(payload), chunk_bytes)]
+
+
+def _concat(chunks: list[bytes], frame_bytes: int) -> int:
+    out = 0
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= frame_bytes:
+            out += len(buffer[:frame_bytes])
+            buffer = buffer[frame_bytes:]
+    return out + len(buffer)
+
+
+def _framer(chunks: list[bytes], frame_bytes: int) -> int:
+    out = 0
+    framer = FrameBuffer(frame_bytes)
+    for chunk in chunks:
+        framer.write(chunk)
+        for frame in framer.frames():
+            out += len(bytes(frame))
+    tail = framer.read_aligned()
+    return out + (len(bytes(tail)) if tail is not None else 0)
+
+
+def _mb_per_s(fn, chunks: list[bytes], frame_bytes: int) -> float:
+    seconds = min(timeit.repeat(lambda: fn(chunks, frame_bytes), number=1, repeat=3))
+    return STREAM_BYTES / seconds / 1e6
+
+
+def main():
+    print(f"{'frame':>7} {'net chunk':>10} {'concat MB/s':>12} {'framer MB/s':>12} {'speedup':>8}")
+    for frame_ms in (20, 100):
+        frame_bytes = FrameBuffer.for_duration(frame_ms).frame_bytes
+        for chunk_bytes in (1371, 8192, 65536, 262144):
+            chunks = _chunks(chunk_bytes)
+            concat = _mb_per_s(_concat, chunks, frame_bytes)
+            framer = _mb_per_s(_framer, chunks, frame_bytes)
+            print(f"{frame_ms:>5}ms {chunk_bytes:>10} {concat:>12.0f} {framer:>12.0f} {framer / concat:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Semantic cache lookup benchmark.
+
+Fills a SemanticCache with N distinct synthetic queries, then looks up
+paraphrased probes (fillers, dropped words, typos, contractions) and reports
+lookup latency (featurize + LSH candidates + cosine top-k + guard) next to a
+brute-force scan of the full matrix. For probes whose brute-force best entry
+clears the threshold it reports index recall (the LSH search finds that
+entry) and how often lookup() serves it once the lexical guard has run.
+
+It also reports the false-positive rate on near misses, questions that
+differ from a stored one by an entity swap, reordering, negation or a
+number, both for the cosine threshold alone and with the lexical guard.
+Near misses are synthetic variants of stored queries plus NEAR_MISS_PAIRS.
+
+Usage:
+    PYTHONPATH=. python benchmarks/semantic_cache.py --entries 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from app.services.semantic_cache import SemanticCache
+
+TEMPLATES = ["what is {a} {b}", "tell me about {a} and {b}", "how does {a} {b} work", "explain {a} {b} to me",
+             "why is {a} {b} important", "give me a fact about {a} {b}", "what should i know about {a} {b}",
+             "can you describe the {a} {b}", "who invented the {a} {b}", "how old is the {a} {b}",
+             "what's the difference between {a} and {b}", "is {a} better than {b}"]
+
+
+TEMPLATE_WORDS = {word for template in TEMPLATES for word in template.split()}
+
+
+def _vocabulary(size: int, rng: random.Random) -> list[str]:
+    # Pronounceable made-up words, so topics don't collapse onto a handful of real ones
+    consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _queries(count: int, rng: random.Random) -> list[str]:
+    vocabulary = _vocabulary(5000, rng)
+    seen, queries = set(), []
+    while len(queries) < count:
+        query = rng.choice(TEMPLATES).format(a=rng.choice(vocabulary), b=rng.choice(vocabulary))
+        if query not in seen:
+            seen.add(query)
+            queries.append(query)
+    return queries
+
+
+def _paraphrase(query: str, rng: random.Random) -> str:
+    words = query.split()
+    kind = rng.randrange(4)
+    if kind == 0:
+        return "um " + query + "?"
+    if kind == 1 and len(words) > 4:
+        del words[rng.randrange(len(words))]
+        return " ".join(words)
+    if kind == 2:
+        i = rng.randrange(len(query))
+        return query[:i] + query[i + 1:]
+    return query.replace("what is", "what's").capitalize() + "."
+
+
+# (stored question, different question that scores close to it)
+NEAR_MISS_PAIRS = [
+    ("what is the capital of austria", "what is the capital of australia"),
+    ("convert celsius to fahrenheit", "convert fahrenheit to celsius"),
+    ("what is 15 percent of 80", "what is 15 percent of 90"),
+    ("what is 5+3", "what is 5-3"),
+    ("is coffee bad for you", "is coffee not bad for you"),
+    ("how far is paris from london", "how far is london from paris"),
+    ("who was the first president of the united states", "who was the second president of the united states"),
+    ("how many calories in a banana", "how many calories in a bandana"),
+]
+
+
+def _near_miss(query: str, rng: random.Random) -> str:
+    words = query.split()
+    # Only the topic words: reshuffling template words just makes word salad of the same question
+    content = [i for i, word in enumerate(words) if word not in TEMPLATE_WORDS and len(word) > 3]
+    kind = rng.randrange(3)
+    if kind == 0 and len(content) >= 2:
+        # Swap two content words ("a to b" -> "b to a")
+        i, j = rng.sample(content, 2)
+        words[i], words[j] = words[j], words[i]
+    elif kind == 1 and content:
+        # Entity lookalike: two letters of one content word changed
+        i = rng.choice(content)
+        word = list(words[i])
+        for position in rng.sample(range(len(word)), 2):
+            word[position] = rng.choice([c for c in "aeioubdklmst" if c != word[position]])
+        words[i] = "".join(word)
+    else:
+        words.insert(min(2, len(words)), "not")
+    return " ".join(words)
+
+
+def _brute_force(cache: SemanticCache, query: str) -> tuple[float, int]:
+    vector = cache.featurizer.embed(query)
+    scores = cache._vectors[:len(cache)] @ vector
+    best = int(np.argmax(scores))
+    return float(scores[best]), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--probes", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--tables", type=int, default=32)
+    parser.add_argument("--bits", type=int, default=18)
+    parser.add_argument("--max-candidates", type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cache = SemanticCache(
+        threshold=args.threshold, capacity=args.entries,
+        tables=args.tables, bits=args.bits, max_candidates=args.max_candidates,
+    )
+    queries = _queries(args.entries, rng)
+    start = time.perf_counter()
+    for i, query in enumerate(queries):
+        cache.add(query, f"answer {i}")
+    print(f"filled {len(cache)} entries in {time.perf_counter() - start:.1f}s")
+
+    probes = [_paraphrase(rng.choice(queries), rng) for _ in range(args.probes)]
+    # Timed in separate passes: a full-matrix scan between lookups would evict
+    # the LSH path's working set from the CPU caches and skew its numbers
+    lookup_us, brute_us, found = [], [], []
+    for probe in probes:
+        t = time.perf_counter()
+        found.append(cache.lookup(probe))
+        lookup_us.append((time.perf_counter() - t) * 1e6)
+    eligible = indexed = served = 0
+    for probe, answer in zip(probes, found):
+        t = time.perf_counter()
+        score, best = _brute_force(cache, probe)
+        brute_us.append((time.perf_counter() - t) * 1e6)
+        if score >= args.threshold:
+            eligible += 1
+            indexed += [a for _, a in cache.search(probe, k=1)] == [f"answer {best}"]
+            served += answer == f"answer {best}"
+
+    for label, samples in (("lookup", lookup_us), ("brute force", brute_us)):
+        samples.sort()
+        print(f"{label:>12}: p50={statistics.median(samples):.0f}us "
+              f"p99={samples[int(len(samples) * 0.99)]:.0f}us mean={statistics.mean(samples):.0f}us")
+    print(f"probes over threshold {args.threshold}: {eligible}/{len(probes)}, "
+          f"index recall vs brute force: {indexed / max(1, eligible):.3f}, "
+          f"served after guard: {served / max(1, eligible):.3f}")
+
+    # False positives: any answer for a question that was never stored is wrong
+    stored = set(queries)
+    for stored_query, _ in NEAR_MISS_PAIRS:
+        cache.add(stored_query, f"answer to {stored_query}")
+    near_misses = [near for _, near in NEAR_MISS_PAIRS]
+    while len(near_misses) < args.probes:
+        near = _near_miss(rng.choice(queries), rng)
+        if near not in stored:
+            near_misses.append(near)
+    over_threshold = guarded = 0
+    for near in near_misses:
+        results = cache.search(near, k=1)
+        over_threshold += bool(results) and results[0][0] >= args.threshold
+        guarded += cache.lookup(near) is not None
+    print(f"near misses: {len(near_misses)}, false positives with threshold only: "
+          f"{over_threshold / len(near_misses):.3f}, with guard: {guarded / len(near_misses):.3f}")
+
+
+if __name__ == "__main__":
+    main()
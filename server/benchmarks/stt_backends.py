@@ -0,0 +1,111 @@
+"""
+STT backend concurrency benchmark.
+
+Opens N concurrent STTService streams against the local mock Deepgram server
+(benchmarks/mock_servers.py) with each backend, streams 20 ms audio frames in
+real time, and reports OS threads, resident memory and transcripts received.
+Each backend runs in its own subprocess so the numbers do not mix.
+
+Usage:
+    PYTHONPATH=. python benchmarks/stt_backends.py --streams 200 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.mock_servers import MockDeepgramServer
+
+FRAME = b"\0" * 640  # 20 ms of 16kHz 16-bit silence
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def _child(backend: str, url: str, streams: int, seconds: float) -> dict:
+    from app.core.config import settings
+    settings.STT_BACKEND = backend
+    settings.DEEPGRAM_LIVE_URL = url
+    from app.services.stt_service import STTService
+
+    transcripts = 0
+
+    async def on_transcript(text: str, is_final: bool):
+        nonlocal transcripts
+        transcripts += 1
+
+    baseline = {"threads": threading.active_count(), "rss_mb": _rss_mb()}
+    services = []
+    for _ in range(streams):
+        service = STTService(on_transcript)
+        if backend == "sdk":
+            from deepgram import DeepgramClient, DeepgramClientOptions
+            service.dg_client = DeepgramClient("mock", DeepgramClientOptions(url=url.rsplit("/v1/", 1)[0]))
+        services.append(service)
+    start = time.perf_counter()
+    await asyncio.gather(*(service.start() for service in services))
+    connect_s = time.perf_counter() - start
+    connected = sum(1 for service in services if service.dg_connection and not service.deepgram_failed)
+
+    peak_threads = threading.active_count()
+    peak_rss = _rss_mb()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        await asyncio.gather(*(service.send_audio(FRAME) for service in services))
+        peak_threads = max(peak_threads, threading.active_count())
+        peak_rss = max(peak_rss, _rss_mb())
+        await asyncio.sleep(0.02)
+
+    await asyncio.gather(*(service.stop() for service in services))
+    return {
+        "backend": backend,
+        "connected": connected,
+        "connect_s": connect_s,
+        "threads_baseline": baseline["threads"],
+        "threads_peak": peak_threads,
+        "rss_baseline_mb": baseline["rss_mb"],
+        "rss_peak_mb": peak_rss,
+        "transcripts": transcripts,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--backends", default="sdk,asyncio")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(await _child(args.child, args.url, args.streams, args.seconds)))
+        return
+
+    async with MockDeepgramServer() as server:
+        print(f"{'backend':>8} {'streams':>8} {'connect s':>10} {'threads':>8} {'RSS MB':>8} {'MB/stream':>10} {'transcripts':>12}")
+        for backend in args.backends.split(","):
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, __file__, "--child", backend, "--url", server.url,
+                "--streams", str(args.streams), "--seconds", str(args.seconds),
+                stdout=subprocess.PIPE, env={**os.environ, "LOG_LEVEL": "WARNING"},
+            )
+            stdout, _ = await proc.communicate()
+            result = json.loads(stdout.decode().strip().splitlines()[-1])
+            rss = result["rss_peak_mb"] - result["rss_baseline_mb"]
+            print(f"{backend:>8} {result['connected']:>8} {result['connect_s']:>10.2f} "
+                  f"{result['threads_peak'] - result['threads_baseline']:>8} {rss:>8.1f} "
+                  f"{rss / max(1, result['connected']):>10.2f} {result['transcripts']:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
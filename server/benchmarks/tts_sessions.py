@@ -0,0 +1,71 @@
+"""
+TTS per-sentence connection overhead benchmark.
+
+Synthesizes the same sentences through TTSService against the local mock TTS
+server (benchmarks/mock_servers.py) two ways:
+  per-sentence: a fresh TTSService, and so a fresh aiohttp session, per sentence
+                (what every sentence paid before the session was pooled)
+  pooled:       one long-lived TTSService whose keep-alive session is reused
+and reports time to first audio byte, total time per sentence and how many
+TCP connections the server saw. --handshake-ms adds a delay to each new
+connection's first request to stand in for TCP/TLS round trips, which are
+near zero on loopback.
+
+Usage:
+    PYTHONPATH=. python benchmarks/tts_sessions.py --sentences 50 --handshake-ms 60
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.mock_servers import MockTTSServer
+
+SENTENCE = "The weather today is mild with a light breeze from the west."
+
+
+async def _sentence(tts, server: MockTTSServer) -> tuple[float, float]:
+    tts.cartesia_url = server.cartesia_url
+    tts.deepgram_url = server.deepgram_url
+    start = time.perf_counter()
+    first = None
+    async for _ in tts.stream_audio(SENTENCE):
+        if first is None:
+            first = time.perf_counter() - start
+    return first * 1000, (time.perf_counter() - start) * 1000
+
+
+async def _run(mode: str, sentences: int, args) -> dict:
+    from app.services.tts_service import TTSService
+
+    async with MockTTSServer(first_byte_ms=args.first_byte_ms, handshake_ms=args.handshake_ms) as server:
+        firsts, totals = [], []
+        shared = TTSService() if mode == "pooled" else None
+        for _ in range(sentences):
+            tts = shared or TTSService()
+            first, total = await _sentence(tts, server)
+            firsts.append(first)
+            totals.append(total)
+            if shared is None:
+                await tts.aclose()
+        if shared is not None:
+            await shared.aclose()
+        return {"firsts": firsts, "totals": totals, "connections": server.connections}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=50)
+    parser.add_argument("--first-byte-ms", type=float, default=0.0)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':>13} {'sentences':>10} {'connections':>12} {'first byte ms':>14} {'total ms':>9}")
+    for mode in ("per-sentence", "pooled"):
+        result = await _run(mode, args.sentences, args)
+        print(f"{mode:>13} {args.sentences:>10} {result['connections']:>12} "
+              f"{statistics.mean(result['firsts']):>14.2f} {statistics.mean(result['totals']):>9.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Websocket connect-latency benchmark.
+
+Opens N /ws/chat connections against a running server and measures the time
+from the TCP/websocket handshake until the server reports "Engine ready",
+i.e. session lookup/creation plus per-connection service setup.
+
+Usage (server must be running):
+    PYTHONPATH=. python benchmarks/ws_connect_latency.py --connections 50 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from websockets.asyncio.client import connect
+
+
+async def _connect_once(url: str) -> float:
+    device_id = f"bench-{uuid.uuid4()}"
+    start = time.perf_counter()
+    async with connect(f"{url}?device_id={device_id}") as ws:
+        async for message in ws:
+            if isinstance(message, str):
+                data = json.loads(message)
+                if data.get("type") == "system_log" and data.get("text") == "Engine ready":
+                    return (time.perf_counter() - start) * 1000
+                if data.get("type") == "error":
+                    raise RuntimeError(data.get("text"))
+    raise RuntimeError("Connection closed before the engine was ready")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://localhost:8000/ws/chat")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run():
+        async with semaphore:
+            return await _connect_once(args.url)
+
+    results = await asyncio.gather(*(run() for _ in range(args.connections)), return_exceptions=True)
+    latencies = sorted(r for r in results if isinstance(r, float))
+    errors = [r for r in results if not isinstance(r, float)]
+
+    if not latencies:
+        print(f"All {len(errors)} connections failed: {errors[0]!r}")
+        return
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"connections={len(latencies)} errors={len(errors)} concurrency={args.concurrency}")
+    print(f"connect-to-ready ms: mean={statistics.mean(latencies):.1f} "
+          f"p50={statistics.median(latencies):.1f} p95={p95:.1f} max={latencies[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,5 @@
+import os
+
+# Settings requires provider keys; tests never call the providers
+for name in ("DEEPGRAM_API_KEY", "GROQ_API_KEY", "CARTESIA_API_KEY", "TAVILY_API_KEY"):
+    os.environ.setdefault(name, "test")
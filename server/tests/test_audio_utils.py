@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from app.utils import audio_utils
+from app.utils.audio_utils import BiquadHighPass, StreamingAudioProcessor
+
+
+def reference_high_pass(samples: np.ndarray, high_pass: BiquadHighPass) -> np.ndarray:
+    """The biquad recursion evaluated one sample at a time."""
+    state = np.zeros(2)
+    out = np.empty(len(samples))
+    for i, x in enumerate(samples):
+        out[i] = high_pass.b0 * x + state[0]
+        state = high_pass.A @ state + high_pass.B * x
+    return out
+
+
+@pytest.mark.parametrize("splits", [
+    [],
+    [1, 33, 320, 831],
+    [512, 1024, 1536],
+    [4096],
+])
+def test_high_pass_matches_recursion_across_chunks(splits):
+    samples = np.random.default_rng(0).normal(0, 0.3, 6000)
+    high_pass = BiquadHighPass()
+    filtered = np.concatenate([high_pass.process(chunk) for chunk in np.split(samples, splits)])
+    np.testing.assert_allclose(filtered, reference_high_pass(samples, BiquadHighPass()), atol=1e-9)
+
+
+def test_matrix_cache_does_not_grow_with_chunk_sizes():
+    processor = StreamingAudioProcessor()
+    audio_utils._BIQUAD_MATRICES.clear()
+    for n_samples in list(range(1, 1200, 7)) + [16384, 65536, 131072]:
+        processor.process(b"\x01\x00" * n_samples)
+    high_pass = processor.high_pass
+    # At most one entry per partial block length and per shorter chain
+    assert len(audio_utils._BIQUAD_MATRICES) <= high_pass.block_size + high_pass.step_blocks
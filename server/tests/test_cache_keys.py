@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.cache_service import CacheService
+from app.utils.text_normalization import normalize_query
+
+
+@pytest.fixture
+def cache():
+    # Keys are computed locally; the client is never used
+    return CacheService(redis_client=object())
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Um, what's the weather?", "whats the weather"),
+    ("What is the capital of France?", "what is the capital of france"),
+    ("  Tell me   a joke! ", "tell me a joke"),
+    ('"Hello," she said.', "hello she said"),
+])
+def test_equivalent_queries_share_a_key(cache, a, b):
+    assert cache._get_key(a) == cache._get_key(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("What is 5+3?", "What is 5-3?"),
+    ("Is C++ hard?", "Is C hard?"),
+    ("-5 squared", "5 squared"),
+    ("What is 2.5 times 2?", "What is 2 5 times 2?"),
+    ("What is 5 - 3?", "What is 5 3?"),
+])
+def test_different_questions_get_different_keys(cache, a, b):
+    assert normalize_query(a) != normalize_query(b)
+    assert cache._get_key(a) != cache._get_key(b)
+
+
+def test_context_is_part_of_the_key(cache):
+    assert cache._get_key("hi", "prompt a") != cache._get_key("hi", "prompt b")
+
+
+def test_sentence_punctuation_only_stripped_at_word_edges():
+    assert normalize_query("Is 2.5 more than -1, or not?") == "is 2.5 more than -1 or not"
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+from websockets.asyncio.server import serve
+
+from app.services.deepgram_live import DeepgramLiveClient
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def results(transcript, is_final=True):
+    return json.dumps({
+        "type": "Results",
+        "is_final": is_final,
+        "channel": {"alternatives": [{"transcript": transcript}]},
+    })
+
+
+class ScriptedServer:
+    """Sends `script` on every connection, then waits for CloseStream."""
+
+    def __init__(self, script):
+        self.script = script
+        self.connections = 0
+        self._server = None
+
+    @property
+    def url(self):
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}/v1/listen"
+
+    async def __aenter__(self):
+        self._server = await serve(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws):
+        self.connections += 1
+        for message in self.script:
+            await ws.send(message)
+        async for message in ws:
+            if isinstance(message, str) and json.loads(message).get("type") == "CloseStream":
+                await ws.close()
+                return
+
+
+async def wait_until(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_malformed_messages_and_callback_errors_are_skipped():
+    async def scenario():
+        script = [
+            "not json",
+            "[1, 2]",
+            json.dumps({"type": "Results", "channel": "oops"}),
+            json.dumps({"type": "Results", "channel": {"alternatives": "oops"}}),
+            results("first"),
+            results("second"),
+            results("third", is_final=False),
+        ]
+        received, errors = [], []
+
+        async def on_transcript(transcript, is_final):
+            if transcript == "first":
+                raise RuntimeError("callback bug")
+            received.append((transcript, is_final))
+
+        async with ScriptedServer(script) as server:
+            client = DeepgramLiveClient("key", on_transcript, on_error=errors.append, url=server.url)
+            assert await client.start({"model": "nova-2"})
+            await wait_until(lambda: len(received) == 2)
+            assert client.is_open
+            await client.aclose()
+
+        assert received == [("second", True), ("third", False)]
+        assert server.connections == 1
+        assert errors == []
+
+    run(scenario())
+
+
+class FlakyReaderClient(DeepgramLiveClient):
+    """Reader that fails unexpectedly on its first `failures` connections."""
+
+    def __init__(self, *args, failures=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+
+    async def _read(self, ws):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("reader bug")
+        await super()._read(ws)
+
+
+def test_unexpected_reader_failure_reconnects():
+    async def scenario():
+        received, errors = [], []
+
+        async def on_transcript(transcript, is_final):
+            received.append(transcript)
+
+        async with ScriptedServer([results("hello")]) as server:
+            client = FlakyReaderClient(
+                "key", on_transcript, on_error=errors.append, url=server.url, reconnect_delay=0.01,
+            )
+            assert await client.start({})
+            await wait_until(lambda: received == ["hello"])
+            await client.aclose()
+
+        assert server.connections == 2
+        assert errors == []
+
+    run(scenario())
+
+
+def test_unexpected_failure_reaches_on_error_when_reconnects_give_up():
+    async def scenario():
+        errors = []
+
+        async def on_transcript(transcript, is_final):
+            pass
+
+        async with ScriptedServer([]) as server:
+            client = FlakyReaderClient(
+                "key", on_transcript, on_error=errors.append, url=server.url,
+                max_reconnects=0, failures=1,
+            )
+            assert await client.start({})
+            await wait_until(lambda: errors)
+            assert not client.is_open
+
+        assert len(errors) == 1
+        assert isinstance(errors[0], RuntimeError)
+
+    run(scenario())
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from app.services.ingest_service import IngestResult, IngestWorkerPool
+
+
+class BlockingPipeline:
+    """Echoes each frame back; the first frame blocks until released so later frames pile up."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def process(self, raw_audio: bytes) -> IngestResult:
+        self.release.wait(5)
+        return IngestResult(is_speech=True, audio=raw_audio)
+
+
+def test_backlog_drops_oldest_frames():
+    async def scenario():
+        pool = IngestWorkerPool(mode="thread", workers=1, linger_ms=0, max_pending=3)
+        pool.start()
+        pipeline = BlockingPipeline()
+        delivered = []
+
+        async def on_result(result):
+            delivered.append(result.audio)
+
+        channel = pool.channel(pipeline, on_result)
+        await channel.submit(b"0")
+        while not channel.busy:
+            await asyncio.sleep(0.01)
+        # Frame 0 is with the worker; 1..5 queue behind it, capped at 3
+        for i in range(1, 6):
+            await channel.submit(str(i).encode())
+        assert len(channel.pending) == 3
+        assert channel.dropped == 2
+
+        pipeline.release.set()
+        while len(delivered) < 4:
+            await asyncio.sleep(0.01)
+        assert delivered == [b"0", b"3", b"4", b"5"]
+        assert pool.stats()["frames_dropped"] == 2
+
+        await channel.aclose()
+        await pool.close()
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
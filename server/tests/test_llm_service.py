@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.models.conversation import ConversationState
+from app.services.llm_service import LLMService, ResponseOutcome
+from app.services.semantic_cache import SemanticCache
+
+
+class FakeCache:
+    def __init__(self):
+        self.responses = {}
+        self.lookups = 0
+
+    async def get_cached_response(self, query, context=""):
+        self.lookups += 1
+        return self.responses.get((query, context))
+
+    async def set_cached_response(self, query, response, context=""):
+        self.responses[(query, context)] = response
+
+
+@pytest.fixture
+def llm():
+    service = LLMService(client=object(), search_service=object(), cache_service=FakeCache(), semantic_cache=SemanticCache())
+
+    async def stream(messages, **kwargs):
+        for token in ("Why did ", "the chicken cross?"):
+            yield token
+
+    service._stream_groq_response = stream
+    return service
+
+
+def respond(llm, query, **kwargs):
+    async def collect():
+        return "".join([chunk async for chunk in llm.get_response(query, state=ConversationState(), **kwargs)])
+
+    return asyncio.run(collect())
+
+
+def test_generated_answer_reports_it_was_cached(llm):
+    outcome = ResponseOutcome()
+    assert respond(llm, "tell me a joke", outcome=outcome) == "Why did the chicken cross?"
+    assert outcome.cached
+    assert llm.cache_service.lookups == 1
+
+
+def test_checked_cache_is_not_looked_up_again(llm):
+    respond(llm, "tell me a joke", cache_checked=True)
+    assert llm.cache_service.lookups == 0
+
+
+def test_semantic_hit_is_not_reported_as_cached(llm):
+    llm.semantic_cache.add("tell me a joke", "A cached joke.", ConversationState().system_prompt)
+    outcome = ResponseOutcome()
+    assert respond(llm, "Tell me a joke!", outcome=outcome, cache_checked=True) == "A cached joke."
+    assert not outcome.cached
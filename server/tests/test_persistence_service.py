@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.services.persistence_service import PersistenceService
+
+
+class FakeHistory:
+    def __init__(self):
+        self.messages = []
+
+    async def add_messages(self, messages):
+        self.messages.extend(messages)
+
+
+class FakeSessions:
+    """Rejects any insert touching a deleted session, like the FK constraint does."""
+
+    def __init__(self, deleted=(), bad_texts=()):
+        self.deleted = set(deleted)
+        self.bad_texts = set(bad_texts)
+        self.rows = []
+        self.inserts = 0
+        self.titled = []
+
+    async def add_messages(self, messages):
+        self.inserts += 1
+        if any(m["sessionId"] in self.deleted for m in messages):
+            raise RuntimeError("Foreign key constraint failed on the field: sessionId")
+        if any(m["text"] in self.bad_texts for m in messages):
+            raise RuntimeError("invalid row")
+        self.rows.extend(messages)
+
+    async def auto_title_if_first_exchange(self, session_id):
+        self.titled.append(session_id)
+
+
+async def persist(sessions, messages):
+    service = PersistenceService(sessions, FakeHistory(), flush_interval_ms=50)
+    service.start()
+    for session_id, text, auto_title in messages:
+        await service.record_message(session_id, text, is_user=True, auto_title=auto_title)
+    await service.close()
+
+
+def test_batch_is_inserted_at_once():
+    sessions = FakeSessions()
+    asyncio.run(persist(sessions, [("a", "hi", False), ("b", "hello", True)]))
+    assert sessions.inserts == 1
+    assert [r["text"] for r in sessions.rows] == ["hi", "hello"]
+    assert sessions.titled == ["b"]
+
+
+def test_failed_insert_only_drops_the_bad_session():
+    sessions = FakeSessions(deleted={"gone"})
+    asyncio.run(persist(sessions, [
+        ("a", "first", True),
+        ("gone", "lost", True),
+        ("a", "second", False),
+        ("b", "third", True),
+    ]))
+    assert [r["text"] for r in sessions.rows] == ["first", "second", "third"]
+    assert sorted(sessions.titled) == ["a", "b"]
+
+
+def test_failed_insert_only_drops_the_bad_row():
+    sessions = FakeSessions(bad_texts={"bad"})
+    asyncio.run(persist(sessions, [("a", "one", False), ("a", "bad", False), ("a", "two", True)]))
+    assert [r["text"] for r in sessions.rows] == ["one", "two"]
+    assert sessions.titled == ["a"]
+
+
+def test_wait_for_history_can_skip_the_latest_write():
+    async def scenario():
+        history = FakeHistory()
+        service = PersistenceService(FakeSessions(), history, flush_interval_ms=5000)
+        service.start()
+        await service.record_message("a", "answer", is_user=False)
+        await service.record_message("a", "question", is_user=True)
+        await asyncio.wait_for(service.wait_for_history("b"), 0.1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(service.wait_for_history("a", skip_latest=True), 0.1)
+        await service.close()
+
+        service = PersistenceService(FakeSessions(), history, flush_interval_ms=5000)
+        service.start()
+        # The writer lingers on a lone message; a turn needn't wait for its own
+        await service.record_message("a", "question", is_user=True)
+        await asyncio.wait_for(service.wait_for_history("a", skip_latest=True), 0.1)
+        await service.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from app.core.config import settings
+from app.services.cache_service import LocalCache
+from app.services.search_service import NO_RESULTS, SearchService, has_results, search_category
+from app.services.single_flight import SingleFlight
+from app.services.tavily_client import AsyncTavilyClient
+from benchmarks.mock_servers import MockTavilyServer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FailingTavilyServer(MockTavilyServer):
+    """Answers the first `failures` searches with a 500."""
+
+    def __init__(self, *args, failures: int = 1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+
+    async def _search(self, request: web.Request) -> web.Response:
+        if self.failures:
+            self.failures -= 1
+            self.requests += 1
+            return web.Response(status=500, text="upstream exploded")
+        return await super()._search(request)
+
+
+def make_service(server) -> SearchService:
+    return SearchService(
+        AsyncTavilyClient(api_key="test", url=server.url),
+        single_flight=SingleFlight(),
+        cache=LocalCache(max_entries=100, ttl=3600),
+    )
+
+
+def test_concurrent_identical_queries_share_one_request():
+    async def scenario():
+        async with MockTavilyServer(latency_ms=100) as server:
+            service = make_service(server)
+            try:
+                results = await asyncio.gather(*(service.search("bitcoin price") for _ in range(10)))
+            finally:
+                await service.aclose()
+
+        assert server.requests == 1
+        assert len(set(results)) == 1
+        assert has_results(results[0])
+        assert "Result 0 for bitcoin price" in results[0]
+
+    run(scenario())
+
+
+def test_filler_variants_hit_the_cache():
+    async def scenario():
+        async with MockTavilyServer(latency_ms=0) as server:
+            service = make_service(server)
+            try:
+                first = await service.search("What's the bitcoin price?")
+                variants = [
+                    await service.search("um, what's the bitcoin price?"),
+                    await service.search("  WHAT'S THE BITCOIN PRICE  "),
+                ]
+                # A different max_results is a different result set
+                await service.search("what's the bitcoin price", max_results=5)
+            finally:
+                await service.aclose()
+
+        assert variants == [first, first]
+        assert server.requests == 2
+        assert service.hits == 2
+        assert service.misses == 2
+
+    run(scenario())
+
+
+def test_errors_are_not_cached():
+    async def scenario():
+        async with FailingTavilyServer(latency_ms=0) as server:
+            service = make_service(server)
+            try:
+                failed = await service.search("weather in paris")
+                retried = await service.search("weather in paris")
+                cached = await service.search("weather in paris")
+            finally:
+                await service.aclose()
+
+        assert not has_results(failed)
+        assert "500" in failed
+        assert has_results(retried)
+        assert cached == retried
+        assert server.requests == 2
+
+    run(scenario())
+
+
+def test_empty_results_are_not_cached():
+    async def scenario():
+        async with MockTavilyServer(latency_ms=0) as server:
+            service = make_service(server)
+            try:
+                first = await service.search("nothing to see", max_results=0)
+                second = await service.search("nothing to see", max_results=0)
+            finally:
+                await service.aclose()
+
+        assert first == second == NO_RESULTS
+        assert server.requests == 2
+        assert len(service.cache) == 0
+
+    run(scenario())
+
+
+def test_cache_ttl_follows_query_category():
+    async def scenario():
+        async with MockTavilyServer(latency_ms=0) as server:
+            service = make_service(server)
+            try:
+                await service.search("bitcoin price")
+                await service.search("who wrote hamlet")
+            finally:
+                await service.aclose()
+
+        now = time.monotonic()
+        ttls = sorted(expires_at - now for expires_at, _ in service.cache._entries.values())
+        ttl = settings.SEARCH_CACHE_TTL_S
+        assert abs(ttls[0] - ttl["prices"]) < 5
+        assert abs(ttls[1] - ttl["general"]) < 5
+
+    run(scenario())
+
+
+def test_search_category():
+    assert search_category("um, what's the bitcoin price?") == "prices"
+    assert search_category("latest news on the stock market") == "prices"
+    assert search_category("any breaking news today") == "news"
+    assert search_category("who won the match") == "sports"
+    assert search_category("will it rain tomorrow") == "weather"
+    assert search_category("who wrote hamlet") == "general"
@@ -0,0 +1,52 @@
+import pytest
+
+from app.services.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(capacity=64)
+    for question in [
+        "what is the capital of austria",
+        "convert celsius to fahrenheit",
+        "what is 15 percent of 80",
+        "is coffee bad for you",
+        "what is the capital of france",
+    ]:
+        cache.add(question, f"answer: {question}")
+    return cache
+
+
+@pytest.mark.parametrize("query", [
+    "what is the capital of australia",
+    "convert fahrenheit to celsius",
+    "what is 15 percent of 90",
+    "is coffee not bad for you",
+])
+def test_near_misses_are_not_served(cache, query):
+    assert cache.lookup(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "Um, what's the capital of France?",
+    "What is the capital of France.",
+])
+def test_paraphrases_are_served(cache, query):
+    assert cache.lookup(query) == "answer: what is the capital of france"
+
+
+def test_entries_are_scoped_to_their_context(cache):
+    cache.add("tell me a joke", "a joke", context="prompt a")
+    assert cache.lookup("tell me a joke", context="prompt a") == "a joke"
+    assert cache.lookup("tell me a joke", context="prompt b") is None
+
+
+def test_storage_grows_with_entries_and_wraps_at_capacity():
+    cache = SemanticCache(capacity=2500)
+    assert len(cache._vectors) == SemanticCache.initial_rows
+    for i in range(3000):
+        cache.add(f"what is item number {i}", f"answer {i}")
+    assert len(cache) == len(cache._vectors) == 2500
+    # The oldest entries were overwritten, the newest are served
+    assert cache.lookup("what is item number 10") is None
+    assert cache.lookup("what is item number 2999") == "answer 2999"
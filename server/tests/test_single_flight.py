@@ -0,0 +1,289 @@
+import asyncio
+import itertools
+
+import pytest
+import redis.asyncio as redis
+
+from app.services.single_flight import FlightAbandoned, SingleFlight
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+class Upstream:
+    """A streaming upstream call that counts its starts and cancellations."""
+
+    def __init__(self, chunks=("a", "b", "c"), error=None):
+        self.chunks = chunks
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def stream(self):
+        self.calls += 1
+        try:
+            for index, chunk in enumerate(self.chunks):
+                yield chunk
+                if index == 0:
+                    # Hold the flight open after its first chunk until released
+                    await self.release.wait()
+            if self.error:
+                raise self.error
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+async def collect(flight: SingleFlight, key: str, upstream: Upstream) -> list:
+    return [chunk async for chunk in flight.stream(key, upstream.stream)]
+
+
+async def wait_until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = Upstream()
+        callers = [asyncio.create_task(collect(flight, "k", upstream)) for _ in range(5)]
+        await wait_until(lambda: upstream.calls)
+        upstream.release.set()
+        results = await asyncio.gather(*callers)
+
+        assert results == [["a", "b", "c"]] * 5
+        assert upstream.calls == 1
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 4, "remote_followers": 0, "abandoned": 0}
+
+    run(scenario())
+
+
+def test_late_follower_replays_the_buffer_from_the_start():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = Upstream()
+        first = asyncio.create_task(collect(flight, "k", upstream))
+        # The flight has already published its first chunk when the follower joins
+        await wait_until(lambda: flight._flights.get("k") and flight._flights["k"].chunks)
+        late = asyncio.create_task(collect(flight, "k", upstream))
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        assert await first == await late == ["a", "b", "c"]
+        assert upstream.calls == 1
+
+    run(scenario())
+
+
+def test_upstream_error_is_raised_in_every_subscriber():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = Upstream(error=RuntimeError("upstream down"))
+        callers = [asyncio.create_task(collect(flight, "k", upstream)) for _ in range(3)]
+        await wait_until(lambda: upstream.calls)
+        upstream.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) and str(r) == "upstream down" for r in results)
+        # A failed flight is forgotten: the next caller starts afresh
+        assert "k" not in flight._flights
+
+    run(scenario())
+
+
+def test_upstream_is_cancelled_when_the_last_subscriber_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = Upstream()
+        first = asyncio.create_task(collect(flight, "k", upstream))
+        second = asyncio.create_task(collect(flight, "k", upstream))
+        await wait_until(lambda: upstream.calls)
+
+        # One subscriber barging in leaves the flight running for the other
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert upstream.cancelled == 0
+
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        await wait_until(lambda: upstream.cancelled)
+        assert flight.abandoned == 1
+        assert "k" not in flight._flights
+
+        # The key is free again for a new flight
+        fresh = Upstream()
+        fresh.release.set()
+        assert await collect(flight, "k", fresh) == ["a", "b", "c"]
+
+    run(scenario())
+
+
+def test_call_shares_one_result():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        callers = [asyncio.create_task(flight.call("k", fetch)) for _ in range(3)]
+        await wait_until(lambda: calls)
+        release.set()
+        assert await asyncio.gather(*callers) == ["result"] * 3
+        assert calls == 1
+
+    run(scenario())
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands SingleFlight uses (decode_responses=True)."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.values: dict[str, str] = {}
+        self.streams: dict[str, list] = {}
+        self._ids = itertools.count(1)
+        self._changed = asyncio.Condition()
+
+    def _check(self):
+        if self.fail:
+            raise redis.ConnectionError("redis is down")
+
+    async def set(self, key, value, nx=False, px=None):
+        self._check()
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self._check()
+        self.values.pop(key, None)
+
+    async def xadd(self, key, fields):
+        self._check()
+        self.streams.setdefault(key, []).append((f"{next(self._ids)}-0", dict(fields)))
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def pexpire(self, key, ms):
+        pass
+
+    async def xread(self, streams, block=None):
+        self._check()
+        (key, last_id), = streams.items()
+
+        def newer():
+            return [e for e in self.streams.get(key, []) if int(e[0].split("-")[0]) > int(last_id.split("-")[0])]
+
+        if not newer() and block:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(newer), block / 1000)
+                except asyncio.TimeoutError:
+                    return []
+        entries = newer()
+        return [(key, entries)] if entries else []
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xadd(self, key, fields):
+        self.commands.append(self.redis.xadd(key, fields))
+
+    def pexpire(self, key, ms):
+        self.commands.append(self.redis.pexpire(key, ms))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+def test_second_worker_relays_the_first_workers_stream():
+    async def scenario():
+        shared = FakeRedis()
+        worker_a = SingleFlight(redis_client=shared, stall_timeout=1.0)
+        worker_b = SingleFlight(redis_client=shared, stall_timeout=1.0)
+        upstream_a, upstream_b = Upstream(), Upstream()
+
+        leader = asyncio.create_task(collect(worker_a, "k", upstream_a))
+        await wait_until(lambda: upstream_a.calls)
+        follower = asyncio.create_task(collect(worker_b, "k", upstream_b))
+        await asyncio.sleep(0.01)
+        upstream_a.release.set()
+
+        assert await leader == await follower == ["a", "b", "c"]
+        assert (upstream_a.calls, upstream_b.calls) == (1, 0)
+        assert worker_b.remote_followers == 1
+        # The leader released its lock
+        assert not any(key.startswith("singleflight:lock:") for key in shared.values)
+
+    run(scenario())
+
+
+def test_stalled_remote_leader_falls_back_to_upstream():
+    async def scenario():
+        shared = FakeRedis()
+        # Another worker holds the lock but never writes to its stream
+        shared.values["singleflight:lock:k"] = "remote-flight"
+        flight = SingleFlight(redis_client=shared, stall_timeout=0.05)
+        upstream = Upstream()
+        upstream.release.set()
+
+        assert await collect(flight, "k", upstream) == ["a", "b", "c"]
+        assert upstream.calls == 1
+        assert flight.remote_followers == 1
+
+    run(scenario())
+
+
+def test_remote_leader_failing_mid_stream_abandons_the_flight():
+    async def scenario():
+        shared = FakeRedis()
+        shared.values["singleflight:lock:k"] = "remote-flight"
+        flight = SingleFlight(redis_client=shared, stall_timeout=1.0)
+        upstream = Upstream()
+        follower = asyncio.create_task(collect(flight, "k", upstream))
+        await shared.xadd("singleflight:stream:remote-flight", {"c": "a"})
+        await shared.xadd("singleflight:stream:remote-flight", {"e": "upstream down"})
+
+        # Part of the answer was already relayed: restarting upstream would repeat it
+        with pytest.raises(FlightAbandoned):
+            await follower
+        assert upstream.calls == 0
+
+    run(scenario())
+
+
+def test_redis_outage_fails_open():
+    async def scenario():
+        flight = SingleFlight(redis_client=FakeRedis(fail=True))
+        upstream = Upstream()
+        upstream.release.set()
+        assert await collect(flight, "k", upstream) == ["a", "b", "c"]
+        assert upstream.calls == 1
+
+    run(scenario())
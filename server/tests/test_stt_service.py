@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.services.stt_service import STTService
+
+PACKET = b"\0" * 3200  # 100 ms at 16 kHz 16-bit mono
+
+
+class FakeSDKConnection:
+    """Stands in for the Deepgram SDK's live connection; start() blocks like the real handshake."""
+
+    def __init__(self, opened: threading.Event):
+        self.opened = opened
+        self.sent = []
+        self.finalized = 0
+        self.finished = False
+
+    def on(self, event, handler):
+        pass
+
+    def start(self, options):
+        return self.opened.wait(5)
+
+    def send(self, data):
+        self.sent.append(bytes(data))
+
+    def finalize(self):
+        self.finalized += 1
+
+    def keep_alive(self):
+        pass
+
+    def finish(self):
+        self.finished = True
+
+
+def make_stt(opened: threading.Event) -> tuple[STTService, list]:
+    stt = STTService(websocket_callback=None)
+    stt.backend = "sdk"
+    stt.lazy, stt.idle_close, stt.keepalive_interval = True, 0, 0
+    connections = []
+
+    def connect(version):
+        connections.append(FakeSDKConnection(opened))
+        return connections[-1]
+
+    stt.dg_client = SimpleNamespace(listen=SimpleNamespace(live=SimpleNamespace(v=connect)))
+    return stt, connections
+
+
+def test_ingest_does_not_wait_for_the_handshake():
+    async def scenario():
+        opened = threading.Event()
+        stt, connections = make_stt(opened)
+        await stt.send_audio(b"\1" * 1600, is_speech=False)  # pre-roll
+        # Both return while start() is still blocked in its thread
+        await asyncio.wait_for(stt.send_audio(PACKET), 1)
+        await asyncio.wait_for(stt.send_audio(PACKET), 1)
+        await stt.finalize()
+        assert stt._connecting is not None
+
+        opened.set()
+        await asyncio.wait_for(stt._connecting, 5)
+        connection = connections[0]
+        assert b"".join(connection.sent) == b"\1" * 1600 + PACKET * 2
+        assert connection.finalized == 1
+        await stt.stop()
+
+    asyncio.run(scenario())
+
+
+def test_speech_during_idle_close_is_kept():
+    async def scenario():
+        opened = threading.Event()
+        opened.set()
+        stt, connections = make_stt(opened)
+        await stt.send_audio(PACKET)
+        await stt._connecting
+
+        closing = asyncio.create_task(stt._close_connection())
+        await asyncio.sleep(0)  # the close is now waiting on finish()
+        await stt.send_audio(PACKET)
+        await closing
+
+        assert connections[0].finished
+        assert stt.started
+        if stt._connecting is not None:
+            await stt._connecting
+        assert connections[1].sent == [PACKET]
+        await stt.stop()
+
+    asyncio.run(scenario())
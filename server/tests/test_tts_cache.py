@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+from app.services.tts_cache import TTSAudioCache
+
+
+def test_disk_hit_is_promoted_to_memory(tmp_path):
+    async def scenario():
+        cache = TTSAudioCache(memory_bytes=1 << 20, disk_dir=str(tmp_path), disk_bytes=1 << 20)
+        key = TTSAudioCache.key("cartesia", "voice", 16000, "Hello there.")
+        await cache.put(key, b"\x01\x02" * 100)
+
+        restarted = TTSAudioCache(memory_bytes=1 << 20, disk_dir=str(tmp_path), disk_bytes=1 << 20)
+        assert await restarted.get("missing", key) == b"\x01\x02" * 100
+        assert await restarted.get(key) == b"\x01\x02" * 100
+        assert (restarted.disk_hits, restarted.memory_hits) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_puts_of_one_key_never_interleave(tmp_path):
+    async def scenario():
+        cache = TTSAudioCache(memory_bytes=1 << 20, disk_dir=str(tmp_path), disk_bytes=64 << 20)
+        key = TTSAudioCache.key("cartesia", "voice", 16000, "Same sentence.")
+        versions = [bytes([i]) * (4 << 20) for i in range(1, 5)]
+        await asyncio.gather(*(cache.put(key, audio) for audio in versions))
+
+        with open(os.path.join(tmp_path, f"{key}.pcm"), "rb") as f:
+            assert f.read() in versions
+        assert [name for name in os.listdir(tmp_path)] == [f"{key}.pcm"]
+        assert cache.stats()["disk_bytes"] == 4 << 20
+
+    asyncio.run(scenario())
+
+
+def test_missing_file_is_dropped_from_the_index(tmp_path):
+    async def scenario():
+        cache = TTSAudioCache(memory_bytes=16, disk_dir=str(tmp_path), disk_bytes=1 << 20)
+        key = TTSAudioCache.key("cartesia", "voice", 16000, "Too big for memory.")
+        await cache.put(key, b"\x00" * 64)
+        os.remove(os.path.join(tmp_path, f"{key}.pcm"))
+
+        assert await cache.get(key) is None
+        assert cache.stats()["disk_entries"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_leftover_temp_files_are_removed_on_load(tmp_path):
+    (tmp_path / "abc.123.tmp").write_bytes(b"partial")
+    TTSAudioCache(memory_bytes=1 << 20, disk_dir=str(tmp_path), disk_bytes=1 << 20)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,123 @@
+import asyncio
+
+from app.services.turn_manager import TurnManager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_new_turn_cancels_running_turn():
+    async def scenario():
+        manager = TurnManager()
+        events = []
+
+        async def slow_turn(generation):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                events.append(("cancelled", generation, manager.is_current(generation)))
+                raise
+
+        async def quick_turn(generation):
+            events.append(("ran", generation, manager.is_current(generation)))
+
+        first = await manager.start(slow_turn)
+        await asyncio.sleep(0)
+        second = await manager.start(quick_turn)
+        await second
+
+        assert first.cancelled()
+        # The old turn's cleanup ran before the new turn started, already invalidated
+        assert events == [("cancelled", 1, False), ("ran", 2, True)]
+
+    run(scenario())
+
+
+def test_cancel_stops_running_turn():
+    async def scenario():
+        manager = TurnManager()
+        started = asyncio.Event()
+
+        async def turn(generation):
+            started.set()
+            await asyncio.sleep(10)
+
+        task = await manager.start(turn)
+        await started.wait()
+        assert not manager.is_idle
+
+        await manager.cancel()
+
+        assert task.cancelled()
+        assert manager.is_idle
+        assert not manager.is_current(1)
+        assert manager.generation == 2
+
+    run(scenario())
+
+
+def test_cancel_gives_up_on_slow_cleanup():
+    async def scenario():
+        manager = TurnManager(cancel_timeout=0.05)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def stubborn_turn(generation):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            finally:
+                await release.wait()
+
+        task = await manager.start(stubborn_turn)
+        await started.wait()
+
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        await manager.cancel()
+
+        assert loop.time() - began < 1
+        assert not task.done()
+        # The stuck turn is detached: the manager is free for the next one
+        assert manager.is_idle
+        assert not manager.is_current(1)
+
+        release.set()
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+
+    run(scenario())
+
+
+def test_finished_turn_clears_current():
+    async def scenario():
+        manager = TurnManager()
+
+        async def turn(generation):
+            pass
+
+        async def failing_turn(generation):
+            raise RuntimeError("boom")
+
+        await (await manager.start(turn))
+        assert manager._current is None
+        assert manager.is_idle
+        assert manager.is_current(1)
+
+        # Errors are logged, not raised, and still leave the manager idle
+        await (await manager.start(failing_turn))
+        assert manager._current is None
+        assert manager.is_idle
+
+    run(scenario())
+
+
+def test_cancel_when_idle_only_bumps_generation():
+    async def scenario():
+        manager = TurnManager()
+        await manager.cancel()
+        assert manager.is_idle
+        assert manager.generation == 1
+
+    run(scenario())
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from app.services.ingest_service import IngestPipeline
+from app.services.vad_service import EndpointDetector
+
+SAMPLE_RATE = 16000
+
+
+def utterance() -> bytes:
+    """0.6 s silence, 0.9 s of voiced sound, 0.9 s silence (16-bit mono PCM)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(0.9 * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((140, 280, 420, 560), 1)) * 6000
+    voiced += rng.normal(0, 300, len(t))
+    silence = np.zeros(int(0.6 * SAMPLE_RATE))
+    tail = np.zeros(int(0.9 * SAMPLE_RATE))
+    return np.concatenate((silence, voiced, tail)).astype(np.int16).tobytes()
+
+
+def feed(audio: bytes, chunk_bytes: int, gated: bool):
+    """Run the pipeline over `audio` in chunks; per-frame decisions, forwarded audio, endpoint frame."""
+    pipeline = IngestPipeline.create(vad_mode=1, sample_rate=SAMPLE_RATE, gated=gated)
+    detector = EndpointDetector(silence_ms=300, min_speech_ms=200)
+    decisions, forwarded, endpoint = [], [], None
+    for offset in range(0, len(audio), chunk_bytes):
+        result = pipeline.process(audio[offset:offset + chunk_bytes])
+        # The frame that fired is the one where the silence run reached silence_ms
+        for index, speech in enumerate(result.frames):
+            if detector.update(speech, result.frame_ms) and endpoint is None:
+                endpoint = len(decisions) + index
+        decisions.extend(result.frames)
+        forwarded.append(result.audio)
+    return decisions, b"".join(forwarded), endpoint
+
+
+@pytest.mark.parametrize("gated", [False, True])
+def test_decisions_do_not_depend_on_packet_size(gated):
+    audio = utterance()
+    reference = feed(audio, 960, gated)  # exactly one 30 ms frame per chunk
+    decisions, _, endpoint = reference
+    assert any(decisions) and not all(decisions)
+    assert endpoint is not None
+    for chunk_bytes in (222, 640, 4096, 16000):
+        assert feed(audio, chunk_bytes, gated) == reference
+
+
+def test_update_frames_counts_silence_per_frame():
+    detector = EndpointDetector(silence_ms=90, min_speech_ms=60)
+    # One chunk: speech, then the silence run that ends it
+    assert detector.update_frames([True, True, True, False, False, False], 30)
+    # Speech at the end of a chunk resets the silence run
+    assert not detector.update_frames([True, True, False, False, True], 30)
+    assert not detector.update_frames([False, False], 30)
+    assert detector.update_frames([False], 30)